@@ -1,31 +1,30 @@
+import os
+import docker
 import jsonschema
 import requests
 import logging
+import time
 
+from UPISAS.content_encoding import ACCEPT
 from UPISAS.exceptions import ServerNotReachable, IncompleteJSONSchema
 
-pull_image_tasks = {}
+_docker_clients = {}
 
 
-def show_progress(line, progress):
-    """ Show task progress (red for download, green for extract). Used when pulling images."""
-    if line['status'] == 'Downloading':
-        id = f'[red][Download {line["id"]}]'
-    elif line['status'] == 'Extracting':
-        id = f'[green][Extract  {line["id"]}]'
-    else:
-        # skip other statuses
-        return
-    if id not in pull_image_tasks.keys():
-        pull_image_tasks[id] = progress.add_task(f"{id}", total=line['progressDetail']['total'])
-    else:
-        progress.update(pull_image_tasks[id], completed=line['progressDetail']['current'])
+def get_docker_client():
+    """ Docker client shared by everything in this process. Forked processes (e.g. experiment runs) get their own,
+    since the connections of a client cannot be shared across processes."""
+    pid = os.getpid()
+    if pid not in _docker_clients:
+        _docker_clients[pid] = docker.from_env()
+    return _docker_clients[pid]
 
 
-def get_response_for_get_request(url):
+def get_response_for_get_request(url, accept_encoding: "None negotiates every encoding decodable here" = None,
+                                 headers=None):
     try:
         logging.info("GET request to " + str(url))
-        response = requests.get(url)
+        response = requests.get(url, headers={"Accept-Encoding": accept_encoding or ACCEPT, **(headers or {})})
         return response
     except requests.exceptions.ConnectionError as e:
         logging.error(e)
@@ -33,6 +32,22 @@ def get_response_for_get_request(url):
         raise ServerNotReachable
 
 
+def poll_with_backoff(probe, timeout=60, initial_delay=0.1, max_delay=2.0):
+    """ Call probe() until it returns a truthy value, doubling the delay between calls up to max_delay.
+    Returns that value, or None once timeout seconds have passed."""
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        result = probe()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
 def validate_schema(json_instance, json_schema):
     try:
         incomplete_warning_message = "No complete JSON Schema provided for validation"
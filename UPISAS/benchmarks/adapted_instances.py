@@ -0,0 +1,67 @@
+import argparse
+import timeit
+import tracemalloc
+
+from UPISAS.clock import SimulatedClock
+from UPISAS.strategies.ramses_analysis import AdaptedInstanceTracker
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    tracked = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return tracked, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cost of tracking adapted RAMSES instances with a set "
+                                                 "and with AdaptedInstanceTracker")
+    parser.add_argument("--instances", type=int, default=100000, help="number of tracked instances")
+    parser.add_argument("--lookups", type=int, default=1000000)
+    parser.add_argument("--ticks", type=int, default=1000, help="ticks of the long run, 5 seconds apart")
+    parser.add_argument("--adapted-per-tick", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    ids = [f"service-{i % 50}@instance-{i}:8080" for i in range(args.instances)]
+    absent = [f"service-{i % 50}@absent-{i}:8080" for i in range(1000)]
+    clock = SimulatedClock()
+
+    def build_tracker():
+        tracker = AdaptedInstanceTracker(cooldown=args.instances, maxsize=args.instances, clock=clock)
+        for instance_id in ids:
+            clock.advance(1)
+            tracker.add(instance_id)
+        return tracker
+
+    adapted_set, set_size = measure_memory(lambda: set(ids))
+    tracker, tracker_size = measure_memory(build_tracker)
+
+    print(f"{args.instances} tracked instances, {args.lookups} lookups")
+    print(f"{'':<24}{'set':>12}{'tracker':>12}")
+    print(f"{'memory (MB)':<24}{set_size / 1e6:>12.2f}{tracker_size / 1e6:>12.2f}")
+    for name, probe in (("lookup hit (ns)", ids[len(ids) // 2]), ("lookup miss (ns)", absent[0])):
+        costs = [min(timeit.repeat(lambda: probe in tracked, number=args.lookups, repeat=3)) / args.lookups * 1e9
+                 for tracked in (adapted_set, tracker)]
+        print(f"{name:<24}{costs[0]:>12.1f}{costs[1]:>12.1f}")
+    expire = min(timeit.repeat(tracker.expire, number=1000, repeat=3)) / 1000 * 1e6
+    print(f"{'expire, nothing due (us)':<24}{'':>12}{expire:>12.1f}")
+    present = set(ids)
+    retain = min(timeit.repeat(lambda: tracker.retain(present), number=3, repeat=3)) / 3 * 1e3
+    print(f"{'retain (ms)':<24}{'':>12}{retain:>12.1f}")
+
+    # A long run adapting new instances every tick: the set keeps all of them, the tracker only the recent ones
+    clock = SimulatedClock()
+    adapted_set, tracker = set(), AdaptedInstanceTracker(cooldown=60, clock=clock)
+    for tick in range(args.ticks):
+        clock.advance(5)
+        tracker.expire()
+        for i in range(args.adapted_per_tick):
+            adapted_set.add(f"instance-{tick}-{i}")
+            tracker.add(f"instance-{tick}-{i}")
+    print(f"after {args.ticks} ticks adapting {args.adapted_per_tick} instances each: "
+          f"{len(adapted_set)} in the set, {len(tracker)} in the tracker (60s cooldown)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import json
+import statistics
+import time
+import zlib
+
+import requests
+
+from UPISAS import content_encoding
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
+
+
+def measure(server, accept_encoding, compress_level, polls):
+    '''Polls /monitor and returns the mean response size in bytes and the median time per poll in seconds,
+    including compression on the server and decompression and decoding on the client'''
+    server.compress_level = compress_level
+    url = f"{server.base_endpoint}/monitor"
+    sizes, durations = [], []
+    with requests.Session() as session:
+        for _ in range(polls):
+            started = time.perf_counter()
+            response = session.get(url, headers={"Accept-Encoding": accept_encoding}, stream=True)
+            raw = response.raw.read(decode_content=False)
+            payload = decode(raw, response.headers.get("Content-Encoding"))
+            durations.append(time.perf_counter() - started)
+            sizes.append(len(raw))
+            assert payload
+    return statistics.mean(sizes), statistics.median(durations)
+
+
+def decode(raw, encoding):
+    '''Decodes a response body as urllib3 does it for requests.get'''
+    if encoding == "gzip":
+        raw = zlib.decompress(raw, 16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        raw = zlib.decompress(raw)
+    elif encoding == "zstd":
+        raw = content_encoding.zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return json.loads(raw)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the size and latency of RAMSES /monitor polls for each "
+                                                 "content encoding, served by the RAMSES simulator")
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--instances", type=int, default=10, help="instances per service")
+    parser.add_argument("--endpoints", type=int, default=5, help="endpoints per service")
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--bandwidth", type=float, default=10.0, help="link bandwidth in Mbit/s, to estimate the "
+                                                                      "transfer time over a constrained link")
+    args = parser.parse_args(argv)
+
+    configurations = [("identity", None)]
+    for encoding in content_encoding.ENCODERS:
+        if content_encoding.ENCODERS[encoding]:
+            levels = (1, 3, 9) if encoding == "zstd" else (1, 6, 9)
+            configurations += [(encoding, level) for level in levels]
+
+    simulation = RamsesSimulation(services=args.services, instances_per_service=args.instances,
+                                  endpoints_per_service=args.endpoints, seed=1)
+    results = []
+    with SimulatorServer(simulation) as server:
+        for encoding, level in configurations:
+            size, duration = measure(server, encoding, level, args.polls)
+            transfer = size * 8 / (args.bandwidth * 1e6)
+            results.append((f"{encoding}" + (f" ({level})" if level else ""), size, duration, duration + transfer))
+
+    identity_size = results[0][1]
+    print(f"{args.services} services x {args.instances} instances x {args.endpoints} endpoints, "
+          f"{args.polls} polls, {args.bandwidth} Mbit/s link")
+    print(f"{'encoding':<14}{'bytes/poll':>12}{'ratio':>8}{'poll (loopback)':>18}{'poll (link)':>14}")
+    for name, size, duration, total in results:
+        print(f"{name:<14}{size:>12.0f}{identity_size / size:>8.1f}{duration * 1000:>15.2f} ms{total * 1000:>11.2f} ms")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import datetime
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+class Clock(ABC):
+    """
+    The time source of strategies and of the loops driving them. Against a simulated exemplar sharing a
+    SimulatedClock, a scenario runs as fast as the strategy computes, with the same decisions as in real time.
+    """
+
+    @abstractmethod
+    def time(self):
+        """ Seconds since the epoch """
+        pass
+
+    @abstractmethod
+    def sleep(self, seconds):
+        """ ... """
+        pass
+
+    def now(self):
+        return datetime.datetime.fromtimestamp(self.time())
+
+    def ticks(self, interval, duration=None):
+        '''Yields the elapsed seconds every `interval` seconds until `duration` seconds have elapsed
+        (forever without a duration). Time spent by the caller between ticks counts towards the duration'''
+        start = self.time()
+        while True:
+            elapsed = self.time() - start
+            if duration is not None and elapsed >= duration:
+                return
+            yield elapsed
+            self.sleep(interval)
+
+
+class WallClock(Clock):
+    """
+    Real time.
+    """
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def now(self):
+        return datetime.datetime.now()
+
+
+class SimulatedClock(Clock):
+    """
+    Time that only passes when someone sleeps: sleep() returns immediately after moving the clock forward.
+    """
+
+    def __init__(self, start: "seconds since the epoch at which the clock starts" = 0.0):
+        self._time = float(start)
+        self._lock = threading.Lock()
+
+    def time(self):
+        return self._time
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        if seconds < 0:
+            raise ValueError("a clock cannot go back in time")
+        with self._lock:
+            self._time += seconds
@@ -0,0 +1,50 @@
+import gzip
+import zlib
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Accept-Encoding sent with UPISAS requests: the encodings urllib3 can decode here, i.e. gzip and deflate,
+# plus br and zstd when brotli or zstandard are installed (requests alone only advertises gzip and deflate)
+ACCEPT = ACCEPT_ENCODING
+
+DEFAULT_LEVELS = {"zstd": 3, "gzip": 6, "deflate": 6}
+
+
+def _zstd(body, level):
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+# Encodings a server can answer with, by order of preference
+ENCODERS = {
+    "zstd": _zstd if zstandard else None,
+    "gzip": lambda body, level: gzip.compress(body, compresslevel=level),
+    "deflate": lambda body, level: zlib.compress(body, level),
+}
+
+
+def negotiate(accept_encoding: "value of the Accept-Encoding request header", encodings=None):
+    '''The preferred encoding among `encodings` (default: all installed) that the client accepts, None for identity'''
+    accepted = set()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().lower().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue  # malformed quality, the item is ignored
+        accepted.add(name.strip())
+    for encoding in encodings if encodings is not None else ENCODERS:
+        if ENCODERS.get(encoding) and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def encode(body: bytes, encoding, level=None):
+    return ENCODERS[encoding](body, level if level is not None else DEFAULT_LEVELS[encoding])
@@ -16,3 +16,7 @@ class EndpointNotReachable(UPISASException):
 
 class IncompleteJSONSchema(UPISASException):
     pass
+
+
+class ExemplarNotReady(UPISASException):
+    pass
@@ -1,47 +1,169 @@
+import os
+import re
+import time
+import threading
+from datetime import datetime
 import docker
+import requests
+from urllib.parse import quote
 from abc import ABC, abstractmethod
-from rich.progress import Progress
-from UPISAS import show_progress
+from UPISAS import get_docker_client, poll_with_backoff
 import logging
 from docker.errors import DockerException
-from UPISAS.exceptions import DockerImageNotFoundOnDockerHub
+from UPISAS.exceptions import ExemplarNotReady
+from UPISAS.pull_manager import get_pull_manager
 
 logging.getLogger().setLevel(logging.INFO)
 
 
+def _parse_daemon_time(value):
+    '''Nanoseconds since the epoch of an RFC 3339 time with up to nanosecond precision, as the docker daemon
+    reports its time'''
+    match = re.match(r"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?(Z|[+-]\d\d:?\d\d)$", value)
+    if not match:
+        raise ValueError(f"invalid daemon time '{value}'")
+    offset = "+0000" if match[3] == "Z" else match[3].replace(":", "")
+    seconds = datetime.strptime(match[1] + offset, "%Y-%m-%dT%H:%M:%S%z").timestamp()
+    return int(seconds) * 10**9 + int((match[2] or "0")[:9].ljust(9, "0"))
+
+
+class ContainerStateCache:
+    """
+    Keeps the state of containers up to date from the docker event stream, so that status lookups
+    need no API round-trip. Lookups of unknown containers, or without an event stream, return None.
+    States are ordered by the daemon's clock, which stamps the events: states recorded by this process are
+    stamped with daemon_time_ns() too, as the local clock may be off from the daemon's (remote daemons, VMs).
+    """
+    ACTION_STATUS = {"create": "created", "start": "running", "restart": "running", "unpause": "running",
+                     "pause": "paused", "die": "exited", "destroy": "removed"}
+    RETRY_AFTER = 5
+
+    def __init__(self, event_source: "callable returning an iterable of docker event dicts" = None):
+        self.event_source = event_source if event_source else self._docker_events
+        self._states = {}
+        self._lock = threading.Lock()
+        self._subscribe_lock = threading.Lock()
+        self._pid = None
+        self._stream = None
+        self._thread = None
+        self._retry_at = 0
+
+    @staticmethod
+    def _docker_events():
+        return get_docker_client().events(decode=True, filters={"type": "container"})
+
+    @staticmethod
+    def daemon_time_ns():
+        return _parse_daemon_time(get_docker_client().info()["SystemTime"])
+
+    def _ensure_subscribed(self):
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return True
+        with self._subscribe_lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return True
+            if self._pid == os.getpid() and time.monotonic() < self._retry_at:
+                return False
+            # Not subscribed yet, the stream ended, or this is a forked process in which the thread does not exist
+            if self._pid is not None and self._pid != os.getpid():
+                with self._lock:
+                    self._states.clear()  # inherited states are not followed by events in this process
+            self._pid = os.getpid()
+            try:
+                self._stream = self.event_source()
+            except Exception as e:
+                logging.warning(f"cannot subscribe to docker events, polling container status instead: {e}")
+                self._retry_at = time.monotonic() + self.RETRY_AFTER
+                return False
+            self._thread = threading.Thread(target=self._consume, args=(self._stream,), name="ContainerStateCache",
+                                            daemon=True)
+            self._thread.start()
+            return True
+
+    def _consume(self, stream):
+        try:
+            for event in stream:
+                self._on_event(event)
+        except Exception as e:
+            logging.warning(f"docker event stream ended: {e}")
+        finally:
+            # Without events the cached states could become stale
+            with self._lock:
+                self._states.clear()
+            self._retry_at = time.monotonic() + self.RETRY_AFTER
+
+    def _on_event(self, event):
+        action = event.get("Action") or event.get("status")
+        container_id = event.get("id") or event.get("Actor", {}).get("ID")
+        status = self.ACTION_STATUS.get(action)
+        if status and container_id:
+            self._set(container_id, status, event.get("timeNano") or event.get("time", 0) * 10**9)
+
+    def _set(self, container_id, status, time_ns):
+        with self._lock:
+            current = self._states.get(container_id)
+            if current and current[1] > time_ns:
+                return  # an event delivered after a newer state was recorded
+            self._states[container_id] = (status, time_ns)
+
+    def update(self, container_id, status, time_ns: "daemon time, from daemon_time_ns(), before the state was read"):
+        '''Records a state observed or caused by this process'''
+        self._set(container_id, status, time_ns)
+
+    def status(self, container_id):
+        if not self._ensure_subscribed():
+            return None
+        with self._lock:
+            current = self._states.get(container_id)
+        return current[0] if current else None
+
+    def close(self):
+        if self._stream is not None and hasattr(self._stream, "close"):
+            self._stream.close()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self._thread = None
+        self._pid = None
+
+
+_container_state_cache = None
+
+
+def get_container_state_cache():
+    global _container_state_cache
+    if _container_state_cache is None:
+        _container_state_cache = ContainerStateCache()
+    return _container_state_cache
+
+
 class Exemplar(ABC):
     """
     A class which encapsulates a self-adaptive exemplar run in a docker container.
     """
     _container_name = ""
+    # Set once the docker daemon answered that it cannot checkpoint containers. It is a class attribute so that
+    # exemplars created later, and run processes forked afterwards, do not ask again.
+    _checkpoint_unsupported = False
+
     def __init__(self, base_endpoint: "string with the URL of the exemplar's HTTP server", \
                  docker_kwargs,
                  auto_start: "Whether to immediately start the container after creation" =False,
                  ):
         '''Create an instance of the Exemplar class'''
         self.base_endpoint = base_endpoint
+        self.docker_kwargs = docker_kwargs
+        self._restore_checkpoint = None
         # --- We do not need to run Ramses in container, it should be already running... ---
 
         image_name = docker_kwargs["image"]
-        image_owner = image_name.split("/")[0]
         try:
-            docker_client = docker.from_env()
-            try:
-                docker_client.images.get(image_name)
-                logging.info(f"image '{image_name}' found locally")
-            except docker.errors.ImageNotFound:
-                logging.info(f"image '{image_name}' not found locally")
-                images_from_owner = docker_client.images.search(image_owner)
-                if image_name.split(":")[0] in [i["name"] for i in images_from_owner]:
-                    logging.info(f"image '{image_name}' found on DockerHub, pulling it")
-                    with Progress() as progress:
-                        for line in docker_client.api.pull(image_name, stream=True, decode=True):
-                            show_progress(line, progress)
-                else:
-                    logging.error(f"image '{image_name}' not found on DockerHub, exiting!")
-                    raise DockerImageNotFoundOnDockerHub
+            docker_client = get_docker_client()
+            # Joins a pull of the same image that is already in progress, e.g. one started by prefetch()
+            get_pull_manager().ensure(image_name).result()
             docker_kwargs["detach"] = True
             self.exemplar_container = docker_client.containers.create(**docker_kwargs)
+            self.state_cache = get_container_state_cache()
+            self._set_status("created")
         except DockerException as e:
             # TODO: Properly catch various errors. Currently, a lot of errors might be caught here.
             # Please check the logs if that happens.
@@ -60,8 +182,15 @@ class Exemplar(ABC):
             if container_status == "running":
                 logging.warning("container already running...")
             else:
-                logging.info("starting container...")
-                self.exemplar_container.start()
+                checkpoint = getattr(self, "_restore_checkpoint", None)
+                if checkpoint:
+                    logging.info(f"starting container from checkpoint '{checkpoint}'...")
+                    self._docker_api("post", "/containers/{0}/start", params={"checkpoint": checkpoint})
+                    self._restore_checkpoint = None
+                else:
+                    logging.info("starting container...")
+                    self.exemplar_container.start()
+                self._set_status("running")
             return True
         except docker.errors.NotFound as e:
             logging.error(e)
@@ -74,12 +203,15 @@ class Exemplar(ABC):
                 logging.warning("container already stopped...")
                 if remove:
                     self.exemplar_container.remove()
+                    self._set_status("removed")
                     self.exemplar_container = None
             else:
                 logging.info("stopping container...")
                 self.exemplar_container.stop()
+                self._set_status("exited")
                 if remove:
                     self.exemplar_container.remove()
+                    self._set_status("removed")
                     self.exemplar_container = None
             return True
         except docker.errors.NotFound as e:
@@ -93,6 +225,7 @@ class Exemplar(ABC):
             if container_status == "running":
                 logging.info("pausing container...")
                 self.exemplar_container.pause()
+                self._set_status("paused")
                 return True
             elif container_status == "paused":
                 logging.warning("container already paused...")
@@ -111,6 +244,7 @@ class Exemplar(ABC):
             if container_status == "paused":
                 logging.info("unpausing container...")
                 self.exemplar_container.unpause()
+                self._set_status("running")
                 return True
             elif container_status == "running":
                 logging.warning("container already running (why unpause it?)...")
@@ -122,8 +256,158 @@ class Exemplar(ABC):
             logging.warning(e)
             logging.warning("cannot unpause container")
 
+    def wait_until_ready(self, timeout=60, endpoints=("", "monitor"), initial_delay=0.1, max_delay=2.0):
+        '''Waits until the container is running and one of the given endpoints (relative to the base endpoint)
+        responds, polling with exponential backoff. Pass no endpoints to only wait for the container.
+        Raises ExemplarNotReady when the container stops or the timeout passes'''
+        urls = ['/'.join([self.base_endpoint, suffix]) if suffix else self.base_endpoint for suffix in endpoints]
+
+        def probe():
+            container_status = self.get_container_status()
+            if container_status in ("exited", "dead", "removed"):
+                logging.error(f"container is {container_status}, it will not become ready")
+                raise ExemplarNotReady
+            if container_status != "running":
+                return False
+            if not urls:
+                return True
+            for url in urls:
+                try:
+                    if requests.get(url, timeout=max_delay).status_code < 400:
+                        logging.info(f"exemplar ready, {url} responded")
+                        return True
+                except requests.exceptions.RequestException:
+                    pass
+            return False
+
+        if not poll_with_backoff(probe, timeout, initial_delay, max_delay):
+            logging.error(f"exemplar not ready after {timeout} seconds")
+            raise ExemplarNotReady
+        return True
+
+    def create_snapshot(self, tag="warm",
+                        commit_fallback: "commit the filesystem to an image when the container cannot be checkpointed" = False):
+        '''Saves the current state of the container, so that later runs can start from it (see restore_snapshot).
+        A CRIU checkpoint keeps the memory of the processes, but needs a docker daemon with experimental features
+        and CRIU installed. Without it, no snapshot is made and the container keeps being restarted, unless
+        commit_fallback is set: a committed image only restores the filesystem, so runs still start cold and each
+        restore pays for recreating the container.
+        Returns the kind of snapshot made, "checkpoint" or "image", or None'''
+        if not Exemplar._checkpoint_unsupported:
+            try:
+                self._docker_api("post", "/containers/{0}/checkpoints", json={"CheckpointID": tag, "Exit": False})
+                logging.info(f"checkpoint '{tag}' created")
+                return "checkpoint"
+            except DockerException as e:
+                self._note_checkpoint_error(e)
+                logging.warning(f"cannot checkpoint the container: {e}")
+        if not commit_fallback:
+            return None
+        self.exemplar_container.commit(repository=self._snapshot_repository(), tag=tag)
+        logging.info(f"container committed to image '{self._snapshot_repository()}:{tag}'")
+        return "image"
+
+    def has_snapshot(self, tag="warm"):
+        '''Returns the kind of the snapshot with the given tag, or None when there is none. Called before the run
+        processes are forked, it also finds out whether the daemon can checkpoint containers at all'''
+        if not Exemplar._checkpoint_unsupported:
+            try:
+                checkpoints = self._docker_api("get", "/containers/{0}/checkpoints").json() or []
+                if tag in [c.get("Name") for c in checkpoints]:
+                    return "checkpoint"
+            except DockerException as e:
+                self._note_checkpoint_error(e)
+        try:
+            get_docker_client().images.get(f"{self._snapshot_repository()}:{tag}")
+            return "image"
+        except docker.errors.ImageNotFound:
+            return None
+
+    def restore_snapshot(self, tag="warm"):
+        '''Resets the container to a snapshot. The container is left stopped; the snapshot state resumes
+        with the next start_container(). Returns the kind of snapshot restored, or None when there is none'''
+        kind = self.has_snapshot(tag)
+        if kind is None:
+            logging.warning(f"no snapshot '{tag}' to restore")
+            return None
+        if self.get_container_status() in ("running", "paused"):
+            self.stop_container(remove=False)
+        if kind == "checkpoint":
+            self._restore_checkpoint = tag
+        else:
+            # A new container from the committed image replaces the current one
+            self.exemplar_container.remove()
+            self._set_status("removed")
+            docker_kwargs = dict(self.docker_kwargs, image=f"{self._snapshot_repository()}:{tag}")
+            self.exemplar_container = get_docker_client().containers.create(**docker_kwargs)
+            self._set_status("created")
+        logging.info(f"restored {kind} '{tag}'")
+        return kind
+
+    def remove_snapshot(self, tag="warm"):
+        try:
+            self._docker_api("delete", "/containers/{0}/checkpoints/" + tag)
+        except DockerException:
+            pass
+        try:
+            get_docker_client().images.remove(f"{self._snapshot_repository()}:{tag}")
+        except docker.errors.ImageNotFound:
+            pass
+
+    @staticmethod
+    def _note_checkpoint_error(error):
+        '''Remembers that checkpoints are unsupported when the daemon says so, but not on other (transient) errors'''
+        message = str(error).lower()
+        if isinstance(error, docker.errors.APIError) and \
+                any(reason in message for reason in ("experimental", "not supported", "not implemented", "criu")):
+            Exemplar._checkpoint_unsupported = True
+
+    def _snapshot_repository(self):
+        return f"upisas-snapshot/{self.exemplar_container.name}".lower()
+
+    def _docker_api(self, method: "get, post or delete", path, **kwargs):
+        '''Calls an endpoint of the docker API about the container that docker-py does not wrap (e.g. checkpoints),
+        through the public requests interface of its APIClient. Errors are raised as docker.errors.APIError'''
+        api = get_docker_client().api
+        url = f"{api.base_url}/v{api.api_version}{path.format(quote(self.exemplar_container.id))}"
+        response = getattr(api, method)(url, **kwargs)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            raise docker.errors.create_api_error_from_http_exception(e)
+        return response
+
+    def _set_status(self, status):
+        '''Records the state of the container after an action of this process: read back from docker, unless it
+        was removed, and stamped with the daemon time so that events of earlier states do not override it'''
+        state_cache = getattr(self, "state_cache", None)
+        if state_cache:
+            container_id = self.exemplar_container.id
+            try:
+                time_ns = state_cache.daemon_time_ns()
+                if status != "removed":
+                    self.exemplar_container.reload()
+                    status = self.exemplar_container.status
+            except docker.errors.NotFound:
+                status = "removed"
+            except DockerException as e:
+                logging.warning(f"cannot read the container status, leaving it to the docker events: {e}")
+                return
+            state_cache.update(container_id, status, time_ns)
+
     def get_container_status(self):
+        '''Answers from the event-driven state cache when possible, and asks docker otherwise'''
         if self.exemplar_container:
-            self.exemplar_container.reload()
-            return self.exemplar_container.status
+            # The container may have been created by a parent process; use the client of this process
+            if hasattr(self.exemplar_container, "client"):
+                self.exemplar_container.client = get_docker_client()
+            state_cache = getattr(self, "state_cache", None)
+            status = state_cache.status(self.exemplar_container.id) if state_cache else None
+            if status is None:
+                time_ns = state_cache.daemon_time_ns() if state_cache else None
+                self.exemplar_container.reload()
+                status = self.exemplar_container.status
+                if state_cache:
+                    state_cache.update(self.exemplar_container.id, status, time_ns)
+            return status
         return "removed"
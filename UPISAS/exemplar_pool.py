@@ -0,0 +1,119 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from UPISAS.exceptions import ExemplarNotReady
+
+
+class ExemplarPool:
+    """
+    A pool of exemplars whose containers are created (and optionally started) ahead of the runs using them,
+    so that a run does not pay for container creation, start and removal.
+    """
+    def __init__(self, factory: "callable returning an exemplar, given a slot index to make its container name unique",
+                 size: "number of exemplars kept in the pool" = 1,
+                 prestart: "whether pooled containers are started before they are handed out" = False,
+                 recycle: "'restart' reuses the container of a released exemplar, 'snapshot' also resets it to its "
+                          "snapshot (see Exemplar.create_snapshot), 'recreate' replaces it" = "restart",
+                 health_check: "callable telling whether an exemplar can be handed out" = None,
+                 max_attempts=3):
+        if recycle not in ("restart", "snapshot", "recreate"):
+            raise ValueError(f"unknown recycle mode '{recycle}'")
+        self.factory = factory
+        self.size = size
+        self.prestart = prestart
+        self.recycle = recycle
+        self.health_check = health_check if health_check else self._is_healthy
+        self.max_attempts = max_attempts
+
+        self._ready = queue.Queue()
+        self._in_use = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="ExemplarPool")
+        for slot in range(size):
+            self._executor.submit(self._provision, slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _is_healthy(self, exemplar):
+        status = exemplar.get_container_status()
+        if self.prestart:
+            return status == "running"
+        return status in ("created", "exited", "running")
+
+    def _provision(self, slot, exemplar=None):
+        '''Brings the exemplar of a slot into a state in which it can be handed out (runs on a pool thread)'''
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                if exemplar is None:
+                    exemplar = self.factory(slot)
+                if self.prestart:
+                    exemplar.start_container()
+                if self.health_check(exemplar):
+                    self._ready.put((slot, exemplar))
+                    logging.info(f"pool slot {slot} is ready")
+                    return
+                logging.warning(f"pool slot {slot} failed its health check (attempt {attempt}/{self.max_attempts})")
+            except Exception as e:
+                logging.error(f"cannot provision pool slot {slot}: {e}")
+            self._discard(exemplar)
+            exemplar = None
+        logging.error(f"giving up on pool slot {slot}")
+        self._ready.put((slot, None))
+
+    def _recycle(self, slot, exemplar):
+        if self.recycle in ("restart", "snapshot") and exemplar.get_container_status() != "removed":
+            exemplar.stop_container(remove=False)
+            if self.recycle == "snapshot":
+                exemplar.restore_snapshot()  # restarts from scratch when no snapshot was made yet
+            self._provision(slot, exemplar)
+        else:
+            self._discard(exemplar)
+            self._provision(slot)
+
+    def _discard(self, exemplar):
+        if exemplar is not None and exemplar.exemplar_container:
+            if self.recycle == "snapshot":
+                exemplar.remove_snapshot()
+            exemplar.stop_container(remove=True)
+
+    def acquire(self, timeout=None):
+        '''Returns a ready exemplar, waiting at most `timeout` seconds for one to become available'''
+        while True:
+            try:
+                slot, exemplar = self._ready.get(timeout=timeout)
+            except queue.Empty:
+                raise ExemplarNotReady
+            if exemplar is None:
+                raise ExemplarNotReady
+            # The container could have died while waiting in the pool
+            if not self.health_check(exemplar):
+                logging.warning(f"pooled exemplar of slot {slot} is not healthy anymore, replacing it")
+                self._executor.submit(self._recycle, slot, exemplar)
+                continue
+            with self._lock:
+                self._in_use[id(exemplar)] = slot
+            return exemplar
+
+    def release(self, exemplar):
+        '''Gives an exemplar back to the pool. It is reset in the background and handed out again afterwards'''
+        with self._lock:
+            slot = self._in_use.pop(id(exemplar))
+        if self._closed:
+            self._discard(exemplar)
+        else:
+            self._executor.submit(self._recycle, slot, exemplar)
+
+    def close(self):
+        '''Stops and removes all pooled containers. Exemplars still in use are left to their users'''
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        while not self._ready.empty():
+            _, exemplar = self._ready.get_nowait()
+            self._discard(exemplar)
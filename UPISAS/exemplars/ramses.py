@@ -1,35 +1,57 @@
 from UPISAS.exemplar import Exemplar
+from UPISAS import get_docker_client, poll_with_backoff
 import requests
 
 class RAMSES(Exemplar):
     """
     A class which encapsulates a self-adaptive exemplar run in a docker container.
     """
-    def __init__(self, auto_start = False):
+    docker_image = "ahmetkarapinar/scenario5:latest" # image of newly created scenario.
+    network = "ramses-sas-net"
+
+    def __init__(self, auto_start = False, container_name = "ramses-scenario-restclient"):
 
         # This docker particularly for running Scenario 1.
         ramses_docker_kwargs = {
-            "name":  "ramses-scenario-restclient",
-            "image": "ahmetkarapinar/scenario5:latest", # image of newly created scenario.
-            "network": "ramses-sas-net" # IMPORTANT -> Network should be same with Ramses's network.
+            "name":  container_name,
+            "image": self.docker_image,
+            "network": self.network # IMPORTANT -> Network should be same with Ramses's network.
             } 
         
         # The url should be same with  
         #super().__init__("http://127.0.0.1:50000", auto_start)
         super().__init__("http://127.0.0.1:50000", ramses_docker_kwargs, auto_start)
 
-    def stop_existing_adaptation(self):
+    def stop_existing_adaptation(self, timeout=30):
 
         # IMPORTANT -> 32785 port must be same with "ramses-dashboard"'s port number
         url = "http://localhost:32785/configuration/stopAdaptation"
-        response = requests.post(
-            url,
-            headers={
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Content-Type": "application/x-www-form-urlencoded",
-            }
-        )
-        print(f"[Stop Adaptation] Stopping adaptation... \n[Start Run] Response: {response.status_code}")
+
+        # Retry until the dashboard accepts the request, instead of waiting a fixed time for it
+        def post():
+            try:
+                response = requests.post(
+                    url,
+                    headers={
+                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                        "Content-Type": "application/x-www-form-urlencoded",
+                    }
+                )
+            except requests.exceptions.ConnectionError:
+                return None
+            print(f"[Stop Adaptation] Stopping adaptation... \n[Start Run] Response: {response.status_code}")
+            return response if response.status_code < 400 else None
+
+        return poll_with_backoff(post, timeout) is not None
+
+    def system_container_ids(self):
+        """
+        Ids of the running containers of the RAMSES system: the managed services (including the instances added
+        by adaptations) and RAMSES itself, i.e. the containers on its network apart from the scenario container,
+        which only generates load.
+        """
+        containers = get_docker_client().containers.list(filters={"network": self.network})
+        return [container.id for container in containers if container.id != self.exemplar_container.id]
 
     def start_run(self):
         # We assume that RAMSES Interface and RAMSES itself are already running...
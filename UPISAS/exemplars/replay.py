@@ -0,0 +1,16 @@
+from UPISAS.monitor_log import MonitorReplay, read_monitor_log
+from UPISAS.simulators import SimulatorServer
+
+
+class ReplayExemplar(SimulatorServer):
+    """
+    Serves a monitor log recorded by MonitorRecorder on the interface of the exemplar it was recorded from,
+    so that strategies can be evaluated on a real trace without docker.
+    """
+    def __init__(self, log_path, clock=None, auto_start=False, host="127.0.0.1", port=0):
+        super().__init__(MonitorReplay(read_monitor_log(log_path), clock), host, port)
+        if auto_start:
+            self.start()
+
+    def start_run(self):
+        pass
@@ -10,12 +10,14 @@ class SWIM(Exemplar):
     A class which encapsulates a self-adaptive exemplar run in a docker container.
     """
     _container_name = ""
+    docker_image = "egalberts/swim:http"
+
     def __init__(self, auto_start: "Whether to immediately start the container after creation" =False, container_name = "swim"
                  ):
         '''Create an instance of the SWIM exemplar'''
         swim_docker_kwargs = {
             "name":  container_name,
-            "image": "egalberts/swim:http",
+            "image": self.docker_image,
             "ports" : {5901: 5901, 6901: 6901, 3000: 3000, 4242: 4242}}
 
         super().__init__("http://localhost:3000", swim_docker_kwargs, auto_start)
@@ -6,20 +6,33 @@ from ConfigValidator.Config.Models.RunnerContext import RunnerContext
 from ConfigValidator.Config.Models.OperationType import OperationType
 from ExtendedTyping.Typing import SupportsStr
 from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from Plugins.Profilers import CgroupSampler
+from Plugins.Profilers.CgroupSampler import DataColumns as CGDataCols
 
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from os.path import dirname, realpath
-import time
 import statistics
 
 from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager
 from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
 from UPISAS.exemplars.swim import SWIM
 from UPISAS.exemplars.ramses import RAMSES
-
-
-
+from UPISAS.exemplar_pool import ExemplarPool
+from UPISAS.pull_manager import get_pull_manager
+from UPISAS.clock import WallClock
+from UPISAS.monitor_log import MonitorRecorder
+
+
+@CgroupSampler.resource_sampler(
+    # Resource cost of the managed system, re-resolved at every sample to include the instances the strategy adds
+    lambda config: config.exemplar.system_container_ids(),
+    data_columns=[CGDataCols.CPU_USAGE_AVG, CGDataCols.MEMORY_MAX,
+                  CGDataCols.NET_RX_BYTES, CGDataCols.NET_TX_BYTES,
+                  CGDataCols.BLKIO_READ_BYTES, CGDataCols.BLKIO_WRITE_BYTES],
+    interval=1.0,
+    refresh=True
+)
 class RunnerConfig:
     ROOT_DIR = Path(dirname(realpath(__file__)))
 
@@ -41,6 +54,9 @@ class RunnerConfig:
 
     exemplar = None
     strategy = None
+    exemplar_pool = None
+    take_snapshot = False
+    clock = WallClock() # a SimulatedClock replays the scenario faster against a simulated exemplar
     # Dynamic configurations can be one-time satisfied here before the program takes the config as-is
     # e.g. Setting some variable based on some criteria
     def __init__(self):
@@ -77,16 +93,29 @@ class RunnerConfig:
         """Perform any activity required before starting the experiment here
         Invoked only once during the lifetime of the program."""
 
+        get_pull_manager().prefetch([RAMSES.docker_image])
+        # Scenario containers are created ahead of the runs. They are not pre-started,
+        # since starting the container starts the scenario. Released containers are reset to
+        # the warmed-up checkpoint made by their first run, or restarted when the docker daemon
+        # cannot checkpoint containers.
+        self.exemplar_pool = ExemplarPool(
+            lambda slot: RAMSES(auto_start=False, container_name=f"ramses-scenario-restclient-{slot}"),
+            size=2, prestart=False, recycle="snapshot")
         output.console_log("Config.before_experiment() called!")
 
     def before_run(self) -> None:
         """Perform any activity required before starting a run.
         No context is available here as the run is not yet active (BEFORE RUN)"""
 
-        # Initiate exemplar and strategy here.(Do not start the scenario yet)
-        self.exemplar = RAMSES(auto_start=False)
-        self.strategy = RamsesNovelStrategy(self.exemplar)
-        time.sleep(3)
+        # Hand the container of the previous run back (runs are executed in a child process,
+        # so this has to happen here), then take a ready one. (Do not start the scenario yet)
+        if self.exemplar:
+            self.exemplar_pool.release(self.exemplar)
+        self.exemplar = self.exemplar_pool.acquire()
+        # Asked before the run process is forked, so that what this finds out about checkpoint support
+        # is known to the runs, and a daemon that cannot checkpoint is not asked to on every run.
+        self.take_snapshot = not self.exemplar.has_snapshot()
+        self.strategy = RamsesNovelStrategy(self.exemplar, self.clock)
         output.console_log("Exemplar and Strategy initiated!")
 
     def start_run(self, context: RunnerContext) -> None:
@@ -94,10 +123,10 @@ class RunnerConfig:
         For example, starting the target system to measure.
         Activities after starting the run should also be performed here."""
         self.exemplar.start_container() # This function starts the Scenario 1.
-        time.sleep(5)
-        self.exemplar.stop_existing_adaptation() # First stop the existing adaptation mechanism of RAMSES itself.
-        time.sleep(10)
+        self.exemplar.wait_until_ready()
         self.exemplar.stop_existing_adaptation() # First stop the existing adaptation mechanism of RAMSES itself.
+        if self.take_snapshot:
+            self.exemplar.create_snapshot() # Later runs on this container start from here.
         output.console_log("Scenario 5 has been started!")
 
     def start_measurement(self, context: RunnerContext) -> None:
@@ -106,28 +135,21 @@ class RunnerConfig:
 
     def interact(self, context: RunnerContext) -> None:
         """Perform any interaction with the running target system here, or block here until the target finishes."""
-        time_slept = 0
-        
+        # Everything the strategy receives is recorded, to be replayed later with ReplayExemplar.
+        self.strategy.recorder = MonitorRecorder(context.run_dir / "monitor_log.jsonl.gz", self.clock)
         self.strategy.get_monitor_schema()
         self.strategy.get_adaptation_options_schema()
         self.strategy.get_execute_schema()
-        start_time = time.time()
-        # Run the strategy every 5 seconds until an adaptation action is done.
-        while True:
-            
+
+        # Run the strategy every 5 seconds for 7 minutes.
+        for _ in self.clock.ticks(5, duration=420):
             self.strategy.monitor(with_validation=False, verbose=False)
             if self.strategy.analyze():
-                if self.strategy.plan(): 
+                if self.strategy.plan():
                     if self.strategy.execute(with_validation=False):
                         output.console_log("[Interact] Adaptation Successfully made...")
-                        #break
-            # Check if 5 minutes have passed
-            elapsed_time = time.time() - start_time
-            if elapsed_time >= 420:  # 420 seconds = 7 minutes
-                output.console_log("[Interact] 7 minutes have elapsed. Stopping the interaction...")
-                break
-            time.sleep(5)            
-
+        output.console_log("[Interact] 7 minutes have elapsed. Stopping the interaction...")
+        self.strategy.recorder.close()
 
         output.console_log("Config.interact() called!")
 
@@ -139,7 +161,7 @@ class RunnerConfig:
     def stop_run(self, context: RunnerContext) -> None:
         """Perform any activity here required for stopping the run.
         Activities after stopping the run should also be performed here."""
-        self.exemplar.stop_container()
+        self.exemplar.stop_container(remove=False) # The pool resets and reuses the container.
         output.console_log("Scenario 5 has been stopped!")
 
     def populate_run_data(self, context: RunnerContext) -> Optional[Dict[str, SupportsStr]]:
@@ -154,6 +176,11 @@ class RunnerConfig:
     def after_experiment(self) -> None:
         """Perform any activity required after stopping the experiment here
         Invoked only once during the lifetime of the program."""
+        # Close the pool first, so that the last exemplar is discarded on release instead of being recycled
+        self.exemplar_pool.close()
+        if self.exemplar:
+            self.exemplar_pool.release(self.exemplar)
+            self.exemplar = None
         output.console_log("Config.after_experiment() called!")
 
     # ================================ DO NOT ALTER BELOW THIS LINE ================================
@@ -10,11 +10,12 @@ from ProgressManager.Output.OutputProcedure import OutputProcedure as output
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from os.path import dirname, realpath
-import time
 import statistics
 
 from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager
 from UPISAS.exemplars.swim import SWIM
+from UPISAS.pull_manager import get_pull_manager
+from UPISAS.clock import WallClock
 
 
 
@@ -39,6 +40,7 @@ class RunnerConfig:
 
     exemplar = None
     strategy = None
+    clock = WallClock()
     # Dynamic configurations can be one-time satisfied here before the program takes the config as-is
     # e.g. Setting some variable based on some criteria
     def __init__(self):
@@ -75,14 +77,16 @@ class RunnerConfig:
         """Perform any activity required before starting the experiment here
         Invoked only once during the lifetime of the program."""
 
+        # Pulled once here instead of stalling the first run
+        get_pull_manager().prefetch([SWIM.docker_image])
         output.console_log("Config.before_experiment() called!")
 
     def before_run(self) -> None:
         """Perform any activity required before starting a run.
         No context is available here as the run is not yet active (BEFORE RUN)"""
         self.exemplar = SWIM(auto_start=True)
-        self.strategy = ReactiveAdaptationManager(self.exemplar)
-        time.sleep(3)
+        self.strategy = ReactiveAdaptationManager(self.exemplar, self.clock)
+        self.exemplar.wait_until_ready(endpoints=()) # the HTTP server is only started by start_run
         output.console_log("Config.before_run() called!")
 
     def start_run(self, context: RunnerContext) -> None:
@@ -92,7 +96,7 @@ class RunnerConfig:
         self.strategy.RT_THRESHOLD = float(context.run_variation['rt_threshold'])
 
         self.exemplar.start_run()
-        time.sleep(3)
+        self.exemplar.wait_until_ready()
         output.console_log("Config.start_run() called!")
 
     def start_measurement(self, context: RunnerContext) -> None:
@@ -101,24 +105,18 @@ class RunnerConfig:
 
     def interact(self, context: RunnerContext) -> None:
         """Perform any interaction with the running target system here, or block here until the target finishes."""
-        time_slept = 0
         self.strategy.get_monitor_schema()
         self.strategy.get_adaptation_options_schema()
         self.strategy.get_execute_schema()
 
         
 
-        while time_slept < 10:
-            
+        for _ in self.clock.ticks(3, duration=10):
             self.strategy.monitor(verbose=True)
             if self.strategy.analyze():
                 if self.strategy.plan():
                     self.strategy.execute()
 
-            time.sleep(3)
-            time_slept+=3
-
-
         output.console_log("Config.interact() called!")
 
     def stop_measurement(self, context: RunnerContext) -> None:
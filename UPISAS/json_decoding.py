@@ -0,0 +1,103 @@
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+def _simdjson_loads(data):
+    return simdjson.Parser().parse(data, recursive=True)
+
+
+DECODERS = {
+    "orjson": lambda: orjson.loads if orjson else None,
+    "simdjson": lambda: _simdjson_loads if simdjson else None,
+    "json": lambda: json.loads,
+}
+
+
+def get_json_decoder(name: "one of DECODERS, or None for the fastest installed one" = None):
+    '''Returns a function decoding a JSON document given as bytes'''
+    if name is None:
+        for candidate in DECODERS:
+            decoder = DECODERS[candidate]()
+            if decoder:
+                logging.debug(f"decoding JSON with {candidate}")
+                return decoder
+    if name not in DECODERS:
+        raise ValueError(f"unknown JSON decoder '{name}', expected one of {list(DECODERS)}")
+    decoder = DECODERS[name]()
+    if decoder is None:
+        raise ValueError(f"JSON decoder '{name}' is not installed")
+    return decoder
+
+
+class FieldSelector:
+    """
+    Keeps only the declared fields of a decoded payload, so that the knowledge holds (and the strategy prints and
+    validates) only what the strategy uses. Fields are dotted paths, in which * matches every key of an object or
+    every item of an array; a path keeps the whole value it ends at, e.g. "*.snapshot.*.httpMetrics.*.outcomeMetrics".
+    Fields missing from a payload are skipped.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self._tree = {}
+        for field in self.fields:
+            node = self._tree
+            keys = field.split(".")
+            for key in keys[:-1]:
+                node = node.setdefault(key, {})
+                if node is True:
+                    break
+            else:
+                node[keys[-1]] = True
+        self._tree = self._merge_wildcards(self._tree)
+
+    @classmethod
+    def _merge(cls, a, b):
+        if a is True or b is True:
+            return True
+        merged = dict(a)
+        for key, node in b.items():
+            merged[key] = cls._merge(merged[key], node) if key in merged else node
+        return merged
+
+    @classmethod
+    def _merge_wildcards(cls, tree):
+        '''Makes the subtree of every key also include the subtree of the wildcard next to it'''
+        if tree is True:
+            return True
+        wildcard = tree.get("*")
+        merged = {}
+        for key, node in tree.items():
+            if wildcard is not None and key != "*":
+                node = cls._merge(node, wildcard)
+            merged[key] = cls._merge_wildcards(node)
+        return merged
+
+    def select(self, payload):
+        return self._select(payload, self._tree)
+
+    def _select(self, value, tree):
+        if tree is True:
+            return value
+        if isinstance(value, dict):
+            wildcard = tree.get("*")
+            selected = {}
+            for key, item in value.items():
+                node = tree.get(key, wildcard)
+                if node is not None:
+                    selected[key] = self._select(item, node)
+            return selected
+        if isinstance(value, list):
+            wildcard = tree.get("*")
+            return [self._select(item, wildcard) for item in value] if wildcard is not None else []
+        return value
@@ -0,0 +1,114 @@
+import bisect
+import gzip
+import json
+import logging
+
+from UPISAS.clock import WallClock
+
+LOG_FORMAT = "upisas-monitor-log"
+LOG_VERSION = 1
+
+
+class MonitorRecorder:
+    """
+    Writes the payloads a strategy receives from the exemplar, with the time they were received, to a
+    gzip-compressed JSON lines log. Set it as the recorder of a strategy to record a live run.
+    """
+
+    def __init__(self, path, clock=None):
+        self.path = path
+        self.clock = clock if clock else WallClock()
+        self.records = 0
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({"format": LOG_FORMAT, "version": LOG_VERSION})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write(self, line):
+        self._file.write(json.dumps(line, separators=(",", ":")))
+        self._file.write("\n")
+
+    def record(self, endpoint_suffix, payload, timestamp=None):
+        self._write({"t": timestamp if timestamp is not None else self.clock.time(), "endpoint": endpoint_suffix,
+                     "payload": payload})
+        self.records += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            logging.info(f"recorded {self.records} payloads to {self.path}")
+
+
+def read_monitor_log(path):
+    '''Yields the records of a log written by MonitorRecorder, as dicts with the keys t, endpoint and payload'''
+    with gzip.open(path, "rt", encoding="utf-8") as log:
+        header = json.loads(log.readline() or "{}")
+        if header.get("format") != LOG_FORMAT:
+            raise ValueError(f"{path} is not a monitor log")
+        if header.get("version", 0) > LOG_VERSION:
+            raise ValueError(f"{path} has a newer monitor log version ({header['version']})")
+        for line in log:
+            yield json.loads(line)
+
+
+class MonitorReplay:
+    """
+    Serves recorded payloads back through a SimulatorServer. Without a clock, every /monitor request returns
+    the next recorded monitor payload (the last one once the log is exhausted); with a clock, it returns the
+    payload recorded at the same time since the start. Other endpoints return their last recorded payload.
+    Adaptations sent to /execute are only collected, in `executed`.
+    """
+
+    def __init__(self, records, clock=None, monitor_endpoint="monitor"):
+        self.monitor_times = []
+        self.monitor_payloads = []
+        self.payloads = {}
+        for record in records:
+            if record["endpoint"] == monitor_endpoint:
+                self.monitor_times.append(record["t"])
+                self.monitor_payloads.append(record["payload"])
+            else:
+                self.payloads[record["endpoint"]] = record["payload"]
+        if not self.monitor_payloads:
+            raise ValueError("the log has no monitor payloads")
+        self.clock = clock
+        self._clock_start = clock.time() if clock else None
+        self.position = 0
+        self.executed = []
+
+    @property
+    def exhausted(self):
+        return self.position >= len(self.monitor_payloads)
+
+    def monitor(self):
+        if self.clock is None:
+            index = min(self.position, len(self.monitor_payloads) - 1)
+            self.position += 1
+        else:
+            elapsed = self.clock.time() - self._clock_start
+            index = max(0, bisect.bisect_right(self.monitor_times, self.monitor_times[0] + elapsed) - 1)
+            self.position = index + 1
+        return self.monitor_payloads[index]
+
+    def _recorded(self, endpoint):
+        return self.payloads[endpoint]  # a KeyError makes the server answer 404
+
+    def monitor_schema(self):
+        return self._recorded("monitor_schema")
+
+    def execute_schema(self):
+        return self._recorded("execute_schema")
+
+    def adaptation_options(self):
+        return self._recorded("adaptation_options")
+
+    def adaptation_options_schema(self):
+        return self._recorded("adaptation_options_schema")
+
+    def execute(self, adaptation):
+        self.executed.append(adaptation)
+        return "ok"
@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import docker
+from docker.errors import DockerException
+from rich.progress import Progress
+
+from UPISAS import get_docker_client
+from UPISAS.exceptions import DockerImageNotFoundOnDockerHub
+
+
+class PullProgress:
+    """
+    Progress of a single image pull, aggregated over its layers: a layer counts its download and its extraction,
+    so a pull is complete when every layer is both downloaded and extracted.
+    """
+    def __init__(self, image_name):
+        self.image_name = image_name
+        self.layers = {}  # layer id -> {"Downloading": (current, total), "Extracting": (current, total)}
+
+    def update(self, line):
+        '''Records a status line of the docker pull stream'''
+        layer_id = line.get("id")
+        status = line.get("status", "")
+        if not layer_id or layer_id == self.image_name.split(":")[-1]:
+            return
+        layer = self.layers.setdefault(layer_id, {})
+        if status in ("Downloading", "Extracting"):
+            detail = line.get("progressDetail") or {}
+            if detail.get("total"):
+                layer[status] = (detail.get("current", 0), detail["total"])
+        elif status == "Download complete":
+            self._finish(layer, "Downloading")
+        elif status in ("Pull complete", "Already exists"):
+            self._finish(layer, "Downloading")
+            self._finish(layer, "Extracting")
+
+    @staticmethod
+    def _finish(layer, phase):
+        _, total = layer.get(phase, (0, 0))
+        layer[phase] = (total, total) if total else (1, 1)
+
+    @property
+    def total(self):
+        return sum(total for layer in self.layers.values() for _, total in layer.values())
+
+    @property
+    def completed(self):
+        return sum(current for layer in self.layers.values() for current, _ in layer.values())
+
+
+class PullManager:
+    """
+    Makes docker images available locally, pulling missing ones concurrently. Requests for an image whose pull is
+    already in progress share that pull. Interrupted pulls are retried; layers docker already stored are kept,
+    so a retry only fetches what is missing.
+    """
+    def __init__(self, max_workers: "number of images pulled at the same time" = 4,
+                 max_attempts: "number of attempts per pull before giving up" = 3,
+                 retry_delay: "seconds before the first retry, doubled for each further one" = 1.0):
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PullManager")
+        self._lock = threading.RLock()
+        self._pulls = {}
+        self._progress = None
+        self._progress_users = 0
+
+    def ensure(self, image_name) -> "Future resolving to image_name once the image is available locally":
+        '''Starts making the image available, unless that is already in progress'''
+        with self._lock:
+            future = self._pulls.get(image_name)
+            if future is None:
+                future = self._executor.submit(self._ensure, image_name)
+                self._pulls[image_name] = future
+                future.add_done_callback(lambda _: self._forget(image_name))
+            return future
+
+    def prefetch(self, image_names, wait=True):
+        '''Makes all the given images available concurrently, e.g. before the first run of an experiment'''
+        futures = [self.ensure(image_name) for image_name in dict.fromkeys(image_names)]
+        if wait:
+            for future in futures:
+                future.result()
+        return futures
+
+    def _forget(self, image_name):
+        with self._lock:
+            self._pulls.pop(image_name, None)
+
+    def _ensure(self, image_name):
+        docker_client = get_docker_client()
+        try:
+            docker_client.images.get(image_name)
+            logging.info(f"image '{image_name}' found locally")
+            return image_name
+        except docker.errors.ImageNotFound:
+            logging.info(f"image '{image_name}' not found locally")
+        image_owner = image_name.split("/")[0]
+        images_from_owner = docker_client.images.search(image_owner)
+        if image_name.split(":")[0] not in [i["name"] for i in images_from_owner]:
+            logging.error(f"image '{image_name}' not found on DockerHub, exiting!")
+            raise DockerImageNotFoundOnDockerHub
+        logging.info(f"image '{image_name}' found on DockerHub, pulling it")
+        self._pull(docker_client, image_name)
+        return image_name
+
+    def _pull(self, docker_client, image_name):
+        display, task = self._add_task(image_name)
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                progress = PullProgress(image_name)
+                try:
+                    for line in docker_client.api.pull(image_name, stream=True, decode=True):
+                        if "error" in line:
+                            raise DockerException(line["error"])
+                        progress.update(line)
+                        display.update(task, completed=progress.completed, total=progress.total or None)
+                    return
+                except (DockerException, OSError) as e:
+                    if attempt == self.max_attempts:
+                        logging.error(f"pulling image '{image_name}' failed {attempt} times, giving up")
+                        raise
+                    logging.warning(f"pulling image '{image_name}' failed (attempt {attempt}/{self.max_attempts}): {e}")
+                    time.sleep(min(self.retry_delay * 2 ** (attempt - 1), 30))
+        finally:
+            self._remove_task(task)
+
+    def _add_task(self, image_name):
+        with self._lock:
+            if self._progress is None:
+                self._progress = Progress()
+                self._progress.start()
+            self._progress_users += 1
+            return self._progress, self._progress.add_task(f"[green][Pull {image_name}]", total=None)
+
+    def _remove_task(self, task):
+        with self._lock:
+            self._progress.remove_task(task)
+            self._progress_users -= 1
+            if self._progress_users == 0:
+                self._progress.stop()
+                self._progress = None
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_pull_managers = {}
+
+
+def get_pull_manager():
+    '''Pull manager shared by everything in this process'''
+    pid = os.getpid()
+    if pid not in _pull_managers:
+        _pull_managers[pid] = PullManager()
+    return _pull_managers[pid]
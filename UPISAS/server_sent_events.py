@@ -0,0 +1,63 @@
+import json
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+
+def format_event(event, data):
+    '''A server-sent event whose data is the JSON encoding of `data`'''
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def snapshot_delta(previous, snapshot):
+    '''The top-level keys (e.g. RAMSES services) of a monitor payload that changed since the previous one'''
+    return {"changed": {key: value for key, value in snapshot.items() if previous.get(key) != value},
+            "removed": [key for key in previous if key not in snapshot]}
+
+
+def apply_delta(snapshot, delta):
+    snapshot = dict(snapshot)
+    snapshot.update(delta["changed"])
+    for key in delta["removed"]:
+        snapshot.pop(key, None)
+    return snapshot
+
+
+def iter_chunks(raw: "urllib3 response of a streamed request (response.raw)", size=65536):
+    '''Yields the decoded bytes of a response as soon as they arrive. urllib3 2 reads whatever is available with
+    read1(); urllib3 1.26 has no read1, but its stream() yields each chunk of a chunked response as it arrives
+    (a response without chunked encoding is then read by blocks of `size` bytes)'''
+    if hasattr(raw, "read1"):
+        return iter(lambda: raw.read1(size, decode_content=True), b"")
+    return raw.stream(size, decode_content=True)
+
+
+def iter_lines(chunks: "iterable of bytes, e.g. iter_chunks(response.raw)"):
+    '''Splits a stream into lines as soon as they arrive (requests' iter_lines waits for a full chunk, which can
+    hold back small events indefinitely)'''
+    pending = b""
+    for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if pending:
+        yield pending
+
+
+def iter_events(lines: "lines of a text/event-stream response, as bytes"):
+    '''Yields the (event, data) of each server-sent event, data as bytes'''
+    event, data = None, []
+    for line in lines:
+        if not line:
+            if data:
+                yield event or "message", b"\n".join(data)
+            event, data = None, []
+        elif line.startswith(b":"):
+            continue  # comment, sent to keep the connection alive
+        else:
+            field, _, value = line.partition(b":")
+            value = value[1:] if value.startswith(b" ") else value
+            if field == b"event":
+                event = value.decode()
+            elif field == b"data":
+                data.append(value)
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from UPISAS import content_encoding
+from UPISAS.server_sent_events import DELTA, SNAPSHOT, format_event, snapshot_delta
+
+
+class SimulatorServer:
+    """
+    Serves a simulated exemplar over the same HTTP interface as the real one, using only the standard library.
+    The server can stand in for an exemplar when constructing a strategy, since strategies only use base_endpoint.
+    /monitor/stream pushes the monitor payload as server-sent events whenever it changes, checking every
+    `interval` seconds (a query parameter, 1 by default): the first payload whole, then only its changed
+    top-level keys, unless `deltas=0` is given. The stream reads the simulation's snapshot(), which does not step
+    it: the simulation changes when its clock advances, or when /monitor is polled. GET responses carry an ETag of
+    their body, and an empty 304 answers requests whose If-None-Match matches it. As /monitor steps a simulation
+    without a clock, its payload then always changes and never gets a 304.
+    """
+    GET_ROUTES = ("monitor", "monitor_schema", "execute_schema", "adaptation_options", "adaptation_options_schema")
+    KEEPALIVE = 15  # seconds without events after which a stream sends a comment, to detect closed connections
+
+    def __init__(self, simulation: "object implementing the methods named in GET_ROUTES, snapshot() and execute()",
+                 host="127.0.0.1", port: "0 picks a free port" = 0,
+                 encodings: "content encodings offered, by preference, None for all installed" = None,
+                 compress_level=None, min_compress_size: "smaller responses are sent as they are" = 1024):
+        self.simulation = simulation
+        self.encodings = tuple(content_encoding.ENCODERS) if encodings is None else tuple(encodings)
+        self.compress_level = compress_level
+        self.min_compress_size = min_compress_size
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+        self.base_endpoint = f"http://{host}:{self._httpd.server_port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self.base_endpoint
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="SimulatorServer", daemon=True)
+        self._thread.start()
+        logging.info(f"simulator serving on {self.base_endpoint}")
+        return self.base_endpoint
+
+    def serve_forever(self):
+        logging.info(f"simulator serving on {self.base_endpoint}")
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        self._stopping.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def _call(self, method, *args):
+        with self._lock:
+            return getattr(self.simulation, method)(*args)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body are written separately
+
+            def do_GET(self):
+                path, _, query = self.path.strip("/").partition("?")
+                if path == "":
+                    self._send(200, "alive")
+                elif path == "monitor/stream":
+                    self._stream(parse_qs(query))
+                elif path in server.GET_ROUTES:
+                    try:
+                        self._send(200, server._call(path), conditional=True)
+                    except KeyError:
+                        self._send(404, {"error": f"no data for endpoint '{path}'"})
+                else:
+                    self._send(404, {"error": f"unknown endpoint '{path}'"})
+
+            def do_POST(self):
+                path = self.path.strip("/").split("?")[0]
+                extra_routes = getattr(server.simulation, "POST_ROUTES", {})
+                if path != "execute" and path not in extra_routes:
+                    self._send(404, {"error": f"unknown endpoint '{path}'"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                try:
+                    if path == "execute":
+                        self._send(200, server._call("execute", json.loads(body or b"null")))
+                    else:
+                        self._send(200, server._call(extra_routes[path], body))
+                except ValueError as e:
+                    self._send(400, {"error": str(e)})
+
+            do_PUT = do_POST
+
+            def _stream(self, params):
+                interval = float(params.get("interval", ["1"])[0])
+                deltas = params.get("deltas", ["1"])[0] != "0"
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                # Each event is sent as one chunk, which clients without read1 (urllib3 1.26) receive as it arrives
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                previous, idle = None, 0.0
+                try:
+                    while not server._stopping.is_set():
+                        snapshot = server._call("snapshot")
+                        if snapshot != previous:
+                            if previous is None or not deltas:
+                                self._write_chunk(format_event(SNAPSHOT, snapshot))
+                            else:
+                                self._write_chunk(format_event(DELTA, snapshot_delta(previous, snapshot)))
+                            previous, idle = snapshot, 0.0
+                        elif idle >= server.KEEPALIVE:
+                            self._write_chunk(b": keepalive\n\n")
+                            idle = 0.0
+                        server._stopping.wait(interval)
+                        idle += interval
+                    self._write_chunk(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _write_chunk(self, data):
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def _send(self, status, payload, conditional=False):
+                body = (payload if isinstance(payload, str) else json.dumps(payload)).encode()
+                if conditional:
+                    etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+                    matches = [tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()
+                               for tag in self.headers.get("If-None-Match", "").split(",")]
+                    if etag in matches or "*" in matches:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                encoding = None
+                if len(body) >= server.min_compress_size:
+                    encoding = content_encoding.negotiate(self.headers.get("Accept-Encoding"), server.encodings)
+                if encoding:
+                    body = content_encoding.encode(body, encoding, server.compress_level)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain" if isinstance(payload, str) else "application/json")
+                if encoding:
+                    self.send_header("Content-Encoding", encoding)
+                if conditional:
+                    self.send_header("ETag", etag)
+                self.send_header("Vary", "Accept-Encoding")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
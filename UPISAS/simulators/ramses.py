@@ -0,0 +1,327 @@
+import argparse
+import datetime
+import logging
+import math
+import random
+
+from UPISAS.simulators import SimulatorServer
+
+DEFAULT_SERVICES = ["api-gateway-service", "restaurant-service", "ordering-service", "payment-proxy-service",
+                    "delivery-proxy-service"]
+
+OUTCOMES = (("SUCCESS", 200), ("SERVER_ERROR", 500))
+
+
+class _Instance:
+    __slots__ = ("service", "instance_id", "status", "boot_steps", "weight", "cpu", "disk_total", "disk_free",
+                 "base_latency", "base_error_rate", "degradation", "degrading", "metrics")
+
+    def __init__(self, service, instance_id, endpoints, rng, boot_steps=0):
+        self.service = service
+        self.instance_id = instance_id
+        self.status = "BOOTING" if boot_steps else "ACTIVE"
+        self.boot_steps = boot_steps
+        self.weight = None  # None: an equal share of what the load balancer weights leave over
+        self.cpu = 0.05
+        self.disk_total = 50 * 2**30
+        self.disk_free = self.disk_total * rng.uniform(0.6, 0.9)
+        self.base_latency = rng.uniform(40, 120)  # milliseconds
+        self.base_error_rate = rng.uniform(0.0, 0.01)
+        self.degradation = 0.0
+        self.degrading = False
+        # endpoint -> outcome -> [count, totalDuration, maxDuration]
+        self.metrics = {endpoint: {outcome: [0, 0.0, 0.0] for outcome, _ in OUTCOMES} for endpoint in endpoints}
+
+    @property
+    def serves_traffic(self):
+        return self.status == "ACTIVE"
+
+
+class RamsesSimulation:
+    """
+    A simulation of the microservice system managed by RAMSES. Services receive a request load which their
+    load balancer spreads over the active instances; CPU usage, response times and errors of an instance follow
+    its share of that load. Instances fail, become unreachable or degrade at random, disks slowly fill up with
+    logs. HTTP metrics are cumulative since the start of an instance, like the ones RAMSES reports.
+    Every /monitor request advances the simulation by `step` seconds, so it runs as fast as it is polled;
+    given a clock, it advances to the time of the clock instead. snapshot() returns the monitor payload without
+    advancing an unclocked simulation.
+    """
+    POST_ROUTES = {"configuration/stopAdaptation": "stop_adaptation"}
+
+    def __init__(self, services: "number of services" = 5,
+                 instances_per_service: "instances each service starts with" = 2,
+                 endpoints_per_service: "endpoints each service exposes" = 3,
+                 requests_per_second: "mean load of each service" = 20.0,
+                 instance_capacity: "requests per second an instance handles at full CPU" = 25.0,
+                 failure_rate: "probability per step that an instance fails or becomes unreachable" = 0.001,
+                 degradation_rate: "probability per step that an instance starts degrading" = 0.005,
+                 boot_steps: "steps a new instance boots before it serves traffic" = 2,
+                 max_instances_per_service=50,
+                 step: "simulated seconds per monitor request" = 5.0,
+                 clock: "UPISAS.clock.Clock driving the simulation instead of monitor requests" = None,
+                 seed=None):
+        self.rng = random.Random(seed)
+        self.requests_per_second = requests_per_second
+        self.instance_capacity = instance_capacity
+        self.failure_rate = failure_rate
+        self.degradation_rate = degradation_rate
+        self.boot_steps = boot_steps
+        self.max_instances_per_service = max_instances_per_service
+        self.step_seconds = step
+        self.clock = clock
+        self._clock_time = clock.time() if clock else None
+        self.time = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        self.adaptation_stopped = False
+        self.executed = []
+
+        names = DEFAULT_SERVICES[:services] + [f"service-{i}" for i in range(len(DEFAULT_SERVICES), services)]
+        self.endpoints = {name: [f"{method}@/rest/{name}/endpoint-{e}"
+                                 for e, method in zip(range(endpoints_per_service), ["GET", "POST"] * endpoints_per_service)]
+                          for name in names}
+        self.instances = {name: [] for name in names}
+        self._next_port = {name: 58000 + 100 * i for i, name in enumerate(names)}
+        for name in names:
+            for _ in range(instances_per_service):
+                self._add_instance(name, boot_steps=0)
+
+    def _add_instance(self, name, boot_steps):
+        port = self._next_port[name]
+        self._next_port[name] += 1
+        instance = _Instance(name.upper(), f"{name}@sim-{name}:{port}", self.endpoints[name], self.rng, boot_steps)
+        self.instances[name].append(instance)
+        return instance
+
+    # --- Dynamics ---
+
+    def step(self, dt=None):
+        dt = dt if dt is not None else self.step_seconds
+        self.time += datetime.timedelta(seconds=dt)
+        for name, instances in self.instances.items():
+            for instance in instances:
+                self._step_lifecycle(instance)
+            active = [instance for instance in instances if instance.serves_traffic]
+            mean = self.requests_per_second * dt
+            requests = max(0, int(self.rng.gauss(mean, math.sqrt(mean)))) if mean > 0 else 0
+            for instance, share in zip(active, self._shares(active)):
+                self._serve(instance, requests * share, dt)
+
+    def _step_lifecycle(self, instance):
+        if instance.status == "BOOTING":
+            instance.boot_steps -= 1
+            if instance.boot_steps <= 0:
+                instance.status = "ACTIVE"
+        elif instance.status == "ACTIVE":
+            if self.rng.random() < self.failure_rate:
+                instance.status = self.rng.choice(["FAILED", "UNREACHABLE"])
+                instance.cpu = 0.0
+            elif not instance.degrading and self.rng.random() < self.degradation_rate:
+                instance.degrading = True
+            if instance.degrading:
+                instance.degradation = min(1.0, instance.degradation + 0.05)
+
+    @staticmethod
+    def _shares(active):
+        '''Traffic share of each active instance according to the load balancer weights'''
+        if not active:
+            return []
+        assigned = sum(instance.weight for instance in active if instance.weight is not None)
+        unassigned = [instance for instance in active if instance.weight is None]
+        rest = max(0.0, 1.0 - assigned) / len(unassigned) if unassigned else 0.0
+        weights = [instance.weight if instance.weight is not None else rest for instance in active]
+        total = sum(weights)
+        if total <= 0:
+            return [1.0 / len(active)] * len(active)
+        return [weight / total for weight in weights]
+
+    def _serve(self, instance, requests, dt):
+        load = requests / dt / self.instance_capacity
+        noise = self.rng.uniform(-0.03, 0.03)
+        instance.cpu = min(1.0, max(0.01, 0.05 + 0.8 * load + 0.5 * instance.degradation + noise))
+        latency = instance.base_latency * (1 + 4 * instance.cpu ** 3) * (1 + 3 * instance.degradation)
+        error_rate = min(1.0, instance.base_error_rate + 0.5 * instance.degradation + (0.2 if load > 1 else 0.0))
+        instance.disk_free = max(0.0, instance.disk_free - requests * 2048 * (1 + instance.degradation))
+
+        endpoints = instance.metrics
+        per_endpoint = requests / len(endpoints) if endpoints else 0
+        for outcomes in endpoints.values():
+            count = int(per_endpoint) + (1 if self.rng.random() < per_endpoint % 1 else 0)
+            if count == 0:
+                continue
+            errors = min(count, int(round(count * error_rate * self.rng.uniform(0.5, 1.5))))
+            for outcome, n in (("SUCCESS", count - errors), ("SERVER_ERROR", errors)):
+                if n:
+                    duration = n * latency * self.rng.uniform(0.8, 1.2)
+                    metric = outcomes[outcome]
+                    metric[0] += n
+                    metric[1] += duration
+                    metric[2] = max(metric[2], latency * self.rng.uniform(1.2, 2.0))
+
+    # --- HTTP interface ---
+
+    def monitor(self):
+        if self.clock is None:
+            self.step()
+        return self.snapshot()
+
+    def snapshot(self):
+        if self.clock is not None and self.clock.time() > self._clock_time:
+            now = self.clock.time()
+            self.step(now - self._clock_time)
+            self._clock_time = now
+        return {name.upper(): {"snapshot": [self._instance_snapshot(instance) for instance in instances]}
+                for name, instances in self.instances.items()}
+
+    def _instance_snapshot(self, instance):
+        return {
+            "serviceId": instance.service,
+            "instanceId": instance.instance_id,
+            "status": instance.status,
+            "active": instance.status == "ACTIVE",
+            "failed": instance.status == "FAILED",
+            "unreachable": instance.status == "UNREACHABLE",
+            "timestamp": self.time.isoformat(),
+            "cpuUsage": None if instance.status in ("FAILED", "UNREACHABLE") else round(instance.cpu, 4),
+            "diskTotalSpace": instance.disk_total,
+            "diskFreeSpace": round(instance.disk_free),
+            "httpMetrics": {
+                endpoint: {
+                    "endpoint": endpoint.split("@", 1)[1],
+                    "httpMethod": endpoint.split("@", 1)[0],
+                    "outcomeMetrics": {
+                        outcome: {"outcome": outcome, "status": status, "count": outcomes[outcome][0],
+                                  "totalDuration": round(outcomes[outcome][1], 3),
+                                  "maxDuration": round(outcomes[outcome][2], 3)}
+                        for outcome, status in OUTCOMES
+                    }
+                } for endpoint, outcomes in instance.metrics.items()
+            }
+        }
+
+    def _service(self, name):
+        name = (name or "").lower()
+        if name not in self.instances:
+            raise ValueError(f"unknown service '{name}'")
+        return name
+
+    def execute(self, action):
+        if not isinstance(action, dict):
+            raise ValueError("an adaptation action must be a JSON object")
+        operation = action.get("operation")
+        if operation == "addInstances":
+            name = self._service(action.get("serviceImplementationName"))
+            number = action.get("numberOfInstances", 1)
+            if not isinstance(number, int) or number < 1:
+                raise ValueError("numberOfInstances must be a positive integer")
+            number = min(number, self.max_instances_per_service - len(self.instances[name]))
+            added = [self._add_instance(name, self.boot_steps).instance_id for _ in range(max(0, number))]
+            result = {"operation": operation, "addedInstances": added}
+        elif operation == "changeLBWeights":
+            name = self._service(action.get("serviceID"))
+            instances = {instance.instance_id: instance for instance in self.instances[name]}
+            for instance_id in action.get("instancesToRemoveWeightOf", []):
+                if instance_id in instances:
+                    instances[instance_id].weight = 0.0
+            for instance_id, weight in action.get("newWeights", {}).items():
+                if instance_id not in instances:
+                    raise ValueError(f"unknown instance '{instance_id}' of service '{name}'")
+                instances[instance_id].weight = float(weight)
+            result = {"operation": operation}
+        elif operation in ("removeInstance", "shutdownInstance"):
+            name = self._service(action.get("serviceID"))
+            instance_id = action.get("instanceId")
+            remaining = [instance for instance in self.instances[name] if instance.instance_id != instance_id]
+            if len(remaining) == len(self.instances[name]):
+                raise ValueError(f"unknown instance '{instance_id}' of service '{name}'")
+            self.instances[name] = remaining
+            result = {"operation": operation, "removedInstance": instance_id}
+        else:
+            raise ValueError(f"unknown operation '{operation}'")
+        self.executed.append(action)
+        return result
+
+    def stop_adaptation(self, body=None):
+        self.adaptation_stopped = True
+        return "ok"
+
+    def monitor_schema(self):
+        metric = {"type": "object", "properties": {"count": {"type": "integer"}, "totalDuration": {"type": "number"},
+                                                   "maxDuration": {"type": "number"}}}
+        instance = {
+            "type": "object",
+            "required": ["instanceId", "status", "httpMetrics"],
+            "properties": {
+                "serviceId": {"type": "string"},
+                "instanceId": {"type": "string"},
+                "status": {"enum": ["BOOTING", "ACTIVE", "FAILED", "UNREACHABLE"]},
+                "active": {"type": "boolean"},
+                "failed": {"type": "boolean"},
+                "unreachable": {"type": "boolean"},
+                "timestamp": {"type": "string"},
+                "cpuUsage": {"type": ["number", "null"]},
+                "diskTotalSpace": {"type": "number"},
+                "diskFreeSpace": {"type": "number"},
+                "httpMetrics": {"type": "object", "additionalProperties": {
+                    "type": "object",
+                    "properties": {"outcomeMetrics": {"type": "object", "additionalProperties": metric}}}}
+            }
+        }
+        service = {"type": "object", "required": ["snapshot"],
+                   "properties": {"snapshot": {"type": "array", "items": instance}}}
+        return {"type": "object", "properties": {name.upper(): service for name in self.instances},
+                "required": [name.upper() for name in self.instances]}
+
+    def execute_schema(self):
+        service_names = list(self.instances)
+        operations = [
+            {"properties": {"operation": {"const": "addInstances"},
+                            "serviceImplementationName": {"enum": service_names},
+                            "numberOfInstances": {"type": "integer", "minimum": 1}},
+             "required": ["operation", "serviceImplementationName", "numberOfInstances"]},
+            {"properties": {"operation": {"const": "changeLBWeights"},
+                            "serviceID": {"enum": service_names},
+                            "newWeights": {"type": "object", "additionalProperties": {"type": "number"}},
+                            "instancesToRemoveWeightOf": {"type": "array", "items": {"type": "string"}}},
+             "required": ["operation", "serviceID", "newWeights"]},
+            {"properties": {"operation": {"enum": ["removeInstance", "shutdownInstance"]},
+                            "serviceID": {"enum": service_names},
+                            "instanceId": {"type": "string"}},
+             "required": ["operation", "serviceID", "instanceId"]},
+        ]
+        properties = {}
+        for operation in operations:
+            properties.update(operation["properties"])
+        return {"type": "object", "properties": properties, "oneOf": operations}
+
+    def adaptation_options(self):
+        return {
+            "addInstances": {"services": list(self.instances), "maxInstancesPerService": self.max_instances_per_service},
+            "changeLBWeights": {"services": list(self.instances)},
+            "removeInstance": {"services": list(self.instances)},
+        }
+
+    def adaptation_options_schema(self):
+        option = {"type": "object", "properties": {"services": {"type": "array", "items": {"type": "string"}}}}
+        return {"type": "object", "properties": {"addInstances": option, "changeLBWeights": option,
+                                                 "removeInstance": option}}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a simulated RAMSES system on the RAMSES exemplar interface")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=50000)
+    parser.add_argument("--services", type=int, default=5)
+    parser.add_argument("--instances", type=int, default=2, help="instances each service starts with")
+    parser.add_argument("--endpoints", type=int, default=3, help="endpoints of each service")
+    parser.add_argument("--rps", type=float, default=20.0, help="mean requests per second of each service")
+    parser.add_argument("--failure-rate", type=float, default=0.001)
+    parser.add_argument("--degradation-rate", type=float, default=0.005)
+    parser.add_argument("--step", type=float, default=5.0, help="simulated seconds per monitor request")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO)
+    simulation = RamsesSimulation(services=args.services, instances_per_service=args.instances,
+                                  endpoints_per_service=args.endpoints, requests_per_second=args.rps,
+                                  failure_rate=args.failure_rate, degradation_rate=args.degradation_rate,
+                                  step=args.step, seed=args.seed)
+    SimulatorServer(simulation, args.host, args.port).serve_forever()
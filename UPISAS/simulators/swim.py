@@ -0,0 +1,204 @@
+import argparse
+import logging
+import math
+import random
+
+from UPISAS.simulators import SimulatorServer
+
+
+def load_trace(path, period=60.0):
+    '''Reads a SWIM arrival trace (one inter-arrival time in seconds per line) into the mean arrival rate
+    of each period'''
+    rates = []
+    elapsed, arrivals = 0.0, 0
+    with open(path) as trace:
+        for line in trace:
+            line = line.strip()
+            if not line:
+                continue
+            elapsed += float(line)
+            while elapsed >= period:
+                rates.append(arrivals / period)
+                elapsed -= period
+                arrivals = 0
+            arrivals += 1
+    if arrivals:
+        rates.append(arrivals / period)
+    return rates
+
+
+def default_trace(periods=120, low=20.0, high=90.0):
+    '''A day-shaped arrival rate per period: quiet at the start and the end, with a peak in the middle'''
+    return [low + (high - low) * math.sin(math.pi * i / (periods - 1)) ** 2 for i in range(periods)]
+
+
+class SwimSimulation:
+    """
+    A queueing model of SWIM: a load balancer spreads the arrivals of a trace evenly over the active servers,
+    each of which is modeled as an M/M/1 queue whose mean service time depends on the dimmer (the fraction of
+    responses with optional content). Work a server cannot handle within a period is carried over as backlog.
+    Added servers boot for boot_delay seconds before they take requests.
+    Every /monitor request advances the simulation by one evaluation period, so it runs as fast as it is polled;
+    given a clock, it advances to the time of the clock instead. snapshot() returns the monitor payload without
+    advancing an unclocked simulation.
+    """
+
+    def __init__(self, trace: "arrival rate (requests per second) of each period" = None,
+                 max_servers=3, initial_servers=1, initial_dimmer=1.0,
+                 basic_service_time: "mean seconds to serve a response without optional content" = 0.0225,
+                 opt_service_time: "mean seconds to serve a response with optional content" = 0.04452713,
+                 boot_delay: "seconds a server boots before it takes requests" = 120.0,
+                 period: "simulated seconds per monitor request" = 60.0,
+                 clock: "UPISAS.clock.Clock driving the simulation instead of monitor requests" = None,
+                 seed=None):
+        self.rng = random.Random(seed)
+        self.trace = list(trace) if trace is not None else default_trace()
+        self.max_servers = max_servers
+        self.dimmer = initial_dimmer
+        self.basic_service_time = basic_service_time
+        self.opt_service_time = opt_service_time
+        self.boot_delay = boot_delay
+        self.period = period
+        self.clock = clock
+        self._clock_time = clock.time() if clock else None
+        self.time = 0.0
+        self.arrival_rate = 0.0
+        self.servers = [{"boot_remaining": 0.0, "backlog": 0.0, "utilization": 0.0} for _ in range(initial_servers)]
+        self.basic_rt = self.opt_rt = 0.0
+        self.basic_throughput = self.opt_throughput = 0.0
+        self.executed = []
+
+    def _rate_at(self, time):
+        if not self.trace:
+            return 0.0
+        return self.trace[min(int(time // self.period), len(self.trace) - 1)]
+
+    def advance(self, seconds):
+        '''Advances the simulation by the given number of simulated seconds'''
+        for server in self.servers:
+            server["boot_remaining"] = max(0.0, server["boot_remaining"] - seconds)
+        active = [server for server in self.servers if server["boot_remaining"] == 0.0]
+        mean_arrivals = self._rate_at(self.time) * seconds
+        arrivals = max(0, int(self.rng.gauss(mean_arrivals, math.sqrt(mean_arrivals)))) if mean_arrivals > 0 else 0
+        self.time += seconds
+        self.arrival_rate = arrivals / seconds
+        if not active:
+            self.basic_rt = self.opt_rt = self.basic_throughput = self.opt_throughput = 0.0
+            return
+
+        service_time = self.dimmer * self.opt_service_time + (1 - self.dimmer) * self.basic_service_time
+        capacity = seconds / service_time  # requests one server can serve in this period
+        served, waiting = 0.0, 0.0
+        for server in active:
+            work = arrivals / len(active) + server["backlog"]
+            done = min(work, capacity)
+            server["backlog"] = work - done
+            utilization = done / capacity
+            server["utilization"] = utilization
+            # M/M/1 waiting time, plus the time to work off the backlog left at the end of the period
+            queueing = service_time * utilization / (1 - utilization) if utilization < 0.99 else service_time * 99
+            waiting += done * (queueing + server["backlog"] * service_time)
+            served += done
+        wait = waiting / served if served else 0.0
+        self.basic_rt = wait + self.basic_service_time
+        self.opt_rt = wait + self.opt_service_time
+        self.opt_throughput = served * self.dimmer / seconds
+        self.basic_throughput = served * (1 - self.dimmer) / seconds
+
+    # --- HTTP interface ---
+
+    def monitor(self):
+        if self.clock is None:
+            self.advance(self.period)
+        return self.snapshot()
+
+    def snapshot(self):
+        if self.clock is not None and self.clock.time() > self._clock_time:
+            now = self.clock.time()
+            self.advance(now - self._clock_time)
+            self._clock_time = now
+        active = [server for server in self.servers if server["boot_remaining"] == 0.0]
+        return {
+            "dimmer_factor": round(self.dimmer, 4),
+            "servers": len(self.servers),
+            "active_servers": len(active),
+            "max_servers": self.max_servers,
+            "utilization": [{"server": i, "utilization_value": round(server["utilization"], 4)}
+                            for i, server in enumerate(active)],
+            "basic_rt": round(self.basic_rt, 6),
+            "opt_rt": round(self.opt_rt, 6),
+            "basic_throughput": round(self.basic_throughput, 4),
+            "opt_throughput": round(self.opt_throughput, 4),
+            "arrival_rate": round(self.arrival_rate, 4),
+        }
+
+    def execute(self, adaptation):
+        if not isinstance(adaptation, dict) or not {"server_number", "dimmer_factor"} & adaptation.keys():
+            raise ValueError("an adaptation must set server_number and/or dimmer_factor")
+        if "dimmer_factor" in adaptation:
+            self.dimmer = min(1.0, max(0.0, float(adaptation["dimmer_factor"])))
+        if "server_number" in adaptation:
+            target = min(self.max_servers, max(1, int(adaptation["server_number"])))
+            while len(self.servers) < target:
+                self.servers.append({"boot_remaining": self.boot_delay, "backlog": 0.0, "utilization": 0.0})
+            while len(self.servers) > target:
+                # Booting servers are removed first; the backlog of a removed server goes to the others
+                booting = [server for server in self.servers if server["boot_remaining"] > 0]
+                removed = booting[-1] if booting else self.servers[-1]
+                self.servers.remove(removed)
+                if removed["backlog"]:
+                    self.servers[0]["backlog"] += removed["backlog"]
+        self.executed.append(adaptation)
+        return "ok"
+
+    def monitor_schema(self):
+        number = {"type": "number"}
+        integer = {"type": "integer"}
+        return {
+            "type": "object",
+            "properties": {
+                "dimmer_factor": number, "servers": integer, "active_servers": integer, "max_servers": integer,
+                "utilization": {"type": "array", "items": {
+                    "type": "object",
+                    "properties": {"server": integer, "utilization_value": number}}},
+                "basic_rt": number, "opt_rt": number, "basic_throughput": number, "opt_throughput": number,
+                "arrival_rate": number,
+            }
+        }
+
+    def execute_schema(self):
+        return {
+            "type": "object",
+            "properties": {
+                "server_number": {"type": "integer", "minimum": 1, "maximum": self.max_servers},
+                "dimmer_factor": {"type": "number", "minimum": 0.0, "maximum": 1.0},
+            }
+        }
+
+    def adaptation_options(self):
+        return {
+            "server_number": {"start": 1, "stop": self.max_servers, "type": "discrete"},
+            "dimmer_factor": {"start": 0.0, "stop": 1.0, "type": "continuous"},
+        }
+
+    def adaptation_options_schema(self):
+        option = {"type": "object", "properties": {"start": {"type": "number"}, "stop": {"type": "number"},
+                                                   "type": {"type": "string"}}}
+        return {"type": "object", "properties": {"server_number": option, "dimmer_factor": option}}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a simulated SWIM on the SWIM exemplar interface")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--trace", help="SWIM arrival trace file, one inter-arrival time per line")
+    parser.add_argument("--max-servers", type=int, default=3)
+    parser.add_argument("--boot-delay", type=float, default=120.0)
+    parser.add_argument("--period", type=float, default=60.0, help="simulated seconds per monitor request")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO)
+    simulation = SwimSimulation(trace=load_trace(args.trace, args.period) if args.trace else None,
+                                max_servers=args.max_servers, boot_delay=args.boot_delay, period=args.period,
+                                seed=args.seed)
+    SimulatorServer(simulation, args.host, args.port).serve_forever()
@@ -0,0 +1,411 @@
+import bisect
+import struct
+import sys
+import zlib
+from array import array
+
+from UPISAS.monitor_log import read_monitor_log
+
+MAGIC = b"UPSC"
+FOOTER_MAGIC = b"UPSI"
+VERSION = 2
+
+# Tokens of a shape, the structure of a snapshot without its values
+DICT, LIST, INT, FLOAT, STR, BOOL, NULL, BIGINT = range(8)
+VALUE_TYPES = {INT: "q", FLOAT: "d", STR: "I", BOOL: "B"}
+
+_FRAME = struct.Struct("<BdIIIII")  # key frame?, time, shape id, number of ints/floats/strings/bools
+_TRAILER = struct.Struct("<Q4s")
+_INT64 = (-2**63, 2**63 - 1)
+
+
+def _to_bytes(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _xor(values, previous):
+    '''XOR of the bit patterns of two arrays of the same type and length: zero where a value did not change, and
+    exactly reversible. The arrays are XORed as two big integers, in one pass over their bytes'''
+    size = len(values) * values.itemsize
+    bits = int.from_bytes(values.tobytes(), "little") ^ int.from_bytes(previous.tobytes(), "little")
+    result = array(values.typecode)
+    result.frombytes(bits.to_bytes(size, "little"))
+    return result
+
+
+class _Strings:
+    def __init__(self, strings=()):
+        self.strings = list(strings)
+        self.ids = {s: i for i, s in enumerate(self.strings)}
+
+    def intern(self, string):
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+
+def _flatten(value, strings, shape, values):
+    '''Appends the shape tokens of a JSON value to `shape` and its leaf values to the typed `values`'''
+    if isinstance(value, dict):
+        shape.extend((DICT, len(value)))
+        for key, item in value.items():
+            shape.append(strings.intern(key))
+            _flatten(item, strings, shape, values)
+    elif isinstance(value, list):
+        shape.extend((LIST, len(value)))
+        for item in value:
+            _flatten(item, strings, shape, values)
+    elif isinstance(value, bool):
+        shape.append(BOOL)
+        values[BOOL].append(value)
+    elif isinstance(value, int):
+        if _INT64[0] <= value <= _INT64[1]:
+            shape.append(INT)
+            values[INT].append(value)
+        else:
+            shape.append(BIGINT)
+            values[STR].append(strings.intern(str(value)))
+    elif isinstance(value, float):
+        shape.append(FLOAT)
+        values[FLOAT].append(value)
+    elif isinstance(value, str):
+        shape.append(STR)
+        values[STR].append(strings.intern(value))
+    elif value is None:
+        shape.append(NULL)
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__} values")
+
+
+def _skip(tokens, position):
+    '''Position of the token after the value starting at `position`'''
+    token = tokens[position]
+    if token == DICT:
+        count, position = tokens[position + 1], position + 2
+        for _ in range(count):
+            position = _skip(tokens, position + 1)
+        return position
+    if token == LIST:
+        count, position = tokens[position + 1], position + 2
+        for _ in range(count):
+            position = _skip(tokens, position)
+        return position
+    return position + 1
+
+
+class _Builders:
+    """
+    Compiles the functions rebuilding snapshots from their values: a shape is written as a Python literal whose
+    leaves index the lists of values, so that a snapshot is built by evaluating it rather than by walking its shape.
+    The dicts found in lists (e.g. RAMSES instances) are compiled as functions of their own values, shared by all
+    the shapes of a file, since consecutive shapes mostly differ in a few of them.
+    """
+    LEAVES = {INT: "i[{}]", FLOAT: "f[{}]", STR: "S[s[{}]]", BOOL: "b[{}] != 0", BIGINT: "int(S[s[{}]])"}
+
+    def __init__(self, strings):
+        self.strings = strings
+        self._units = {}  # tokens of a value -> (name of its function, number of values of each type)
+        self._namespace = {}
+
+    def function(self, tokens):
+        '''The function of the values (ints, floats, string ids, bools, strings) building a value of that shape'''
+        (name, _), _ = self._unit(tokens, 0)
+        return self._namespace[name]
+
+    def _unit(self, tokens, start):
+        end = _skip(tokens, start)
+        key = tuple(tokens[start:end])
+        unit = self._units.get(key)
+        if unit is None:
+            counts = {INT: 0, FLOAT: 0, STR: 0, BOOL: 0}
+            expression, _ = self._expression(tokens, start, counts)
+            name = f"_{len(self._units)}"
+            self._namespace[name] = eval(compile(f"lambda i, f, s, b, S: {expression}", "<snapshot shape>", "eval"),
+                                         self._namespace)
+            unit = self._units[key] = (name, counts)
+        return unit, end
+
+    def _expression(self, tokens, position, counts):
+        token = tokens[position]
+        if token == DICT:
+            items, count, position = [], tokens[position + 1], position + 2
+            for _ in range(count):
+                key = self.strings[tokens[position]]
+                value, position = self._expression(tokens, position + 1, counts)
+                items.append(f"{key!r}: {value}")
+            return "{" + ", ".join(items) + "}", position
+        if token == LIST:
+            items, count, position = [], tokens[position + 1], position + 2
+            for _ in range(count):
+                if tokens[position] != DICT:
+                    item, position = self._expression(tokens, position, counts)
+                    items.append(item)
+                    continue
+                (name, unit_counts), position = self._unit(tokens, position)
+                arguments = ", ".join(f"{values}[{counts[t]}:{counts[t] + unit_counts[t]}]"
+                                      for t, values in ((INT, "i"), (FLOAT, "f"), (STR, "s"), (BOOL, "b")))
+                items.append(f"{name}({arguments}, S)")
+                for value_type in counts:
+                    counts[value_type] += unit_counts[value_type]
+            return "[" + ", ".join(items) + "]", position
+        if token == NULL:
+            return "None", position + 1
+        value_type = STR if token == BIGINT else token
+        counts[value_type] += 1
+        return "(" + self.LEAVES[token].format(counts[value_type] - 1) + ")", position + 1
+
+
+class _Shape:
+    """
+    Rebuilds snapshots of one shape from their typed values, and locates leaves by path.
+    """
+
+    def __init__(self, tokens, strings, builders: "_Builders of the file" = None):
+        self.tokens = tokens
+        self.strings = strings
+        self.builders = builders if builders is not None else _Builders(strings)
+        self._leaves = None
+        self._build = None
+
+    def build(self, values):
+        if self._build is None:
+            self._build = self.builders.function(self.tokens.tolist())
+        return self._build(values[INT].tolist(), values[FLOAT].tolist(), values[STR].tolist(),
+                           values[BOOL].tolist(), self.strings)
+
+    def leaf(self, path):
+        '''The value type and the position among the values of that type of the leaf at a path, or None'''
+        if self._leaves is None:
+            self._leaves = {}
+            counts = {INT: 0, FLOAT: 0, STR: 0, BOOL: 0}
+            tokens = iter(self.tokens)
+
+            def walk(prefix):
+                token = next(tokens)
+                if token == DICT:
+                    for _ in range(next(tokens)):
+                        walk(prefix + (self.strings[next(tokens)],))
+                elif token == LIST:
+                    for index in range(next(tokens)):
+                        walk(prefix + (index,))
+                elif token != NULL:
+                    value_type = STR if token == BIGINT else token
+                    self._leaves[prefix] = (token, counts[value_type])
+                    counts[value_type] += 1
+            walk(())
+        return self._leaves.get(tuple(path))
+
+
+class SnapshotWriter:
+    """
+    Writes a stream of JSON snapshots (e.g. RAMSES monitor payloads) in a compact binary form. Strings are
+    interned in a table, so the ids and keys repeated by every snapshot are stored once. The structure of a
+    snapshot is stored once as a shape, and its values as typed arrays. Between key frames, values are stored
+    as their XOR with the previous snapshot, which is zero for most of them; frames are compressed.
+    """
+
+    def __init__(self, path, keyframe_interval: "frames between two key frames, bounding random access cost" = 32):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + bytes([VERSION]))
+        self._strings = _Strings()
+        self._shapes = {}
+        self._times, self._offsets, self._keyframes = array("d"), array("Q"), array("B")
+        self._previous = None  # (shape id, values) of the previous frame
+        self._last_keyframe = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def frames(self):
+        return len(self._times)
+
+    def write(self, timestamp, snapshot):
+        if self._times and timestamp < self._times[-1]:
+            raise ValueError("snapshots must be written in time order")
+        shape, values = array("q"), {t: array(typecode) for t, typecode in VALUE_TYPES.items()}
+        _flatten(snapshot, self._strings, shape, values)
+        shape_id = self._shapes.setdefault(shape.tobytes(), len(self._shapes))
+
+        key = (self._previous is None or self._previous[0] != shape_id
+               or len(self._times) - self._last_keyframe >= self.keyframe_interval)
+        stored = values
+        if key:
+            self._last_keyframe = len(self._times)
+        else:
+            previous = self._previous[1]
+            stored = dict(values)
+            stored[INT] = _xor(values[INT], previous[INT])
+            stored[FLOAT] = _xor(values[FLOAT], previous[FLOAT])
+
+        self._times.append(timestamp)
+        self._offsets.append(self._file.tell())
+        self._keyframes.append(key)
+        body = zlib.compress(b"".join(_to_bytes(stored[t]) for t in VALUE_TYPES))
+        self._file.write(_FRAME.pack(key, timestamp, shape_id, *(len(values[t]) for t in VALUE_TYPES)))
+        self._file.write(struct.pack("<I", len(body)))
+        self._file.write(body)
+        self._previous = (shape_id, values)
+
+    def close(self):
+        if self._file.closed:
+            return
+        strings = [s.encode() for s in self._strings.strings]
+        shapes = sorted(self._shapes, key=self._shapes.get)
+        footer = [struct.pack("<I", len(strings))]
+        footer += [struct.pack("<I", len(s)) + s for s in strings]
+        footer.append(struct.pack("<I", len(shapes)))
+        footer += [struct.pack("<I", len(s)) + (s if sys.byteorder == "little" else _to_bytes(_from_bytes("q", s)))
+                   for s in shapes]
+        footer.append(struct.pack("<I", len(self._times)))
+        footer += [_to_bytes(self._times), _to_bytes(self._offsets), self._keyframes.tobytes()]
+        footer_offset = self._file.tell()
+        self._file.write(zlib.compress(b"".join(footer)))
+        self._file.write(_TRAILER.pack(footer_offset, FOOTER_MAGIC))
+        self._file.close()
+
+
+class SnapshotReader:
+    """
+    Reads snapshots written by SnapshotWriter, sequentially or by time, and single values over time.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._data = file.read()
+        if self._data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        if self._data[4] != VERSION:
+            raise ValueError(f"{path} has snapshot format version {self._data[4]}, expected {VERSION}")
+        footer_offset, magic = _TRAILER.unpack_from(self._data, len(self._data) - _TRAILER.size)
+        if magic != FOOTER_MAGIC:
+            raise ValueError(f"{path} is incomplete, the writer was not closed")
+        footer = zlib.decompress(self._data[footer_offset:len(self._data) - _TRAILER.size])
+
+        position = 0
+
+        def read_chunks():
+            nonlocal position
+            count, = struct.unpack_from("<I", footer, position)
+            position += 4
+            chunks = []
+            for _ in range(count):
+                length, = struct.unpack_from("<I", footer, position)
+                chunks.append(footer[position + 4:position + 4 + length])
+                position += 4 + length
+            return chunks
+
+        self.strings = [s.decode() for s in read_chunks()]
+        builders = _Builders(self.strings)
+        self.shapes = [_Shape(_from_bytes("q", s), self.strings, builders) for s in read_chunks()]
+        count, = struct.unpack_from("<I", footer, position)
+        position += 4
+        self.times = _from_bytes("d", footer[position:position + 8 * count])
+        self._offsets = _from_bytes("Q", footer[position + 8 * count:position + 16 * count])
+        self._keyframes = footer[position + 16 * count:position + 17 * count]
+
+    def __len__(self):
+        return len(self.times)
+
+    def _read_frame(self, index):
+        key, timestamp, shape_id, *counts = _FRAME.unpack_from(self._data, self._offsets[index])
+        start = self._offsets[index] + _FRAME.size
+        length, = struct.unpack_from("<I", self._data, start)
+        body = zlib.decompress(self._data[start + 4:start + 4 + length])
+        values, position = {}, 0
+        for (value_type, typecode), count in zip(VALUE_TYPES.items(), counts):
+            size = count * array(typecode).itemsize
+            values[value_type] = _from_bytes(typecode, body[position:position + size])
+            position += size
+        return key, shape_id, values
+
+    def _values(self, index, previous=None):
+        '''The values of a frame, given the values of the frame before it unless it is a key frame'''
+        key, shape_id, values = self._read_frame(index)
+        if not key:
+            if previous is None:
+                previous = self._values(index - 1)[1]
+            values[INT] = _xor(values[INT], previous[INT])
+            values[FLOAT] = _xor(values[FLOAT], previous[FLOAT])
+        return shape_id, values
+
+    def _values_at(self, index):
+        keyframe = index
+        while not self._keyframes[keyframe]:
+            keyframe -= 1
+        values = None
+        for i in range(keyframe, index + 1):
+            shape_id, values = self._values(i, values)
+        return shape_id, values
+
+    def __getitem__(self, index):
+        '''The time and the snapshot of the index-th frame'''
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        shape_id, values = self._values_at(index)
+        return self.times[index], self.shapes[shape_id].build(values)
+
+    def index_at(self, timestamp):
+        '''Index of the last snapshot written at or before the given time'''
+        index = bisect.bisect_right(self.times, timestamp) - 1
+        if index < 0:
+            raise KeyError(f"no snapshot at or before {timestamp}")
+        return index
+
+    def at(self, timestamp):
+        '''The snapshot valid at the given time, i.e. the last one written at or before it'''
+        return self[self.index_at(timestamp)][1]
+
+    def __iter__(self):
+        values = None
+        for index, timestamp in enumerate(self.times):
+            shape_id, values = self._values(index, values)
+            yield timestamp, self.shapes[shape_id].build(values)
+
+    def column(self, path):
+        '''The values of one leaf (e.g. ("RESTAURANT-SERVICE", "snapshot", 0, "cpuUsage")) in every snapshot,
+        None where a snapshot has no such leaf, without rebuilding the snapshots'''
+        column, values = [], None
+        for index in range(len(self)):
+            shape_id, values = self._values(index, values)
+            leaf = self.shapes[shape_id].leaf(path)
+            if leaf is None:
+                column.append(None)
+                continue
+            token, position = leaf
+            if token in (STR, BIGINT):
+                string = self.strings[values[STR][position]]
+                column.append(int(string) if token == BIGINT else string)
+            else:
+                value = values[token][position]
+                column.append(bool(value) if token == BOOL else value)
+        return column
+
+
+def convert_monitor_log(log_path, snapshot_path, endpoint_suffix="monitor", keyframe_interval=32):
+    '''Writes the payloads of one endpoint in a log of MonitorRecorder to a snapshot file. Returns their number'''
+    with SnapshotWriter(snapshot_path, keyframe_interval) as writer:
+        for record in read_monitor_log(log_path):
+            if record["endpoint"] == endpoint_suffix:
+                writer.write(record["t"], record["payload"])
+        return writer.frames
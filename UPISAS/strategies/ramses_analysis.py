@@ -0,0 +1,297 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from UPISAS.clock import WallClock
+
+
+class _Record(ABC):
+    """
+    Base of the records below, which use __slots__ to keep per-instance data small for large fleets. to_dict()
+    returns the dict the strategies used before, and records can be read like that dict (record["availability"])
+    through _KEYS, which maps each key of that dict to its slot. Reading a key returns the slot's unrounded value.
+    """
+    __slots__ = ()
+    _KEYS = {}
+    _OPTIONAL_KEYS = frozenset()  # keys left out of to_dict() while their slot is None
+
+    @abstractmethod
+    def to_dict(self):
+        """
+        The record as the dict the strategies used before.
+        """
+        pass
+
+    def _slot(self, key):
+        slot = self._KEYS[key]
+        if key in self._OPTIONAL_KEYS and getattr(self, slot) is None:
+            raise KeyError(key)
+        return slot
+
+    def __getitem__(self, key):
+        return getattr(self, self._slot(key))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    __hash__ = None  # records are mutable, so they compare by value but cannot be set members or dict keys
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()})"
+
+
+class InstanceSnapshot(_Record):
+    """
+    What the strategies analyze from an instance's monitor snapshot, with its HTTP metrics summed over endpoints.
+    """
+    __slots__ = ("instance_id", "service_id", "status", "failed", "unreachable", "cpu_usage", "disk_total_space",
+                 "disk_free_space", "total_requests", "successful_requests", "successful_requests_duration")
+    _KEYS = {"instanceId": "instance_id", "serviceId": "service_id", "status": "status", "failed": "failed",
+             "unreachable": "unreachable", "cpuUsage": "cpu_usage", "diskTotalSpace": "disk_total_space",
+             "diskFreeSpace": "disk_free_space", "total_requests": "total_requests",
+             "successful_requests": "successful_requests",
+             "successful_requests_duration": "successful_requests_duration"}
+
+    def __init__(self, instance_id, service_id=None, status="", failed=False, unreachable=False, cpu_usage=None,
+                 disk_total_space=None, disk_free_space=None, total_requests=0, successful_requests=0,
+                 successful_requests_duration=0.0):
+        self.instance_id = instance_id
+        self.service_id = service_id
+        self.status = status
+        self.failed = failed
+        self.unreachable = unreachable
+        self.cpu_usage = cpu_usage
+        self.disk_total_space = disk_total_space
+        self.disk_free_space = disk_free_space
+        self.total_requests = total_requests
+        self.successful_requests = successful_requests
+        self.successful_requests_duration = successful_requests_duration
+
+    @classmethod
+    def from_dict(cls, instance):
+        return cls(instance.get("instanceId"), instance.get("serviceId"), instance.get("status", ""),
+                   instance.get("failed", False), instance.get("unreachable", False), instance.get("cpuUsage"),
+                   instance.get("diskTotalSpace"), instance.get("diskFreeSpace"), *request_counters(instance))
+
+    def to_dict(self):
+        return {"instanceId": self.instance_id, "serviceId": self.service_id, "status": self.status,
+                "failed": self.failed, "unreachable": self.unreachable, "cpuUsage": self.cpu_usage,
+                "diskTotalSpace": self.disk_total_space, "diskFreeSpace": self.disk_free_space,
+                "total_requests": self.total_requests, "successful_requests": self.successful_requests,
+                "successful_requests_duration": self.successful_requests_duration}
+
+
+class InstanceQoS(_Record):
+    """
+    QoS of an instance, as computed by analyze(). Values are kept unrounded, to_dict() rounds them to 4 digits.
+    The health utility score, CPU usage and disk remaining percentage are None for the baseline strategy.
+    """
+    __slots__ = ("availability", "avg_response_time", "health_utility_score", "cpu_usage",
+                 "disk_remaining_percentage", "total_requests", "successful_requests", "successful_requests_duration")
+    _KEYS = {"availability": "availability", "avgResponseTime": "avg_response_time",
+             "healthUtilityScore": "health_utility_score", "cpuUsage": "cpu_usage",
+             "diskRemainingPercentage": "disk_remaining_percentage", "total_requests": "total_requests",
+             "successful_requests": "successful_requests",
+             "successful_requests_duration": "successful_requests_duration"}
+    _OPTIONAL_KEYS = frozenset(("healthUtilityScore", "cpuUsage", "diskRemainingPercentage"))
+
+    def __init__(self, availability, avg_response_time, total_requests, successful_requests,
+                 successful_requests_duration, health_utility_score=None, cpu_usage=None,
+                 disk_remaining_percentage=None):
+        self.availability = availability
+        self.avg_response_time = avg_response_time
+        self.health_utility_score = health_utility_score
+        self.cpu_usage = cpu_usage
+        self.disk_remaining_percentage = disk_remaining_percentage
+        self.total_requests = total_requests
+        self.successful_requests = successful_requests
+        self.successful_requests_duration = successful_requests_duration
+
+    def to_dict(self):
+        qos = {"availability": round(self.availability, 4), "avgResponseTime": round(self.avg_response_time, 4)}
+        if self.health_utility_score is not None:
+            qos["healthUtilityScore"] = round(self.health_utility_score, 4)
+            qos["cpuUsage"] = round(self.cpu_usage, 4)
+            qos["diskRemainingPercentage"] = round(self.disk_remaining_percentage, 4)
+        qos["total_requests"] = self.total_requests
+        qos["successful_requests"] = self.successful_requests
+        qos["successful_requests_duration"] = round(self.successful_requests_duration, 4)
+        return qos
+
+
+class ServiceSummary(_Record):
+    """
+    Averages of the QoS of a service's instances, with the time elapsed since monitoring started ('Xm Ys').
+    """
+    __slots__ = ("avg_availability", "avg_response_time", "avg_health_utility_score", "instance_count", "elapsed",
+                 "time_key")
+    _KEYS = {"avgAvailability": "avg_availability", "avgResponseTime": "avg_response_time",
+             "avgHealthUtilityScore": "avg_health_utility_score", "instanceCount": "instance_count"}
+    _OPTIONAL_KEYS = frozenset(("avgHealthUtilityScore",))
+
+    def __init__(self, avg_availability, avg_response_time, instance_count, elapsed, avg_health_utility_score=None,
+                 time_key: "key of the elapsed time in to_dict()" = "timestamp"):
+        self.avg_availability = avg_availability
+        self.avg_response_time = avg_response_time
+        self.avg_health_utility_score = avg_health_utility_score
+        self.instance_count = instance_count
+        self.elapsed = elapsed
+        self.time_key = time_key
+
+    def _slot(self, key):
+        return "elapsed" if key == self.time_key else super()._slot(key)
+
+    def to_dict(self):
+        summary = {"avgAvailability": round(self.avg_availability, 4),
+                   "avgResponseTime": round(self.avg_response_time, 4)}
+        if self.avg_health_utility_score is not None:
+            summary["avgHealthUtilityScore"] = round(self.avg_health_utility_score, 4)
+        summary["instanceCount"] = self.instance_count
+        summary[self.time_key] = self.elapsed
+        return summary
+
+
+class AffectedService(_Record):
+    """
+    Instances of a service found failed or unhealthy by analyze(), indexed by service for plan(). The service id
+    is the key of the monitor payload (e.g. ORDERING-SERVICE), the name its lowercase form used by /execute.
+    """
+    __slots__ = ("service_id", "name", "failed_instances", "unhealthy_instances")
+    _KEYS = {"service_id": "service_id", "failed_instances": "failed_instances",
+             "unhealthy_instances": "unhealthy_instances"}
+
+    def __init__(self, service_id, failed_instances=None, unhealthy_instances=None):
+        self.service_id = service_id
+        self.name = service_id.lower()
+        self.failed_instances = failed_instances if failed_instances is not None else []
+        self.unhealthy_instances = unhealthy_instances if unhealthy_instances is not None else []
+
+    def to_dict(self):
+        return {"service_id": self.service_id, "failed_instances": self.failed_instances,
+                "unhealthy_instances": self.unhealthy_instances}
+
+
+def request_counters(instance):
+    '''Total requests, successful requests and their total duration of a RAMSES instance snapshot, summed over its
+    endpoints'''
+    total_requests = 0
+    successful_requests = 0
+    successful_requests_duration = 0.0
+    for endpoint_metrics in instance.get("httpMetrics", {}).values():
+        outcome_metrics = endpoint_metrics.get("outcomeMetrics", {})
+        success = outcome_metrics.get("SUCCESS", {})
+        successful_requests += success.get("count", 0)
+        successful_requests_duration += success.get("totalDuration", 0.0)
+        total_requests += success.get("count", 0) + outcome_metrics.get("SERVER_ERROR", {}).get("count", 0)
+    return total_requests, successful_requests, successful_requests_duration
+
+
+def index_affected_services(failed_instances, unhealthy_instances):
+    '''Groups the failed and unhealthy instances found by analyze() ({"service_id", "instance_id"} dicts) by service,
+    as AffectedService records keyed by service id, in the order services were first found'''
+    affected_services = {}
+    for key, entries in (("failed_instances", failed_instances), ("unhealthy_instances", unhealthy_instances)):
+        for entry in entries:
+            service_id = entry["service_id"]
+            if service_id not in affected_services:
+                affected_services[service_id] = AffectedService(service_id)
+            getattr(affected_services[service_id], key).append(entry["instance_id"])
+    return affected_services
+
+
+def instance_fingerprint(instance):
+    '''The part of a RAMSES instance snapshot the strategies analyze: HTTP counters, CPU, disk and status'''
+    counters = []
+    for endpoint, endpoint_metrics in instance.get("httpMetrics", {}).items():
+        outcome_metrics = endpoint_metrics.get("outcomeMetrics", {})
+        success = outcome_metrics.get("SUCCESS", {})
+        counters.append((endpoint, success.get("count", 0), success.get("totalDuration", 0.0),
+                         outcome_metrics.get("SERVER_ERROR", {}).get("count", 0)))
+    return (tuple(counters), instance.get("cpuUsage"), instance.get("diskTotalSpace"), instance.get("diskFreeSpace"),
+            instance.get("status"), instance.get("failed"), instance.get("unreachable"))
+
+
+class InstanceAnalysisCache:
+    """
+    Memoizes the analysis of each instance, reusing it while the instance's snapshot has the same fingerprint, so
+    that analysis cost grows with the number of instances that changed rather than with the fleet size.
+    Instances that left the system are evicted once more than maxsize instances are cached (least recently seen
+    first). Cached results are shared between ticks and must not be modified.
+    """
+
+    def __init__(self, maxsize: "should exceed the number of instances in the system" = 50000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # instance id -> (snapshot, fingerprint, result)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, instance_id, instance: "snapshot of the instance", compute: "function of the snapshot"):
+        entry = self._entries.get(instance_id)
+        if entry is not None:
+            # The entry keeps its snapshot alive, so an identical object (e.g. a service unchanged in a
+            # monitoring stream) is the same snapshot, without fingerprinting it
+            if entry[0] is instance:
+                self._entries.move_to_end(instance_id)
+                self.hits += 1
+                return entry[2]
+            fingerprint = instance_fingerprint(instance)
+            if entry[1] == fingerprint:
+                self._entries[instance_id] = (instance, fingerprint, entry[2])
+                self._entries.move_to_end(instance_id)
+                self.hits += 1
+                return entry[2]
+        else:
+            fingerprint = instance_fingerprint(instance)
+        self.misses += 1
+        result = compute(instance)
+        self._entries[instance_id] = (instance, fingerprint, result)
+        self._entries.move_to_end(instance_id)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+
+class AdaptedInstanceTracker(OrderedDict):
+    """
+    Instances adapted recently, which analyze() does not report again. An instance is forgotten once `cooldown`
+    seconds passed since its adaptation, so that it is adapted again if it degrades again, or once it is absent from
+    the monitored snapshots (see retain). At most maxsize instances are tracked, the oldest adaptations are
+    forgotten first. Supports `in`, add and len like the set it replaces; expire() must be called once per tick.
+    It maps instance ids to the time of their adaptation, oldest first, so lookups are hash lookups like in a set,
+    but per tracked instance it is slower (about 2x per lookup) and larger (about 3x) than a set, see
+    UPISAS.benchmarks.adapted_instances. It pays off by only holding the instances adapted within the cooldown.
+    """
+
+    def __init__(self, cooldown: "seconds" = 60.0, maxsize=100000, clock: "UPISAS.clock.Clock" = None):
+        super().__init__()
+        self.cooldown = cooldown
+        self.maxsize = maxsize
+        self.clock = clock if clock else WallClock()
+
+    def add(self, instance_id):
+        self[instance_id] = self.clock.time()
+        self.move_to_end(instance_id)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def discard(self, instance_id):
+        self.pop(instance_id, None)
+
+    def expire(self):
+        '''Forgets the instances adapted more than cooldown seconds ago, in time proportional to their number'''
+        oldest = self.clock.time() - self.cooldown
+        while self and next(iter(self.values())) <= oldest:
+            self.popitem(last=False)
+
+    def retain(self, instance_ids: "ids of the instances in the latest snapshots"):
+        '''Forgets the instances that are no longer monitored, e.g. removed after their adaptation'''
+        for instance_id in [i for i in self if i not in instance_ids]:
+            del self[instance_id]
@@ -0,0 +1,91 @@
+from UPISAS.strategies.ramses_analysis import _Record
+
+
+class InstancePerformance(_Record):
+    """
+    Recent performance of an instance: the requests per second it serves at full CPU (its throughput capacity), the
+    average response time (ms) and the availability of the requests it served between its last snapshots, each
+    exponentially smoothed. Values are None until the instance served requests.
+    """
+    __slots__ = ("capacity", "response_time", "availability", "time", "counters")
+    _KEYS = {"capacity": "capacity", "responseTime": "response_time", "availability": "availability"}
+
+    def __init__(self, capacity=None, response_time=None, availability=None, time=None, counters=None):
+        self.capacity = capacity
+        self.response_time = response_time
+        self.availability = availability
+        self.time = time
+        self.counters = counters  # cumulative (total requests, successful requests, their total duration)
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "responseTime": self.response_time, "availability": self.availability}
+
+
+class InstancePerformanceTracker(dict):
+    """
+    The InstancePerformance of each instance (instance id -> InstancePerformance), updated from its successive
+    InstanceQoS. Instances that are no longer monitored are forgotten with retain(). The counters of a restarted
+    instance (reset) are a new baseline, like those of a new instance.
+    """
+
+    def __init__(self, alpha: "weight of the latest window in the smoothed values" = 0.5):
+        super().__init__()
+        self.alpha = alpha
+
+    def _smooth(self, previous, value):
+        return value if previous is None else self.alpha * value + (1 - self.alpha) * previous
+
+    def observe(self, time: "seconds", instance_id, qos: "InstanceQoS of the instance's latest snapshot"):
+        performance = self.get(instance_id)
+        if performance is None:
+            performance = self[instance_id] = InstancePerformance()
+        counters = (qos.total_requests, qos.successful_requests, qos.successful_requests_duration)
+        if performance.time is not None and time > performance.time and counters[0] >= performance.counters[0]:
+            served, successful, duration = (counter - before for counter, before in zip(counters, performance.counters))
+            if served > 0:
+                performance.availability = self._smooth(performance.availability, successful / served)
+                if qos.cpu_usage is not None and qos.cpu_usage > 0.1:
+                    rate = served / (time - performance.time)
+                    performance.capacity = self._smooth(performance.capacity, rate / qos.cpu_usage)
+            if successful > 0:
+                performance.response_time = self._smooth(performance.response_time, duration / successful)
+        performance.time = time
+        performance.counters = counters
+
+    def retain(self, instance_ids: "ids of the instances in the latest snapshots"):
+        for instance_id in [i for i in self if i not in instance_ids]:
+            del self[instance_id]
+
+
+def _mean(values, default):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else default
+
+
+def proportional_weights(performances: "instance id -> InstancePerformance of the instances to balance",
+                         reserved_share: "share of the traffic left to instances not balanced yet" = 0.0,
+                         decimals=2):
+    '''Load balancer weights allocating traffic in proportion to each instance's effective capacity, i.e. its
+    throughput capacity derated by its availability and by how much slower it responds than the fastest instance.
+    Instances without measurements yet (e.g. booting) are assumed to perform like the average instance. The weights
+    sum to 1 - reserved_share, and each instance keeps a weight of at least 10^-decimals so that it is measured
+    again.'''
+    if not performances:
+        return {}
+    capacity = _mean((p.capacity for p in performances.values()), 1.0)
+    response_time = _mean((p.response_time for p in performances.values()), 1.0)
+    availability = _mean((p.availability for p in performances.values()), 1.0)
+    effective = {}
+    for instance_id, performance in performances.items():
+        effective[instance_id] = ((performance.capacity if performance.capacity is not None else capacity) *
+                                  (performance.availability if performance.availability is not None else availability),
+                                  performance.response_time if performance.response_time is not None else response_time)
+    fastest = min(instance_response_time for _, instance_response_time in effective.values())
+    effective = {instance_id: capacity * (fastest / instance_response_time if instance_response_time > 0 else 1.0)
+                 for instance_id, (capacity, instance_response_time) in effective.items()}
+    total = sum(effective.values())
+    share = 1.0 - reserved_share
+    minimum = 10 ** -decimals
+    if total <= 0:
+        return {instance_id: round(max(minimum, share / len(effective)), decimals) for instance_id in effective}
+    return {instance_id: round(max(minimum, share * value / total), decimals) for instance_id, value in effective.items()}
@@ -1,17 +1,25 @@
 from UPISAS.strategy import Strategy
+from UPISAS.strategies.ramses_analysis import InstanceAnalysisCache, InstanceQoS, ServiceSummary, request_counters
 from abc import ABC, abstractmethod
 import requests
 import pprint
-import datetime
 from UPISAS.exceptions import EndpointNotReachable, ServerNotReachable
 from UPISAS.knowledge import Knowledge
 from UPISAS import validate_schema, get_response_for_get_request
 import logging
 
 class RamsesBaselineStrategy(Strategy):
-
-    def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=True):
-        fresh_data = self._perform_get_request(endpoint_suffix)
+    monitor_fields = tuple("*.snapshot.*." + field for field in (
+        "instanceId", "status", "failed", "unreachable",
+        "httpMetrics.*.outcomeMetrics"))
+
+    def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=True,
+                fresh_data: "payload received from subscribe(), instead of requesting one" = None):
+        if fresh_data is None:
+            fresh_data = self._perform_get_request(endpoint_suffix, self.field_selector, conditional=True)
+            if fresh_data is None:
+                if(verbose): print("[Monitor]\tunchanged since the last request")
+                return False
         if(verbose): print("[Monitor]\tgot fresh_data: " + str(fresh_data))
         if with_validation:
             if(not self.knowledge.monitor_schema): self.get_monitor_schema()
@@ -22,10 +30,25 @@ class RamsesBaselineStrategy(Strategy):
                 data[key] = []
             data[key].append(fresh_data[key])
         if not hasattr(self.knowledge, "time"):
-            self.knowledge.time = datetime.datetime.now()
+            self.knowledge.time = self.clock.now()
         #print("[Knowledge]\tdata monitored so far: " + str(self.knowledge.monitored_data))
         return True
 
+    def _analyze_instance(self, instance):
+        """
+        QoS (availability and average response time) of one instance snapshot.
+        """
+        total_requests, successful_requests, successful_requests_duration = request_counters(instance)
+
+        # Calculate availability (default to 1.0 if no requests)
+        availability = 1.0 if total_requests == 0 else successful_requests / total_requests
+
+        # Calculate average response time (default to 0 if no successful requests)
+        avg_response_time = 0.0 if successful_requests == 0 else successful_requests_duration / successful_requests
+
+        return InstanceQoS(availability, avg_response_time, total_requests, successful_requests,
+                           successful_requests_duration)
+
     def analyze(self):
         """
         Analyze monitored data to detect failed/unreachable instances,
@@ -33,10 +56,16 @@ class RamsesBaselineStrategy(Strategy):
         and average metrics for each service. Resets monitored data at the end.
         """
         monitored_data = self.knowledge.monitored_data
+        if not monitored_data:  # nothing monitored since the last analysis, e.g. the system was unchanged
+            return False
         failed_instances = []
         qos_history = {}
         service_avg_metrics = {}
 
+        # Per-instance analysis results, reused while an instance's metrics do not change
+        if not hasattr(self.knowledge, "analysis_cache"):
+            self.knowledge.analysis_cache = InstanceAnalysisCache()
+
         for service_id, service_data_list in monitored_data.items():
             qos_history[service_id] = {}
             total_availability = 0
@@ -47,42 +76,12 @@ class RamsesBaselineStrategy(Strategy):
                 for instance in service_data.get("snapshot", []):  # Access the 'snapshot' key
                     instance_id = instance.get("instanceId")
 
-                    http_metrics = instance.get("httpMetrics", {})
-
-                    # Initialize request counters
-                    total_requests = 0
-                    successful_requests = 0
-                    successful_requests_duration = 0.0
-
-                    # Iterate through OutcomeMetrics to calculate counts and durations
-                    for endpoint, endpoint_metrics in http_metrics.items():
-                        outcome_metrics = endpoint_metrics.get("outcomeMetrics", {})
-                        success = outcome_metrics.get("SUCCESS", {}).get("count", 0)
-                        server_error = outcome_metrics.get("SERVER_ERROR", {}).get("count", 0)
-                        success_duration = outcome_metrics.get("SUCCESS", {}).get("totalDuration", 0.0)
-
-                        successful_requests += success
-                        successful_requests_duration += success_duration
-                        total_requests += success + server_error
-
-                    # Calculate availability (default to 1.0 if no requests)
-                    availability = 1.0 if total_requests == 0 else successful_requests / total_requests
-
-                    # Calculate average response time (default to 0 if no successful requests)
-                    avg_response_time = 0.0 if successful_requests == 0 else successful_requests_duration / successful_requests
-
-                    # Update QoS history with availability and avg response time
-                    qos_history[service_id][instance_id] = {
-                        "availability": round(availability, 4),
-                        "avgResponseTime": round(avg_response_time, 4),
-                        "total_requests": total_requests,
-                        "successful_requests": successful_requests,
-                        "successful_requests_duration": round(successful_requests_duration, 4),
-                    }
+                    qos = self.knowledge.analysis_cache.get_or_compute(instance_id, instance, self._analyze_instance)
+                    qos_history[service_id][instance_id] = qos
 
                     # Accumulate metrics for service averages
-                    total_availability += availability
-                    total_response_time += avg_response_time
+                    total_availability += qos.availability
+                    total_response_time += qos.avg_response_time
                     instance_count += 1
 
                     # Detect failed/unreachable instances
@@ -98,16 +97,16 @@ class RamsesBaselineStrategy(Strategy):
 
             # Calculate average metrics for the service
             if instance_count > 0:
-                elapsed_time_seconds = (datetime.datetime.now() - self.knowledge.time).total_seconds()  # Calculate elapsed time 
+                elapsed_time_seconds = (self.clock.now() - self.knowledge.time).total_seconds()  # Calculate elapsed time 
                 elapsed_minutes = int(elapsed_time_seconds // 60)  # Get minutes
                 elapsed_seconds = int(elapsed_time_seconds % 60)  # Get remaining seconds
                 elapsed_time_formatted = f"{elapsed_minutes}m {elapsed_seconds}s"  # Format as 'Xm Ys'
-                service_avg_metrics[service_id] = {
-                    "avgAvailability": round(total_availability / instance_count, 4),
-                    "avgResponseTime": round(total_response_time / instance_count, 4),
-                    "instanceCount": instance_count,
-                    "time": elapsed_time_formatted
-                }
+                service_avg_metrics[service_id] = ServiceSummary(
+                    total_availability / instance_count,
+                    total_response_time / instance_count,
+                    instance_count,
+                    elapsed_time_formatted,
+                    time_key="time")
 
         # Store analysis results in the knowledge base
         self.knowledge.analysis_data = {
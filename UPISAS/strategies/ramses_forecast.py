@@ -0,0 +1,87 @@
+import math
+
+
+class HoltForecaster:
+    """
+    Holt's linear exponential smoothing: a smoothed level and trend of a series, extrapolated linearly.
+    """
+
+    def __init__(self, alpha: "smoothing of the level" = 0.5, beta: "smoothing of the trend" = 0.3):
+        self.alpha = alpha
+        self.beta = beta
+        self.level = None
+        self.trend = 0.0
+        self.observations = 0
+
+    def update(self, value):
+        self.observations += 1
+        if self.level is None:
+            self.level = value
+            return
+        previous = self.level
+        self.level = self.alpha * value + (1 - self.alpha) * (self.level + self.trend)
+        self.trend = self.beta * (self.level - previous) + (1 - self.beta) * self.trend
+
+    def forecast(self, steps: "observations ahead" = 1):
+        return None if self.level is None else self.level + steps * self.trend
+
+
+class ServiceLoadForecast:
+    """
+    Forecasts the request rate and the average response time of a service from its successive snapshots, and
+    estimates how many instances the forecast load needs. The rate and response time are those of the requests
+    served between two snapshots (from the growth of the instances' cumulative counters), and the capacity of an
+    instance is the rate it serves per unit of CPU usage. Only instances in both snapshots count: the counters of an
+    instance that is new, reappears or restarted (its counters were reset) are a new baseline, as the requests they
+    count were not all served since the previous snapshot.
+    """
+
+    def __init__(self, alpha=0.5, beta=0.3):
+        self.rate = HoltForecaster(alpha, beta)  # requests per second
+        self.response_time = HoltForecaster(alpha, beta)
+        self.capacity = None  # requests per second an instance serves at full CPU, smoothed
+        self.interval = None  # seconds between the last two observations
+        self._alpha = alpha
+        self._time = None
+        self._counters = {}
+
+    def observe(self, time: "seconds",
+                counters: "instance id -> (total requests, successful requests, their total duration), cumulative",
+                cpu_usages: "CPU usage of the instances serving traffic"):
+        if self._time is not None and time > self._time:
+            self.interval = time - self._time
+            served, successful, duration = 0, 0, 0.0
+            for instance_id, (total, success, success_duration) in counters.items():
+                previous = self._counters.get(instance_id)
+                if previous is None or total < previous[0]:
+                    continue
+                served += total - previous[0]
+                successful += success - previous[1]
+                duration += success_duration - previous[2]
+            rate = served / self.interval
+            self.rate.update(rate)
+            if successful > 0:
+                self.response_time.update(duration / successful)
+            busy = sum(cpu_usages)
+            if rate > 0 and busy > 0.1:
+                capacity = rate / busy
+                self.capacity = capacity if self.capacity is None else \
+                    self._alpha * capacity + (1 - self._alpha) * self.capacity
+        self._time = time
+        self._counters = dict(counters)
+
+    def _steps(self, horizon):
+        return horizon / self.interval if self.interval else 0
+
+    def forecast_rate(self, horizon: "seconds ahead"):
+        forecast = self.rate.forecast(self._steps(horizon))
+        return None if forecast is None else max(0.0, forecast)
+
+    def forecast_response_time(self, horizon: "seconds ahead"):
+        return self.response_time.forecast(self._steps(horizon))
+
+    def required_instances(self, horizon: "seconds ahead", target_utilization=0.7):
+        '''Instances needed to serve the forecast rate at the target CPU usage, None until it can be estimated'''
+        if self.rate.observations < 2 or self.capacity is None:
+            return None
+        return math.ceil(self.forecast_rate(horizon) / (self.capacity * target_utilization))
@@ -1,17 +1,41 @@
 from UPISAS.strategy import Strategy
+from UPISAS.strategies.ramses_analysis import (AdaptedInstanceTracker, InstanceAnalysisCache, InstanceQoS,
+                                             ServiceSummary, index_affected_services, request_counters)
+from UPISAS.strategies.ramses_balancing import InstancePerformanceTracker, proportional_weights
+from UPISAS.strategies.ramses_forecast import ServiceLoadForecast
 from abc import ABC, abstractmethod
 import requests
 import pprint
-import datetime
 from UPISAS.exceptions import EndpointNotReachable, ServerNotReachable
 from UPISAS.knowledge import Knowledge
 from UPISAS import validate_schema, get_response_for_get_request
 import logging
 
 class RamsesNovelStrategy(Strategy):
-
-    def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=True):
-        fresh_data = self._perform_get_request(endpoint_suffix)
+    # Seconds after which an adapted instance that is still (or again) failed or unhealthy is adapted again
+    ADAPTATION_COOLDOWN = 60
+
+    # Predictive scaling: instances are added ahead of saturation to the services whose load, forecast SCALING_HORIZON
+    # seconds ahead, needs more instances than they have at TARGET_UTILIZATION CPU usage, or whose forecast response
+    # time exceeds RESPONSE_TIME_LIMIT (ms). At most MAX_SCALE_OUT instances are added to a service at once, and a
+    # scaled out service is not scaled out again for SCALING_HORIZON seconds, while its new instances boot.
+    predictive_scaling = False
+    SCALING_HORIZON = 30
+    TARGET_UTILIZATION = 0.7
+    RESPONSE_TIME_LIMIT = 1000
+    MAX_SCALE_OUT = 5
+
+    monitor_fields = tuple("*.snapshot.*." + field for field in (
+        "instanceId", "status", "failed", "unreachable",
+        "cpuUsage", "diskTotalSpace", "diskFreeSpace", "httpMetrics.*.outcomeMetrics"))
+
+    def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=True,
+                fresh_data: "payload received from subscribe(), instead of requesting one" = None):
+        if fresh_data is None:
+            fresh_data = self._perform_get_request(endpoint_suffix, self.field_selector, conditional=True)
+            if fresh_data is None:
+                if(verbose): print("[Monitor]\tunchanged since the last request")
+                return False
         if(verbose): print("[Monitor]\tgot fresh_data: " + str(fresh_data))
         if with_validation:
             if(not self.knowledge.monitor_schema): self.get_monitor_schema()
@@ -23,10 +47,140 @@ class RamsesNovelStrategy(Strategy):
             data[key].append(fresh_data[key])
         #print("[Knowledge]\tdata monitored so far: " + str(self.knowledge.monitored_data))
         if not hasattr(self.knowledge, "time"):
-            self.knowledge.time = datetime.datetime.now()
+            self.knowledge.time = self.clock.now()
 
         return True
 
+    def _analyze_instance(self, instance):
+        """
+        QoS (availability, average response time and health utility score) of one instance snapshot.
+        """
+        # Weights for the health utility score
+        w1, w2, w3 = 4, 1, 1
+
+        # Deduction thresholds for avgResponseTime
+        response_time_deductions = {
+            500: 5,
+            1000: 10,
+            1500: 15,
+            2000: 20
+        }
+
+        total_requests, successful_requests, successful_requests_duration = request_counters(instance)
+
+        # Calculate availability (default to 1.0 if no requests)
+        availability = 1.0 if total_requests == 0 else successful_requests / total_requests
+
+        # Calculate average response time (default to 0 if no successful requests)
+        avg_response_time = 0.0 if successful_requests == 0 else successful_requests_duration / successful_requests
+
+        # Null-safe checks for CPU usage and disk space metrics
+        cpu_usage = instance.get("cpuUsage")
+        disk_total = instance.get("diskTotalSpace")
+        disk_free = instance.get("diskFreeSpace")
+
+        # Provide default values for null cases
+        if cpu_usage is None or cpu_usage < 0:
+            cpu_usage = 0.0  # Default to min usage
+        if disk_total is None or disk_total <= 0:
+            disk_total = 1.0  # Default total disk space
+        if disk_free is None:
+            disk_free = 1.0  # Default free disk space
+
+        # Calculate disk remaining percentage
+        disk_remaining_percentage = disk_free / disk_total
+
+        # Deduction based on avg response time
+        response_time_penalty = 0
+        for threshold, deduction in response_time_deductions.items():
+            if avg_response_time > threshold:
+                response_time_penalty = deduction
+
+        # Calculate health utility score
+        cpu_utility = 1 - cpu_usage  # Lower CPU usage is better
+
+        health_utility_score = ((w1 * availability + 
+                                 w2 * cpu_utility + 
+                                 w3 * disk_remaining_percentage) / 
+                                 (w1 + w2 + w3) * 100) - response_time_penalty
+
+        return InstanceQoS(availability, avg_response_time, total_requests, successful_requests,
+                           successful_requests_duration, health_utility_score, cpu_usage, disk_remaining_percentage)
+
+    @staticmethod
+    def _is_available(instance):
+        """
+        Whether an instance snapshot is of an instance that serves or will serve traffic (booting instances included).
+        """
+        return not (instance.get("status", "") in ["FAILED", "UNREACHABLE", "SHUTDOWN"] or
+                    instance.get("failed", False) or instance.get("unreachable", False))
+
+    def _observe_performance(self, instances: "latest snapshot of a service's instances"):
+        """
+        Updates the recent performance of a service's instances, and returns that of its available instances.
+        """
+        performances = {}
+        for instance in instances:
+            if not self._is_available(instance):
+                continue
+            instance_id = instance.get("instanceId")
+            qos = self.knowledge.analysis_cache.get_or_compute(instance_id, instance, self._analyze_instance)
+            self.knowledge.instance_performance.observe(self.clock.time(), instance_id, qos)
+            performances[instance_id] = self.knowledge.instance_performance[instance_id]
+        return performances
+
+    def _balance_load(self, service_id, performances, instances_to_add=0, failed_instances=()):
+        """
+        changeLBWeights action spreading a service's traffic over all its available instances in proportion to their
+        effective capacity, leaving each instance being added an average share, and removing the weight of its failed
+        instances. None if there is nothing to change.
+        """
+        if not performances and not failed_instances:
+            return None
+        reserved_share = instances_to_add / (len(performances) + instances_to_add) if performances else 0.0
+        return {
+            "operation": "changeLBWeights",
+            "serviceID": service_id.lower(),
+            "newWeights": proportional_weights(performances, reserved_share),
+            "instancesToRemoveWeightOf": list(failed_instances)
+        }
+
+    def _forecast_scale_out(self, service_id, instances: "latest snapshot of the service's instances"):
+        """
+        Number of instances to add to a service ahead of its forecast load, 0 if it has enough.
+        """
+        if not hasattr(self.knowledge, "load_forecasts"):
+            self.knowledge.load_forecasts = {}
+        if service_id not in self.knowledge.load_forecasts:
+            self.knowledge.load_forecasts[service_id] = ServiceLoadForecast()
+        forecast = self.knowledge.load_forecasts[service_id]
+
+        counters = {}
+        cpu_usages = []
+        available_instances = 0  # Booting instances included, as they will serve the forecast load
+        for instance in instances:
+            instance_id = instance.get("instanceId")
+            qos = self.knowledge.analysis_cache.get_or_compute(instance_id, instance, self._analyze_instance)
+            counters[instance_id] = (qos.total_requests, qos.successful_requests, qos.successful_requests_duration)
+            if not self._is_available(instance):
+                continue
+            available_instances += 1
+            if instance.get("status", "") == "ACTIVE":
+                cpu_usages.append(qos.cpu_usage)
+        forecast.observe(self.clock.time(), counters, cpu_usages)
+
+        if service_id in self.knowledge.scaled_services:
+            return 0
+        required_instances = forecast.required_instances(self.SCALING_HORIZON, self.TARGET_UTILIZATION)
+        missing_instances = required_instances - available_instances if required_instances is not None else 0
+        forecast_response_time = forecast.forecast_response_time(self.SCALING_HORIZON)
+        if forecast_response_time is not None and forecast_response_time > self.RESPONSE_TIME_LIMIT:
+            missing_instances = max(missing_instances, 1)
+        if missing_instances <= 0:
+            return 0
+        self.knowledge.scaled_services.add(service_id)
+        return min(missing_instances, self.MAX_SCALE_OUT)
+
     def analyze(self):
         """
         Analyze monitored data to detect unhealthy instances based on health utility score,
@@ -34,31 +188,39 @@ class RamsesNovelStrategy(Strategy):
         Reset monitored data at the end of the phase to prevent unnecessary growth.
         """
         monitored_data = self.knowledge.monitored_data
+        if not monitored_data:  # nothing monitored since the last analysis, e.g. the system was unchanged
+            return False
         failed_instances = []
         unhealthy_instances = []
         qos_history = {}
         service_avg_metrics = {}
 
-        # Ensure self.knowledge.adapted_instances exists
+        # Per-instance analysis results, reused while an instance's metrics do not change
+        if not hasattr(self.knowledge, "analysis_cache"):
+            self.knowledge.analysis_cache = InstanceAnalysisCache()
+
+        # Ensure self.knowledge.adapted_instances exists, and forget adaptations older than the cooldown
         if not hasattr(self.knowledge, "adapted_instances"):
-            self.knowledge.adapted_instances = set()
+            self.knowledge.adapted_instances = AdaptedInstanceTracker(self.ADAPTATION_COOLDOWN, clock=self.clock)
+        self.knowledge.adapted_instances.expire()
 
-        
+        # Recent performance of each available instance, by service, which plan() balances the load on
+        if not hasattr(self.knowledge, "instance_performance"):
+            self.knowledge.instance_performance = InstancePerformanceTracker()
+        instance_performance = {}
+
+        # Instances to add to each service ahead of its forecast load, and the services recently scaled out, which are
+        # tracked like adapted instances
+        scale_out = {}
+        if self.predictive_scaling:
+            if not hasattr(self.knowledge, "scaled_services"):
+                self.knowledge.scaled_services = AdaptedInstanceTracker(self.SCALING_HORIZON, clock=self.clock)
+            self.knowledge.scaled_services.expire()
 
-        # Weights for the health utility score
-        w1, w2, w3 = 4, 1, 1
 
         # Threshold for health utility score
         health_utility_score_threshold = 70
 
-        # Deduction thresholds for avgResponseTime
-        response_time_deductions = {
-            500: 5,
-            1000: 10,
-            1500: 15,
-            2000: 20
-        }
-
         for service_id, service_data_list in monitored_data.items():
             qos_history[service_id] = {}
             total_availability = 0
@@ -74,83 +236,20 @@ class RamsesNovelStrategy(Strategy):
 
                     unique_instances.add(instance_id)
 
-                    http_metrics = instance.get("httpMetrics", {})
-
-                    # Initialize request counters
-                    total_requests = 0
-                    successful_requests = 0
-                    successful_requests_duration = 0.0
-
-                    # Iterate through OutcomeMetrics to calculate counts and durations
-                    for endpoint, endpoint_metrics in http_metrics.items():
-                        outcome_metrics = endpoint_metrics.get("outcomeMetrics", {})
-                        success = outcome_metrics.get("SUCCESS", {}).get("count", 0)
-                        server_error = outcome_metrics.get("SERVER_ERROR", {}).get("count", 0)
-                        success_duration = outcome_metrics.get("SUCCESS", {}).get("totalDuration", 0.0)
-
-                        successful_requests += success
-                        successful_requests_duration += success_duration
-                        total_requests += success + server_error
-
-                    # Calculate availability (default to 1.0 if no requests)
-                    availability = 1.0 if total_requests == 0 else successful_requests / total_requests
-
-                    # Calculate average response time (default to 0 if no successful requests)
-                    avg_response_time = 0.0 if successful_requests == 0 else successful_requests_duration / successful_requests
-
-                    # Null-safe checks for CPU usage and disk space metrics
-                    cpu_usage = instance.get("cpuUsage")
-                    disk_total = instance.get("diskTotalSpace")
-                    disk_free = instance.get("diskFreeSpace")
-
-                    # Provide default values for null cases
-                    if cpu_usage is None or cpu_usage < 0:
-                        cpu_usage = 0.0  # Default to min usage
-                    if disk_total is None or disk_total <= 0:
-                        disk_total = 1.0  # Default total disk space
-                    if disk_free is None:
-                        disk_free = 1.0  # Default free disk space
-
-                    # Calculate disk remaining percentage
-                    disk_remaining_percentage = disk_free / disk_total
-
-                    # Deduction based on avg response time
-                    response_time_penalty = 0
-                    for threshold, deduction in response_time_deductions.items():
-                        if avg_response_time > threshold:
-                            response_time_penalty = deduction
-
-                    # Calculate health utility score
-                    cpu_utility = 1 - cpu_usage  # Lower CPU usage is better
-
-                    health_utility_score = ((w1 * availability + 
-                                             w2 * cpu_utility + 
-                                             w3 * disk_remaining_percentage) / 
-                                             (w1 + w2 + w3) * 100) - response_time_penalty
-
-                    # Update QoS history with health score and avg response time
-                    qos_history[service_id][instance_id] = {
-                        "availability": round(availability, 4),
-                        "avgResponseTime": round(avg_response_time, 4),
-                        "healthUtilityScore": round(health_utility_score, 4),
-                        "cpuUsage": round(cpu_usage, 4),
-                        "diskRemainingPercentage": round(disk_remaining_percentage, 4),
-                        "total_requests": total_requests,
-                        "successful_requests": successful_requests,
-                        "successful_requests_duration": round(successful_requests_duration, 4),
-                    }
+                    qos = self.knowledge.analysis_cache.get_or_compute(instance_id, instance, self._analyze_instance)
+                    qos_history[service_id][instance_id] = qos
 
                     # Accumulate metrics for service averages
-                    total_availability += availability
-                    total_response_time += avg_response_time
-                    total_health_utility_score += health_utility_score
+                    total_availability += qos.availability
+                    total_response_time += qos.avg_response_time
+                    total_health_utility_score += qos.health_utility_score
 
                     # Detect failed/unreachable instances
                     status = instance.get("status", "")
                     failed = instance.get("failed", False)
                     unreachable = instance.get("unreachable", False)
 
-                    if status in ["FAILED", "UNREACHABLE"] or failed or unreachable and instance_id not in self.knowledge.adapted_instances:
+                    if (status in ["FAILED", "UNREACHABLE"] or failed or unreachable) and instance_id not in self.knowledge.adapted_instances:
                         failed_instances.append({
                             "service_id": service_id,
                             "instance_id": instance_id
@@ -158,7 +257,7 @@ class RamsesNovelStrategy(Strategy):
                         self.knowledge.adapted_instances.add(instance_id)
 
                     # Check health utility score against the threshold
-                    if health_utility_score < health_utility_score_threshold and instance_id not in self.knowledge.adapted_instances:
+                    if qos.health_utility_score < health_utility_score_threshold and instance_id not in self.knowledge.adapted_instances:
                         unhealthy_instances.append({
                             "service_id": service_id,
                             "instance_id": instance_id
@@ -167,25 +266,41 @@ class RamsesNovelStrategy(Strategy):
 
             # Calculate average metrics for the service
             instance_count = len(unique_instances)
-            elapsed_time_seconds = (datetime.datetime.now() - self.knowledge.time).total_seconds()  # Calculate elapsed time 
+            elapsed_time_seconds = (self.clock.now() - self.knowledge.time).total_seconds()  # Calculate elapsed time 
             elapsed_minutes = int(elapsed_time_seconds // 60)  # Get minutes
             elapsed_seconds = int(elapsed_time_seconds % 60)  # Get remaining seconds
             elapsed_time_formatted = f"{elapsed_minutes}m {elapsed_seconds}s"  # Format as 'Xm Ys'
             if instance_count > 0:
-                service_avg_metrics[service_id] = {
-                    "avgAvailability": round(total_availability / instance_count, 4),
-                    "avgResponseTime": round(total_response_time / instance_count, 4),
-                    "avgHealthUtilityScore": round(total_health_utility_score / instance_count, 4),
-                    "instanceCount": instance_count,
-                    "timestamp": elapsed_time_formatted  # Add the current timestamp
-                }
-            
+                service_avg_metrics[service_id] = ServiceSummary(
+                    total_availability / instance_count,
+                    total_response_time / instance_count,
+                    instance_count,
+                    elapsed_time_formatted,  # Add the current timestamp
+                    avg_health_utility_score=total_health_utility_score / instance_count)
+
+            # Forecast the service's load from its latest snapshot
+            if self.predictive_scaling and service_data_list:
+                instances_to_add = self._forecast_scale_out(service_id, service_data_list[-1].get("snapshot", []))
+                if instances_to_add > 0:
+                    scale_out[service_id] = instances_to_add
+
+            if service_data_list:
+                instance_performance[service_id] = self._observe_performance(service_data_list[-1].get("snapshot", []))
+
+        # Forget adapted instances that are no longer monitored
+        monitored_instances = {instance_id for instances in qos_history.values() for instance_id in instances}
+        self.knowledge.adapted_instances.retain(monitored_instances)
+        self.knowledge.instance_performance.retain(monitored_instances)
+
         # Store analysis results in the knowledge base
         self.knowledge.analysis_data = {
             "failed_instances": failed_instances,
             "unhealthy_instances": unhealthy_instances,
             "qos_history": qos_history,
-            "service_avg_metrics": service_avg_metrics
+            "service_avg_metrics": service_avg_metrics,
+            "affected_services": index_affected_services(failed_instances, unhealthy_instances),
+            "scale_out": scale_out,
+            "instance_performance": instance_performance
         }
         print("[ANALYZE] Updated QoS history, unhealthy instances, failed instances, and service averages: ", pprint.pformat(self.knowledge.analysis_data))
 
@@ -193,7 +308,7 @@ class RamsesNovelStrategy(Strategy):
         self.knowledge.monitored_data = {}
         print("[ANALYZE] Monitored data reset.")
 
-        if len(failed_instances) == 0 and len(unhealthy_instances) == 0:
+        if len(failed_instances) == 0 and len(unhealthy_instances) == 0 and len(scale_out) == 0:
             print("[ANALYZE] No need for adaptation...")
             return False
         return True
@@ -203,61 +318,49 @@ class RamsesNovelStrategy(Strategy):
 
     def plan(self):
         """
-        Plan adaptation actions for unhealthy instances and failed instances.
+        Plan adaptation actions for unhealthy instances and failed instances, and for the services that predictive
+        scaling scales out.
         """
         analysis_data = self.knowledge.analysis_data
-        failed_instances = analysis_data.get("failed_instances", [])
-        unhealthy_instances = analysis_data.get("unhealthy_instances", [])
-        qos_history = analysis_data.get("qos_history", {})
+        affected_services = analysis_data.get("affected_services")
+        if affected_services is None:
+            affected_services = index_affected_services(analysis_data.get("failed_instances", []),
+                                                        analysis_data.get("unhealthy_instances", []))
+        instance_performance = analysis_data.get("instance_performance", {})
+        scale_out = dict(analysis_data.get("scale_out", {}))
         adaptation_plan = []
         adaptation_plan2 = []
 
         # Prepare the load balancer weight adjustments
         load_balancer_adjustments = []
 
-        # # Add adaptation actions for each failed or unhealthy instance
-        services_to_adapt = {entry["service_id"] for entry in failed_instances + unhealthy_instances}
-        for service_id in services_to_adapt:
-            service_id = service_id.lower()
+        # # Add adaptation actions for each service with failed or unhealthy instances
+        for affected in affected_services.values():
+            service_id = affected.name
+            instances_to_add = max(1, scale_out.pop(affected.service_id, 0))
             adaptation_plan.append({
                 "operation": "addInstances",
                 "serviceImplementationName": service_id,
-                "numberOfInstances": 1  
+                "numberOfInstances": instances_to_add
             })
 
-            # Adjust load balancer weights
-            unhealthy_instances_in_service = []
-            for instance in unhealthy_instances:
-                if instance["service_id"].lower() == service_id.lower():
-                    unhealthy_instances_in_service.append(instance)
-
-            if len(unhealthy_instances_in_service) == 1:  # Only one unhealthy instance in the service
-                unhealthy_instance = unhealthy_instances_in_service[0]
-                instance_id = unhealthy_instance["instance_id"]
+            # Shift the service's traffic away from its failed and slow instances
+            load_balancer_adjustments.append(self._balance_load(
+                affected.service_id, instance_performance.get(affected.service_id, {}), instances_to_add,
+                affected.failed_instances))
 
-                # Health score of the unhealthy instance
-                unhealthy_health_score = qos_history[service_id.upper()].get(instance_id, {}).get("healthUtilityScore", 100)
-                new_instance_health_score = 100  # Assume new instance has perfect health
-
-                # Calculate new weight for the unhealthy instance
-                total_health_score = unhealthy_health_score + new_instance_health_score
-
-
-                unhealthy_weight = round(unhealthy_health_score 
-                                         / total_health_score, 2)
-                new_instance_weight = round(new_instance_health_score 
-                                            / total_health_score, 2)
-
-                # Add load balancer adjustment for the service
-                adaptation_plan.append({
-                    "operation": "changeLBWeights",
-                    "serviceID": service_id,
-                    "newWeights": {
-                        instance_id: unhealthy_weight,  # Weight for unhealthy instance
-                    },
-                    "instancesToRemoveWeightOf": []  # Optional: specify instances to exclude entirely
-                })
+        # Scale out the other services ahead of their forecast load
+        for service_id, instances_to_add in scale_out.items():
+            adaptation_plan.append({
+                "operation": "addInstances",
+                "serviceImplementationName": service_id.lower(),
+                "numberOfInstances": instances_to_add
+            })
+            load_balancer_adjustments.append(self._balance_load(
+                service_id, instance_performance.get(service_id, {}), instances_to_add))
 
+        # One load balancer weight adjustment per service, once its instances are added
+        adaptation_plan.extend(action for action in load_balancer_adjustments if action is not None)
 
 
         # Store the adaptation plan in the knowledge
@@ -4,6 +4,9 @@ import pprint
 
 from UPISAS.exceptions import EndpointNotReachable, ServerNotReachable
 from UPISAS.knowledge import Knowledge
+from UPISAS.clock import WallClock
+from UPISAS.json_decoding import FieldSelector, get_json_decoder
+from UPISAS.server_sent_events import DELTA, apply_delta, iter_chunks, iter_events, iter_lines
 from UPISAS import validate_schema, get_response_for_get_request
 import logging
 
@@ -11,17 +14,31 @@ pp = pprint.PrettyPrinter(indent=4)
 
 
 class Strategy(ABC):
+    # Dotted paths of the monitored fields the strategy uses (see UPISAS.json_decoding.FieldSelector),
+    # None to keep whole payloads. They must include the fields the monitor schema requires.
+    monitor_fields = None
 
-    def __init__(self, exemplar):
+    def __init__(self, exemplar, clock=None, recorder: "UPISAS.monitor_log.MonitorRecorder" = None,
+                 decoder: "name of a JSON decoder, None for the fastest installed one" = None):
         self.exemplar = exemplar
+        self.clock = clock if clock else WallClock()
+        self.recorder = recorder
+        self.decode = get_json_decoder(decoder)
+        self.field_selector = FieldSelector(self.monitor_fields) if self.monitor_fields else None
+        self._etags = {}  # ETag of the last response of each endpoint requested conditionally
         self.knowledge = Knowledge(dict(), dict(), dict(), dict(), dict(), dict(), dict())
 
     def ping(self):
         ping_res = self._perform_get_request(self.exemplar.base_endpoint)
         logging.info(f"ping result: {ping_res}")
 
-    def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=True):
-        fresh_data = self._perform_get_request(endpoint_suffix)
+    def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=True,
+                fresh_data: "payload received from subscribe(), instead of requesting one" = None):
+        if fresh_data is None:
+            fresh_data = self._perform_get_request(endpoint_suffix, self.field_selector, conditional=True)
+            if fresh_data is None:
+                if(verbose): print("[Monitor]\tunchanged since the last request")
+                return False
         if(verbose): print("[Monitor]\tgot fresh_data: " + str(fresh_data))
         if with_validation:
             if(not self.knowledge.monitor_schema): self.get_monitor_schema()
@@ -34,6 +51,34 @@ class Strategy(ABC):
         print("[Knowledge]\tdata monitored so far: " + str(self.knowledge.monitored_data))
         return True
 
+    def subscribe(self, endpoint_suffix="monitor/stream", interval: "seconds between checks on the exemplar" = None,
+                  timeout: "seconds without any event (or keep-alive) after which to give up" = None):
+        '''Yields monitor payloads pushed by the exemplar as server-sent events, each time they change, to pass to
+        monitor(fresh_data=...) instead of polling. Deltas (changed top-level keys) are merged into full payloads.'''
+        url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
+        params = {"interval": interval} if interval else None
+        try:
+            response = requests.get(url, params=params, stream=True, timeout=timeout,
+                                    headers={"Accept": "text/event-stream"})
+        except requests.exceptions.ConnectionError as e:
+            logging.error(e)
+            raise ServerNotReachable
+        if response.status_code == 404:
+            logging.error("The exemplar does not support monitoring subscriptions, poll it with monitor() instead.")
+            raise EndpointNotReachable
+        with response:
+            payload = None
+            for event, data in iter_events(iter_lines(iter_chunks(response.raw))):
+                if event == DELTA:
+                    if payload is None:
+                        raise ValueError("the monitoring stream sent a delta before a snapshot")
+                    payload = apply_delta(payload, self.decode(data))
+                else:
+                    payload = self.decode(data)
+                if self.recorder:
+                    self.recorder.record("monitor", payload, self.clock.time())
+                yield self.field_selector.select(payload) if self.field_selector else payload
+
     def execute(self, adaptation=None, endpoint_suffix="execute", with_validation=True):
         if(not adaptation): adaptation= self.knowledge.plan_data
         if with_validation:
@@ -70,13 +115,24 @@ class Strategy(ABC):
         #logging.info("adaptation_options_schema set to: ")
         #pp.pprint(self.knowledge.adaptation_options_schema)
 
-    def _perform_get_request(self, endpoint_suffix: "API Endpoint"):
+    def _perform_get_request(self, endpoint_suffix: "API Endpoint", field_selector=None,
+                             conditional: "return None if unchanged since the last conditional request" = False):
         url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
-        response = get_response_for_get_request(url)
+        etag = self._etags.get(endpoint_suffix) if conditional else None
+        response = get_response_for_get_request(url, headers={"If-None-Match": etag} if etag else None)
         if response.status_code == 404:
             logging.error("Please check that the endpoint you are trying to reach actually exists.")
             raise EndpointNotReachable
-        return response.json()
+        if response.status_code == 304:
+            return None
+        if conditional and "ETag" in response.headers:
+            self._etags[endpoint_suffix] = response.headers["ETag"]
+        payload = self.decode(response.content)
+        if self.recorder:
+            self.recorder.record(endpoint_suffix, payload, self.clock.time())
+        if field_selector:
+            payload = field_selector.select(payload)
+        return payload
 
     @abstractmethod
     def analyze(self):
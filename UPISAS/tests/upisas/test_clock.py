@@ -0,0 +1,73 @@
+import contextlib
+import io
+import time
+import unittest
+
+from UPISAS.clock import Clock, SimulatedClock, WallClock
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
+from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
+
+
+class TestClock(unittest.TestCase):
+    """
+    Test cases for the clocks.
+    """
+
+    def test_simulated_sleep_returns_immediately(self):
+        clock = SimulatedClock(start=100.0)
+        started = time.monotonic()
+        clock.sleep(3600)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(clock.time(), 3700.0)
+        with self.assertRaises(ValueError):
+            clock.advance(-1)
+
+    def test_incomplete_clock(self):
+        class TimeOnlyClock(Clock):
+            def time(self):
+                return 0.0
+
+        with self.assertRaises(TypeError):
+            TimeOnlyClock()
+
+    def test_ticks(self):
+        clock = SimulatedClock()
+        self.assertEqual(list(clock.ticks(3, duration=10)), [0, 3, 6, 9])
+        self.assertEqual(clock.time(), 12)
+
+    def test_wall_clock_ticks(self):
+        started = time.monotonic()
+        ticks = list(WallClock().ticks(0.02, duration=0.1))
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+        self.assertLessEqual(len(ticks), 5)
+
+
+class TestSimulatedScenario(unittest.TestCase):
+    """
+    Replays a RAMSES scenario against the simulator, in simulated time.
+    """
+
+    def _run_scenario(self):
+        clock = SimulatedClock()
+        simulation = RamsesSimulation(clock=clock, degradation_rate=0.02, seed=7)
+        with SimulatorServer(simulation) as server:
+            strategy = RamsesNovelStrategy(server, clock)
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in clock.ticks(5, duration=420):
+                    strategy.monitor(with_validation=False, verbose=False)
+                    if strategy.analyze() and strategy.plan():
+                        strategy.execute(with_validation=False)
+        return clock, simulation.executed
+
+    def test_scenario_runs_faster_than_real_time_with_identical_decisions(self):
+        started = time.monotonic()
+        clock, decisions = self._run_scenario()
+        self.assertEqual(clock.time(), 420)
+        self.assertLess(time.monotonic() - started, 60)
+        self.assertTrue(decisions)
+        self.assertEqual(self._run_scenario()[1], decisions)
+
+
+if __name__ == '__main__':
+    unittest.main()
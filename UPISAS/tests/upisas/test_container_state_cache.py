@@ -0,0 +1,102 @@
+import queue
+import time
+import unittest
+
+from UPISAS.exemplar import ContainerStateCache, _parse_daemon_time
+
+
+class FakeEventSource:
+    """
+    Stands in for the docker event stream: events put into it are yielded to the cache.
+    """
+    _CLOSED = object()
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.subscriptions = 0
+
+    def __call__(self):
+        self.subscriptions += 1
+        return self
+
+    def __iter__(self):
+        while True:
+            event = self.events.get()
+            if event is self._CLOSED:
+                return
+            yield event
+
+    def emit(self, container_id, action, time_ns=None):
+        self.events.put({"Type": "container", "Action": action, "Actor": {"ID": container_id},
+                         "timeNano": time_ns if time_ns is not None else time.time_ns()})
+
+    def close(self):
+        self.events.put(self._CLOSED)
+
+
+class TestContainerStateCache(unittest.TestCase):
+    """
+    Test cases for the ContainerStateCache class, using a fake event source instead of docker.
+    """
+
+    def setUp(self):
+        self.events = FakeEventSource()
+        self.cache = ContainerStateCache(self.events)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def _wait_for(self, container_id, status):
+        deadline = time.monotonic() + 5
+        while self.cache.status(container_id) != status and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.cache.status(container_id)
+
+    def test_unknown_container(self):
+        self.assertIsNone(self.cache.status("abc"))
+
+    def test_transitions_from_events(self):
+        self.cache.status("abc")  # subscribes
+        for action, status in [("create", "created"), ("start", "running"), ("pause", "paused"),
+                               ("unpause", "running"), ("kill", "running"), ("die", "exited"),
+                               ("destroy", "removed")]:
+            self.events.emit("abc", action)
+            self.assertEqual(self._wait_for("abc", status), status)
+        self.assertEqual(self.events.subscriptions, 1)
+
+    def test_late_event_does_not_override_newer_state(self):
+        self.cache.update("abc", "running", time_ns=2000)
+        self.events.emit("abc", "die", time_ns=1000)
+        self.events.emit("other", "start")
+        self._wait_for("other", "running")
+        self.assertEqual(self.cache.status("abc"), "running")
+
+    def test_event_after_local_state_wins(self):
+        # Only daemon times are compared: the local clock being ahead of the daemon's does not matter
+        self.cache.update("abc", "running", time_ns=2000)
+        self.events.emit("abc", "die", time_ns=2001)
+        self.assertEqual(self._wait_for("abc", "exited"), "exited")
+
+    def test_parse_daemon_time(self):
+        self.assertEqual(_parse_daemon_time("1970-01-01T00:00:01.5Z"), 1_500_000_000)
+        self.assertEqual(_parse_daemon_time("1970-01-01T02:00:01.123456789+02:00"), 1_123_456_789)
+        self.assertEqual(_parse_daemon_time("1970-01-01T00:00:01Z"), 1_000_000_000)
+        with self.assertRaises(ValueError):
+            _parse_daemon_time("yesterday")
+
+    def test_stream_end_invalidates_states(self):
+        self.cache.update("abc", "running", time_ns=time.time_ns())
+        self.assertEqual(self.cache.status("abc"), "running")
+        self.events.close()
+        self.assertIsNone(self._wait_for("abc", None))
+
+    def test_failing_event_source(self):
+        def event_source():
+            raise ConnectionError("docker is not available")
+        cache = ContainerStateCache(event_source)
+        cache.update("abc", "running", time_ns=time.time_ns())
+        self.assertIsNone(cache.status("abc"))
+
+
+if __name__ == '__main__':
+    unittest.main()
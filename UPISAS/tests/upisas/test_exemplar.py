@@ -1,5 +1,10 @@
 import unittest
-from UPISAS.exceptions import DockerImageNotFoundOnDockerHub
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import docker
+import requests
+from UPISAS import exemplar
+from UPISAS.exceptions import DockerImageNotFoundOnDockerHub, ExemplarNotReady
 from UPISAS.exemplar import Exemplar
 from UPISAS.exemplars.demo_exemplar import DemoExemplar
 
@@ -81,5 +86,230 @@ class TestExemplar(unittest.TestCase):
         self.assertEqual(self.exemplar.get_container_status(), "created")
 
 
+class FakeContainer:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.status = self.statuses[0]
+
+    def reload(self):
+        if len(self.statuses) > 1:
+            self.statuses.pop(0)
+        self.status = self.statuses[0]
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/monitor" else 404)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestWaitUntilReady(unittest.TestCase):
+    """
+    Test cases for Exemplar.wait_until_ready, using a fake container and a local HTTP server instead of docker.
+    """
+
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), OkHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.exemplar = DemoExemplar.__new__(DemoExemplar)
+        self.exemplar.base_endpoint = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_ready_once_container_runs_and_monitor_responds(self):
+        self.exemplar.exemplar_container = FakeContainer(["created", "created", "running"])
+        self.assertTrue(self.exemplar.wait_until_ready(timeout=5, initial_delay=0.01))
+
+    def test_container_only(self):
+        self.exemplar.base_endpoint = "http://127.0.0.1:1"
+        self.exemplar.exemplar_container = FakeContainer(["running"])
+        self.assertTrue(self.exemplar.wait_until_ready(timeout=5, endpoints=()))
+
+    def test_exited_container_never_becomes_ready(self):
+        self.exemplar.exemplar_container = FakeContainer(["running", "exited"])
+        with self.assertRaises(ExemplarNotReady):
+            self.exemplar.wait_until_ready(timeout=5, endpoints=("not_there",), initial_delay=0.01)
+
+    def test_timeout(self):
+        self.exemplar.exemplar_container = FakeContainer(["running"])
+        with self.assertRaises(ExemplarNotReady):
+            self.exemplar.wait_until_ready(timeout=0.2, endpoints=("not_there",), initial_delay=0.01)
+
+
+class FakeSnapshotContainer:
+    def __init__(self, image, name="Scenario_1"):
+        self.id = f"id-of-{image}"
+        self.name = name
+        self.image = image
+        self.status = "created"
+        self.removed = False
+
+    def reload(self):
+        if self.removed:
+            raise docker.errors.NotFound("removed")
+
+    def start(self):
+        self.status = "running"
+
+    def stop(self):
+        self.status = "exited"
+
+    def remove(self):
+        self.removed = True
+
+    def commit(self, repository, tag):
+        FakeSnapshotClient.images_committed.add(f"{repository}:{tag}")
+
+
+class FakeResponse:
+    def __init__(self, result=None, status_code=200):
+        self.result = result
+        self.status_code = status_code
+        self.reason = "Bad Request" if status_code >= 400 else "OK"
+        self.url = "http+docker://localhost/v1.41/containers/checkpoints"
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError("checkpoint is only supported in experimental mode", response=self)
+
+    def json(self):
+        return self.result
+
+
+class FakeSnapshotClient:
+    """
+    Stands in for the docker client, with or without CRIU checkpoint support.
+    """
+    images_committed = set()
+    base_url = "http+docker://localhost"
+    api_version = "1.41"
+
+    def __init__(self, criu, transient_failures=0):
+        self.criu = criu
+        self.transient_failures = transient_failures
+        self.checkpoints = set()
+        self.started_from = []
+        self.checkpoint_requests = 0
+        self.api = self
+        self.images = self
+        self.containers = self
+
+    def _respond(self, url, action):
+        assert url.startswith("http+docker://localhost/v1.41/containers/")
+        if "/checkpoints" in url:
+            self.checkpoint_requests += 1
+        if not self.criu:
+            return FakeResponse({"message": "checkpoint is only supported in experimental mode"}, status_code=400)
+        if self.transient_failures:
+            self.transient_failures -= 1
+            return FakeResponse({"message": "context deadline exceeded"}, status_code=500)
+        return FakeResponse(action())
+
+    def post(self, url, json=None, params=None):
+        if params:
+            return self._respond(url, lambda: self.started_from.append(params["checkpoint"]))
+        return self._respond(url, lambda: self.checkpoints.add(json["CheckpointID"]))
+
+    def get(self, url=None, image=None):
+        if url is None or not url.startswith("http"):
+            image = image or url
+            if image not in self.images_committed:
+                raise docker.errors.ImageNotFound(image)
+            return None
+        return self._respond(url, lambda: [{"Name": name} for name in self.checkpoints])
+
+    def delete(self, url):
+        return self._respond(url, lambda: self.checkpoints.discard(url.rsplit("/", 1)[-1]))
+
+    def remove(self, image):
+        self.get(image)
+        self.images_committed.discard(image)
+
+    def create(self, **kwargs):
+        return FakeSnapshotContainer(kwargs["image"], kwargs["name"])
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Test cases for snapshotting and restoring exemplars, using a fake docker client.
+    """
+
+    def setUp(self):
+        FakeSnapshotClient.images_committed = set()
+        self.get_docker_client = exemplar.get_docker_client
+        self.exemplar = DemoExemplar.__new__(DemoExemplar)
+        self.exemplar.docker_kwargs = {"name": "Scenario_1", "image": DemoExemplar.docker_image}
+        self.exemplar.exemplar_container = FakeSnapshotContainer(DemoExemplar.docker_image)
+        self.exemplar.start_container()
+
+    def tearDown(self):
+        exemplar.get_docker_client = self.get_docker_client
+        exemplar.Exemplar._checkpoint_unsupported = False
+
+    def _use_client(self, criu, transient_failures=0):
+        client = FakeSnapshotClient(criu, transient_failures)
+        exemplar.get_docker_client = lambda: client
+        return client
+
+    def test_checkpoint(self):
+        client = self._use_client(criu=True)
+        self.assertIsNone(self.exemplar.has_snapshot())
+        self.assertEqual(self.exemplar.create_snapshot(), "checkpoint")
+        self.assertEqual(self.exemplar.restore_snapshot(), "checkpoint")
+        self.assertEqual(self.exemplar.get_container_status(), "exited")
+        self.exemplar.start_container()
+        self.assertEqual(client.started_from, ["warm"])
+        self.exemplar.remove_snapshot()
+        self.assertIsNone(self.exemplar.has_snapshot())
+
+    def test_no_snapshot_without_checkpoint_support(self):
+        client = self._use_client(criu=False)
+        self.assertIsNone(self.exemplar.create_snapshot())
+        self.assertIsNone(self.exemplar.has_snapshot())
+        self.assertIsNone(self.exemplar.restore_snapshot())
+        self.assertEqual(self.exemplar.get_container_status(), "running")
+        # Not attempted again on the next runs
+        requests_made = client.checkpoint_requests
+        self.assertIsNone(self.exemplar.create_snapshot())
+        self.assertEqual(client.checkpoint_requests, requests_made)
+
+    def test_unsupported_checkpoints_found_by_has_snapshot_are_not_requested(self):
+        # As when has_snapshot() is called before the run processes are forked: exemplars used by the runs,
+        # which are other objects in other processes, know that the daemon cannot checkpoint
+        client = self._use_client(criu=False)
+        self.assertIsNone(self.exemplar.has_snapshot())
+        other = DemoExemplar.__new__(DemoExemplar)
+        other.exemplar_container = FakeSnapshotContainer(DemoExemplar.docker_image)
+        requests_made = client.checkpoint_requests
+        self.assertIsNone(other.create_snapshot())
+        self.assertEqual(client.checkpoint_requests, requests_made)
+
+    def test_transient_error_does_not_disable_checkpoints(self):
+        self._use_client(criu=True, transient_failures=1)
+        self.assertIsNone(self.exemplar.create_snapshot())
+        self.assertEqual(self.exemplar.create_snapshot(), "checkpoint")
+
+    def test_commit_without_checkpoint_support(self):
+        self._use_client(criu=False)
+        self.assertEqual(self.exemplar.create_snapshot(commit_fallback=True), "image")
+        container = self.exemplar.exemplar_container
+        self.assertEqual(self.exemplar.restore_snapshot(), "image")
+        self.assertTrue(container.removed)
+        self.assertEqual(self.exemplar.exemplar_container.image, "upisas-snapshot/scenario_1:warm")
+        self.assertEqual(self.exemplar.get_container_status(), "created")
+        self.exemplar.remove_snapshot()
+        self.assertIsNone(self.exemplar.has_snapshot())
+
+    def test_restore_without_snapshot(self):
+        self._use_client(criu=True)
+        self.assertIsNone(self.exemplar.restore_snapshot())
+        self.assertEqual(self.exemplar.get_container_status(), "running")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import time
+
+from UPISAS.exceptions import ExemplarNotReady
+from UPISAS.exemplar_pool import ExemplarPool
+
+
+class FakeExemplar:
+    """
+    Mimics the container lifecycle of an Exemplar without docker.
+    """
+    created = []
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.status = "created"
+        self.exemplar_container = object()
+        self.snapshot = None
+        self.restored = 0
+        FakeExemplar.created.append(self)
+
+    def get_container_status(self):
+        return self.status
+
+    def start_container(self):
+        self.status = "running"
+        return True
+
+    def stop_container(self, remove=True):
+        self.status = "removed" if remove else "exited"
+        if remove:
+            self.exemplar_container = None
+        return True
+
+    def create_snapshot(self):
+        self.snapshot = "checkpoint"
+
+    def restore_snapshot(self):
+        if self.snapshot:
+            self.restored += 1
+        return self.snapshot
+
+    def remove_snapshot(self):
+        self.snapshot = None
+
+
+class TestExemplarPool(unittest.TestCase):
+    """
+    Test cases for the ExemplarPool class, using fake exemplars.
+    """
+
+    def setUp(self):
+        FakeExemplar.created = []
+        self.pool = None
+
+    def tearDown(self):
+        if self.pool:
+            self.pool.close()
+
+    def test_prestarted_exemplars_are_running(self):
+        self.pool = ExemplarPool(FakeExemplar, size=2, prestart=True)
+        first = self.pool.acquire(timeout=5)
+        second = self.pool.acquire(timeout=5)
+        self.assertEqual({first.slot, second.slot}, {0, 1})
+        self.assertEqual(first.get_container_status(), "running")
+
+    def test_restart_reuses_container(self):
+        self.pool = ExemplarPool(FakeExemplar, size=1, prestart=True, recycle="restart")
+        exemplar = self.pool.acquire(timeout=5)
+        exemplar.stop_container(remove=False)
+        self.pool.release(exemplar)
+        self.assertIs(self.pool.acquire(timeout=5), exemplar)
+        self.assertEqual(exemplar.get_container_status(), "running")
+        self.assertEqual(len(FakeExemplar.created), 1)
+
+    def test_snapshot_restores_released_exemplar(self):
+        self.pool = ExemplarPool(FakeExemplar, size=1, recycle="snapshot")
+        exemplar = self.pool.acquire(timeout=5)
+        exemplar.start_container()
+        exemplar.create_snapshot()
+        self.pool.release(exemplar)
+        self.assertIs(self.pool.acquire(timeout=5), exemplar)
+        self.assertEqual(exemplar.restored, 1)
+        self.pool.release(exemplar)
+        self.pool.close()
+        self.pool = None
+        self.assertIsNone(exemplar.snapshot)
+
+    def test_release_after_close_discards(self):
+        self.pool = ExemplarPool(FakeExemplar, size=1, recycle="snapshot")
+        exemplar = self.pool.acquire(timeout=5)
+        exemplar.start_container()
+        exemplar.create_snapshot()
+        self.pool.close()
+        self.pool.release(exemplar)
+        self.pool = None
+        self.assertEqual(exemplar.restored, 0)
+        self.assertEqual(exemplar.get_container_status(), "removed")
+
+    def test_recreate_replaces_container(self):
+        self.pool = ExemplarPool(FakeExemplar, size=1, recycle="recreate")
+        exemplar = self.pool.acquire(timeout=5)
+        self.pool.release(exemplar)
+        replacement = self.pool.acquire(timeout=5)
+        self.assertIsNot(replacement, exemplar)
+        self.assertEqual(exemplar.get_container_status(), "removed")
+        self.assertEqual(replacement.slot, exemplar.slot)
+
+    def test_unhealthy_exemplar_is_replaced_on_acquire(self):
+        self.pool = ExemplarPool(FakeExemplar, size=1, prestart=True)
+        while self.pool._ready.qsize() == 0:
+            time.sleep(0.01)
+        FakeExemplar.created[0].status = "exited"  # the container died while waiting in the pool
+        self.assertEqual(self.pool.acquire(timeout=5).get_container_status(), "running")
+
+    def test_acquire_times_out_when_pool_is_empty(self):
+        self.pool = ExemplarPool(FakeExemplar, size=1)
+        self.pool.acquire(timeout=5)
+        with self.assertRaises(ExemplarNotReady):
+            self.pool.acquire(timeout=0.1)
+
+    def test_failing_factory(self):
+        def factory(slot):
+            raise RuntimeError("docker is not available")
+        self.pool = ExemplarPool(factory, size=1, max_attempts=2)
+        with self.assertRaises(ExemplarNotReady):
+            self.pool.acquire(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import contextlib
+import io
+import json
+import unittest
+
+from UPISAS.clock import SimulatedClock
+from UPISAS.json_decoding import FieldSelector, get_json_decoder
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
+from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
+
+
+class WholePayloadStrategy(RamsesNovelStrategy):
+    monitor_fields = None
+
+
+class TestJsonDecoding(unittest.TestCase):
+    """
+    Test cases for the JSON decoders and the selection of monitored fields.
+    """
+
+    def test_decoders_agree(self):
+        document = json.dumps({"a": [1, 2.5, "x", None, True], "b": {"c": -3}}).encode()
+        self.assertEqual(get_json_decoder()(document), json.loads(document))
+        self.assertEqual(get_json_decoder("json")(document), json.loads(document))
+        with self.assertRaises(ValueError):
+            get_json_decoder("yaml")
+
+    def test_field_selector(self):
+        payload = {"S1": {"snapshot": [{"instanceId": "i1", "cpuUsage": 0.5, "timestamp": "t",
+                                        "httpMetrics": {"GET /": {"outcomeMetrics": {"SUCCESS": {"count": 3}},
+                                                                  "endpoint": "/"}}}],
+                          "other": 1}}
+        selector = FieldSelector(["*.snapshot.*.instanceId", "*.snapshot.*.httpMetrics.*.outcomeMetrics",
+                                  "*.snapshot.*.status", "S1.other"])
+        self.assertEqual(selector.select(payload),
+                         {"S1": {"snapshot": [{"instanceId": "i1",
+                                               "httpMetrics": {"GET /": {"outcomeMetrics": {"SUCCESS": {"count": 3}}}}}],
+                                 "other": 1}})
+        self.assertEqual(FieldSelector(["S1.snapshot", "S1.snapshot.*.cpuUsage"]).select(payload),
+                         {"S1": {"snapshot": payload["S1"]["snapshot"]}})
+
+    def _run(self, strategy_class):
+        clock = SimulatedClock()
+        simulation = RamsesSimulation(clock=clock, degradation_rate=0.02, seed=11)
+        with SimulatorServer(simulation) as server:
+            strategy = strategy_class(server, clock)
+            strategy.get_monitor_schema()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in clock.ticks(5, duration=300):
+                    strategy.monitor(verbose=False)
+                    if strategy.analyze() and strategy.plan():
+                        strategy.execute(with_validation=False)
+        return simulation.executed
+
+    def test_selected_fields_keep_decisions(self):
+        decisions = self._run(RamsesNovelStrategy)
+        self.assertTrue(decisions)
+        self.assertEqual(self._run(WholePayloadStrategy), decisions)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import contextlib
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from UPISAS.clock import SimulatedClock
+from UPISAS.exemplars.replay import ReplayExemplar
+from UPISAS.monitor_log import MonitorRecorder, MonitorReplay, read_monitor_log
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
+from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
+
+
+class TestMonitorLog(unittest.TestCase):
+    """
+    Test cases for recording monitor payloads and replaying them.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "monitor_log.jsonl.gz")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _run(self, exemplar, clock, recorder=None):
+        strategy = RamsesNovelStrategy(exemplar, clock, recorder)
+        strategy.get_monitor_schema()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in clock.ticks(5, duration=300):
+                strategy.monitor(with_validation=False, verbose=False)
+                if strategy.analyze() and strategy.plan():
+                    strategy.execute(with_validation=False)
+        return exemplar.simulation.executed
+
+    def test_replay_reproduces_decisions(self):
+        clock = SimulatedClock()
+        with SimulatorServer(RamsesSimulation(clock=clock, degradation_rate=0.02, seed=3)) as server, \
+                MonitorRecorder(self.path) as recorder:
+            decisions = self._run(server, clock, recorder)
+        self.assertEqual(recorder.records, 61)  # the schema and 60 monitor payloads
+        self.assertTrue(decisions)
+
+        with ReplayExemplar(self.path, auto_start=True) as replay:
+            self.assertEqual(self._run(replay, SimulatedClock()), decisions)
+            self.assertTrue(replay.simulation.exhausted)
+            self.assertEqual(requests.get(f"{replay.base_endpoint}/execute_schema").status_code, 404)
+
+    def test_replay_follows_clock(self):
+        with MonitorRecorder(self.path) as recorder:
+            for t, value in [(100.0, 1), (110.0, 2), (130.0, 3)]:
+                recorder.record("monitor", {"value": value}, t)
+        clock = SimulatedClock()
+        replay = MonitorReplay(read_monitor_log(self.path), clock)
+        values = []
+        for _ in clock.ticks(10, duration=40):
+            values.append(replay.monitor()["value"])
+        self.assertEqual(values, [1, 2, 2, 3])
+
+    def test_not_a_monitor_log(self):
+        with gzip.open(self.path, "wt") as log:
+            log.write('{"t": 1.0, "endpoint": "monitor", "payload": {}}\n')
+        with self.assertRaises(ValueError):
+            list(read_monitor_log(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import threading
+import unittest
+
+import docker
+from docker.errors import DockerException
+
+from UPISAS import pull_manager
+from UPISAS.exceptions import DockerImageNotFoundOnDockerHub
+from UPISAS.pull_manager import PullManager, PullProgress
+
+
+class FakeDockerClient:
+    """
+    Stands in for the docker client: knows which images are local and on DockerHub, and streams a pull per image.
+    """
+    def __init__(self, local=(), hub=(), failures=0):
+        self.local = set(local)
+        self.hub = set(hub)
+        self.failures = failures
+        self.pulls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.images = self
+        self.api = self
+
+    def get(self, image_name):
+        if image_name not in self.local:
+            raise docker.errors.ImageNotFound(image_name)
+
+    def search(self, owner):
+        return [{"name": image_name.split(":")[0]} for image_name in self.hub if image_name.startswith(owner)]
+
+    def pull(self, image_name, stream, decode):
+        self.pulls.append(image_name)
+        self.release.wait(5)
+        yield {"status": "Pulling fs layer", "id": "layer1"}
+        yield {"status": "Downloading", "id": "layer1", "progressDetail": {"current": 50, "total": 100}}
+        if self.failures:
+            self.failures -= 1
+            yield {"error": "connection reset"}
+        yield {"status": "Download complete", "id": "layer1"}
+        yield {"status": "Pull complete", "id": "layer1"}
+        self.local.add(image_name)
+
+
+class TestPullProgress(unittest.TestCase):
+    def test_layers_are_aggregated(self):
+        progress = PullProgress("owner/image:tag")
+        progress.update({"status": "Pulling from owner/image", "id": "tag"})
+        progress.update({"status": "Already exists", "id": "layer1"})
+        progress.update({"status": "Downloading", "id": "layer2", "progressDetail": {"current": 20, "total": 80}})
+        progress.update({"status": "Extracting", "id": "layer2", "progressDetail": {"current": 0, "total": 80}})
+        self.assertEqual(progress.completed, 2 + 20)
+        self.assertEqual(progress.total, 2 + 160)
+        progress.update({"status": "Pull complete", "id": "layer2"})
+        self.assertEqual(progress.completed, progress.total)
+
+
+class TestPullManager(unittest.TestCase):
+    """
+    Test cases for the PullManager class, using a fake docker client.
+    """
+
+    def setUp(self):
+        self.client = FakeDockerClient(local=["owner/local"], hub=["owner/remote:tag", "owner/other"])
+        self.get_docker_client = pull_manager.get_docker_client
+        pull_manager.get_docker_client = lambda: self.client
+        self.manager = PullManager(max_workers=2, retry_delay=0)
+
+    def tearDown(self):
+        self.client.release.set()
+        self.manager.close()
+        pull_manager.get_docker_client = self.get_docker_client
+
+    def test_local_image_is_not_pulled(self):
+        self.assertEqual(self.manager.ensure("owner/local").result(timeout=5), "owner/local")
+        self.assertEqual(self.client.pulls, [])
+
+    def test_concurrent_requests_share_a_pull(self):
+        self.client.release.clear()
+        first = self.manager.ensure("owner/remote:tag")
+        second = self.manager.ensure("owner/remote:tag")
+        self.assertIs(first, second)
+        self.client.release.set()
+        first.result(timeout=5)
+        self.assertEqual(self.client.pulls, ["owner/remote:tag"])
+        self.assertEqual(self.manager._pulls, {})
+
+    def test_prefetch(self):
+        self.manager.prefetch(["owner/remote:tag", "owner/other", "owner/local", "owner/other"])
+        self.assertEqual(sorted(self.client.pulls), ["owner/other", "owner/remote:tag"])
+        self.assertIsNone(self.manager._progress)
+
+    def test_failed_pull_is_retried(self):
+        self.client.failures = 1
+        self.manager.ensure("owner/remote:tag").result(timeout=5)
+        self.assertEqual(self.client.pulls, ["owner/remote:tag"] * 2)
+
+    def test_pull_gives_up(self):
+        self.client.failures = 3
+        with self.assertRaises(DockerException):
+            self.manager.ensure("owner/remote:tag").result(timeout=5)
+
+    def test_image_not_on_dockerhub(self):
+        with self.assertRaises(DockerImageNotFoundOnDockerHub):
+            self.manager.ensure("owner/missing").result(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
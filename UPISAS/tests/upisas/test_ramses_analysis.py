@@ -0,0 +1,203 @@
+import contextlib
+import copy
+import io
+import unittest
+
+from UPISAS.clock import SimulatedClock
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
+from UPISAS.strategies.ramses_analysis import (AdaptedInstanceTracker, InstanceAnalysisCache, InstanceQoS,
+                                             InstanceSnapshot, ServiceSummary, _Record, index_affected_services)
+from UPISAS.strategies.ramses_baseline_strategy import RamsesBaselineStrategy
+from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
+
+
+class TestInstanceAnalysisCache(unittest.TestCase):
+    """
+    Test cases for the memoization of instance analyses.
+    """
+
+    def setUp(self):
+        self.instance = {"instanceId": "i1", "status": "ACTIVE", "cpuUsage": 0.5,
+                         "httpMetrics": {"GET /": {"outcomeMetrics": {"SUCCESS": {"count": 3, "totalDuration": 30.0}}}}}
+        self.computed = []
+        self.compute = lambda instance: self.computed.append(instance) or len(self.computed)
+
+    def test_reuses_result_of_unchanged_instance(self):
+        cache = InstanceAnalysisCache()
+        self.assertEqual(cache.get_or_compute("i1", self.instance, self.compute), 1)
+        self.assertEqual(cache.get_or_compute("i1", self.instance, self.compute), 1)
+        self.assertEqual(cache.get_or_compute("i1", copy.deepcopy(self.instance), self.compute), 1)
+        changed = copy.deepcopy(self.instance)
+        changed["httpMetrics"]["GET /"]["outcomeMetrics"]["SUCCESS"]["count"] = 4
+        self.assertEqual(cache.get_or_compute("i1", changed, self.compute), 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_evicts_least_recently_seen_instances(self):
+        cache = InstanceAnalysisCache(maxsize=2)
+        for instance_id in ("i1", "i2", "i1", "i3"):
+            cache.get_or_compute(instance_id, self.instance, self.compute)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_or_compute("i1", self.instance, self.compute), 1)
+        self.assertEqual(cache.get_or_compute("i2", self.instance, self.compute), 4)
+
+
+class TestAdaptedInstanceTracker(unittest.TestCase):
+    """
+    Test cases for the tracking of adapted instances.
+    """
+
+    def setUp(self):
+        self.clock = SimulatedClock()
+        self.tracker = AdaptedInstanceTracker(cooldown=60, maxsize=3, clock=self.clock)
+
+    def test_cooldown(self):
+        self.tracker.add("i1")
+        self.clock.advance(30)
+        self.tracker.add("i2")
+        self.clock.advance(30)
+        self.tracker.expire()
+        self.assertNotIn("i1", self.tracker)
+        self.assertIn("i2", self.tracker)
+        self.tracker.add("i1")
+        self.clock.advance(30)
+        self.tracker.expire()
+        self.assertEqual(list(self.tracker), ["i1"])
+
+    def test_bounded_and_absent_instances(self):
+        for instance_id in ("i1", "i2", "i3", "i4"):
+            self.tracker.add(instance_id)
+        self.assertEqual(list(self.tracker), ["i2", "i3", "i4"])
+        self.tracker.retain({"i3", "i5"})
+        self.assertEqual(list(self.tracker), ["i3"])
+
+    def test_instance_degrading_again_is_adapted_again(self):
+        instance = {"instanceId": "i1", "status": "ACTIVE", "cpuUsage": 1.0, "diskTotalSpace": 1.0,
+                    "diskFreeSpace": 0.0, "httpMetrics": {"GET /": {"outcomeMetrics": {"SERVER_ERROR": {"count": 1}}}}}
+        strategy = RamsesNovelStrategy(None, self.clock)
+        strategy.knowledge.time = self.clock.now()
+        unhealthy = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in self.clock.ticks(5, duration=125):
+                strategy.knowledge.monitored_data = {"S": [{"snapshot": [instance]}]}
+                strategy.analyze()
+                unhealthy.append(len(strategy.knowledge.analysis_data["unhealthy_instances"]))
+        self.assertEqual(unhealthy, [1] + [0] * 11 + [1] + [0] * 11 + [1])
+
+    def test_failed_instance_is_adapted_again_after_cooldown(self):
+        instance = {"instanceId": "i1", "status": "FAILED", "cpuUsage": 0.1, "diskTotalSpace": 1.0,
+                    "diskFreeSpace": 1.0, "httpMetrics": {"GET /": {"outcomeMetrics": {"SUCCESS": {"count": 1}}}}}
+        strategy = RamsesNovelStrategy(None, self.clock)
+        strategy.knowledge.time = self.clock.now()
+        failed = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in self.clock.ticks(5, duration=125):
+                strategy.knowledge.monitored_data = {"S": [{"snapshot": [instance]}]}
+                strategy.analyze()
+                failed.append(len(strategy.knowledge.analysis_data["failed_instances"]))
+        self.assertEqual(failed, [1] + [0] * 11 + [1] + [0] * 11 + [1])
+
+
+class TestRecords(unittest.TestCase):
+    """
+    Test cases for the records of the RAMSES analysis.
+    """
+
+    def test_instance_snapshot(self):
+        snapshot = InstanceSnapshot.from_dict({
+            "instanceId": "i1", "status": "ACTIVE", "cpuUsage": 0.5,
+            "httpMetrics": {"GET /": {"outcomeMetrics": {"SUCCESS": {"count": 3, "totalDuration": 30.0},
+                                                         "SERVER_ERROR": {"count": 1}}},
+                            "POST /": {"outcomeMetrics": {"SUCCESS": {"count": 2, "totalDuration": 10.0}}}}})
+        self.assertEqual((snapshot.total_requests, snapshot.successful_requests, snapshot.successful_requests_duration),
+                         (6, 5, 40.0))
+        self.assertEqual(snapshot["cpuUsage"], 0.5)
+        self.assertFalse(hasattr(snapshot, "__dict__"))
+
+    def test_dict_shapes(self):
+        qos = InstanceQoS(2 / 3, 12.34567, 3, 2, 24.69134, 81.234567, 0.5, 0.75)
+        self.assertEqual(qos.to_dict(), {"availability": 0.6667, "avgResponseTime": 12.3457,
+                                         "healthUtilityScore": 81.2346, "cpuUsage": 0.5,
+                                         "diskRemainingPercentage": 0.75, "total_requests": 3,
+                                         "successful_requests": 2, "successful_requests_duration": 24.6913})
+        self.assertEqual(qos["healthUtilityScore"], 81.234567)
+        self.assertEqual(InstanceQoS(1.0, 0.0, 0, 0, 0.0).get("healthUtilityScore", 100), 100)
+        with self.assertRaises(KeyError):
+            qos["healthUtility"]
+        self.assertEqual(list(InstanceQoS(1.0, 0.0, 0, 0, 0.0).to_dict()),
+                         ["availability", "avgResponseTime", "total_requests", "successful_requests",
+                          "successful_requests_duration"])
+        self.assertEqual(ServiceSummary(0.5, 10.0, 2, "1m 5s", time_key="time").to_dict(),
+                         {"avgAvailability": 0.5, "avgResponseTime": 10.0, "instanceCount": 2, "time": "1m 5s"})
+        self.assertEqual(ServiceSummary(0.5, 10.0, 2, "1m 5s", time_key="time")["time"], "1m 5s")
+
+    def test_equality(self):
+        summary = ServiceSummary(0.5, 10.0, 2, "1m 5s")
+        self.assertEqual(summary, ServiceSummary(0.5, 10.0, 2, "1m 5s"))
+        self.assertNotEqual(summary, ServiceSummary(0.5, 10.0, 3, "1m 5s"))
+        with self.assertRaises(TypeError):
+            {summary}  # mutable records are unhashable
+        with self.assertRaises(TypeError):
+            _Record()
+
+
+class TestPlanFromIndex(unittest.TestCase):
+    """
+    RamsesNovelStrategy plans from the failed and unhealthy instances indexed by service.
+    """
+
+    def test_plan(self):
+        failed = [{"service_id": "PAYMENT-SERVICE", "instance_id": "p1"}]
+        unhealthy = [{"service_id": "ORDERING-SERVICE", "instance_id": "o1"},
+                     {"service_id": "ORDERING-SERVICE", "instance_id": "o2"},
+                     {"service_id": "RESTAURANT-SERVICE", "instance_id": "r1"}]
+        qos = InstanceQoS(0.5, 0.0, 2, 1, 0.0, 60.0, 0.1, 0.9)
+        analysis_data = {"failed_instances": failed, "unhealthy_instances": unhealthy,
+                         "qos_history": {"RESTAURANT-SERVICE": {"r1": qos}}}
+        expected = [
+            {"operation": "addInstances", "serviceImplementationName": "payment-service", "numberOfInstances": 1},
+            {"operation": "addInstances", "serviceImplementationName": "ordering-service", "numberOfInstances": 1},
+            {"operation": "addInstances", "serviceImplementationName": "restaurant-service", "numberOfInstances": 1},
+            {"operation": "changeLBWeights", "serviceID": "payment-service", "newWeights": {},
+             "instancesToRemoveWeightOf": ["p1"]}]
+        strategy = RamsesNovelStrategy(None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for data in (analysis_data, dict(analysis_data, affected_services=index_affected_services(failed, unhealthy))):
+                strategy.knowledge.analysis_data = data
+                self.assertTrue(strategy.plan())
+                self.assertEqual(strategy.knowledge.plan_data, expected)
+
+
+class TestMemoizedAnalysis(unittest.TestCase):
+    """
+    The RAMSES strategies analyze the same with and without memoization.
+    """
+
+    def _analyses(self, strategy_class, cache):
+        clock = SimulatedClock()
+        simulation = RamsesSimulation(services=4, instances_per_service=3, failure_rate=0.05, degradation_rate=0.05,
+                                      clock=clock, seed=2)
+        analyses = []
+        with SimulatorServer(simulation) as server:
+            strategy = strategy_class(server, clock)
+            strategy.knowledge.analysis_cache = cache
+            with contextlib.redirect_stdout(io.StringIO()):
+                for tick in clock.ticks(5, duration=200):
+                    strategy.monitor(with_validation=False, verbose=False)
+                    if tick % 20:
+                        continue
+                    if strategy.analyze() and strategy.plan():
+                        strategy.execute(with_validation=False)
+                    analyses.append(copy.deepcopy(strategy.knowledge.analysis_data))
+        return analyses
+
+    def test_same_analysis(self):
+        for strategy_class in (RamsesNovelStrategy, RamsesBaselineStrategy):
+            cache = InstanceAnalysisCache()
+            self.assertEqual(self._analyses(strategy_class, cache),
+                             self._analyses(strategy_class, InstanceAnalysisCache(maxsize=0)))
+            self.assertGreater(cache.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import unittest
+
+from UPISAS.strategies.ramses_analysis import InstanceQoS
+from UPISAS.strategies.ramses_balancing import InstancePerformance, InstancePerformanceTracker, proportional_weights
+from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
+
+
+class TestInstancePerformanceTracker(unittest.TestCase):
+    """
+    Test cases for the measurement of the recent performance of instances.
+    """
+
+    def test_measures_served_requests(self):
+        tracker = InstancePerformanceTracker(alpha=0.5)
+        tracker.observe(0.0, "i1", InstanceQoS(1.0, 0.0, 100, 100, 5000.0, cpu_usage=0.5))
+        self.assertEqual(tracker["i1"].to_dict(), {"capacity": None, "responseTime": None, "availability": None})
+        # 100 requests in 5 seconds at half the CPU, 90 successful in 100ms each
+        tracker.observe(5.0, "i1", InstanceQoS(1.0, 0.0, 200, 190, 14000.0, cpu_usage=0.5))
+        self.assertEqual(tracker["i1"].to_dict(), {"capacity": 40.0, "responseTime": 100.0, "availability": 0.9})
+        tracker.observe(10.0, "i1", InstanceQoS(1.0, 0.0, 300, 290, 34000.0, cpu_usage=1.0))
+        self.assertEqual(tracker["i1"].to_dict(), {"capacity": 30.0, "responseTime": 150.0, "availability": 0.95})
+        # Restarted, with its counters reset: they are a new baseline
+        tracker.observe(15.0, "i1", InstanceQoS(1.0, 0.0, 250, 250, 5000.0, cpu_usage=0.5))
+        self.assertEqual(tracker["i1"].to_dict(), {"capacity": 30.0, "responseTime": 150.0, "availability": 0.95})
+        tracker.observe(20.0, "i1", InstanceQoS(1.0, 0.0, 350, 350, 15000.0, cpu_usage=1.0))
+        self.assertEqual(tracker["i1"].to_dict(), {"capacity": 25.0, "responseTime": 125.0, "availability": 0.975})
+        tracker.retain({"i2"})
+        self.assertEqual(len(tracker), 0)
+
+
+class TestProportionalWeights(unittest.TestCase):
+    """
+    Test cases for the load balancer weight optimizer.
+    """
+
+    def test_weights(self):
+        performances = {"fast": InstancePerformance(30.0, 100.0, 1.0),
+                        "slow": InstancePerformance(30.0, 200.0, 1.0),
+                        "small": InstancePerformance(15.0, 100.0, 1.0),
+                        "booting": InstancePerformance()}
+        # Effective capacities 30, 15, 15 and, for the average instance (capacity 25, response time 133ms), 18.75
+        self.assertEqual(proportional_weights(performances),
+                         {"fast": 0.38, "slow": 0.19, "small": 0.19, "booting": 0.24})
+        self.assertEqual(proportional_weights(performances, reserved_share=0.2),
+                         {"fast": 0.3, "slow": 0.15, "small": 0.15, "booting": 0.19})
+
+    def test_unmeasured_and_starved_instances(self):
+        self.assertEqual(proportional_weights({}), {})
+        self.assertEqual(proportional_weights({"i1": InstancePerformance(), "i2": InstancePerformance()}),
+                         {"i1": 0.5, "i2": 0.5})
+        performances = {"i1": InstancePerformance(100.0, 10.0, 1.0), "i2": InstancePerformance(1.0, 1000.0, 0.1)}
+        self.assertEqual(proportional_weights(performances), {"i1": 1.0, "i2": 0.01})
+
+
+class TestBalancedPlan(unittest.TestCase):
+    """
+    RamsesNovelStrategy emits a single load balancer weight adjustment per adapted service, over all its instances.
+    """
+
+    def test_plan(self):
+        unhealthy = [{"service_id": "ORDERING-SERVICE", "instance_id": "o1"},
+                     {"service_id": "ORDERING-SERVICE", "instance_id": "o2"}]
+        instance_performance = {"ORDERING-SERVICE": {"o1": InstancePerformance(20.0, 300.0, 0.9),
+                                                     "o2": InstancePerformance(20.0, 100.0, 1.0),
+                                                     "o3": InstancePerformance(25.0, 100.0, 1.0)},
+                                "PAYMENT-SERVICE": {"p1": InstancePerformance(25.0, 100.0, 1.0)}}
+        strategy = RamsesNovelStrategy(None)
+        strategy.knowledge.analysis_data = {"failed_instances": [], "unhealthy_instances": unhealthy,
+                                            "instance_performance": instance_performance,
+                                            "scale_out": {"PAYMENT-SERVICE": 3}}
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(strategy.plan())
+        self.assertEqual(strategy.knowledge.plan_data, [
+            {"operation": "addInstances", "serviceImplementationName": "ordering-service", "numberOfInstances": 1},
+            {"operation": "addInstances", "serviceImplementationName": "payment-service", "numberOfInstances": 3},
+            {"operation": "changeLBWeights", "serviceID": "ordering-service",
+             "newWeights": {"o1": 0.09, "o2": 0.29, "o3": 0.37}, "instancesToRemoveWeightOf": []},
+            {"operation": "changeLBWeights", "serviceID": "payment-service", "newWeights": {"p1": 0.25},
+             "instancesToRemoveWeightOf": []}])
+
+
+if __name__ == '__main__':
+    unittest.main()
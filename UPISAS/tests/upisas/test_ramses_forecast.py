@@ -0,0 +1,121 @@
+import contextlib
+import io
+import unittest
+
+from UPISAS.clock import SimulatedClock
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
+from UPISAS.strategies.ramses_forecast import HoltForecaster, ServiceLoadForecast
+from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
+
+
+class TestHoltForecaster(unittest.TestCase):
+    """
+    Test cases for Holt's linear exponential smoothing.
+    """
+
+    def test_follows_linear_trend(self):
+        forecaster = HoltForecaster()
+        self.assertIsNone(forecaster.forecast())
+        for value in range(0, 200, 10):
+            forecaster.update(value)
+        self.assertAlmostEqual(forecaster.forecast(0), 190, delta=1)
+        self.assertAlmostEqual(forecaster.forecast(3), 220, delta=3)
+
+
+class TestServiceLoadForecast(unittest.TestCase):
+    """
+    Test cases for the load forecast of a service.
+    """
+
+    def test_required_instances(self):
+        forecast = ServiceLoadForecast()
+        # Two instances serving 10 more requests per second every 5 seconds, at 0.02 CPU per request per second,
+        # with 100ms per request
+        total = 0
+        for tick in range(10):
+            rate = 20 + 10 * tick
+            total += rate * 5
+            counters = {"i1": (total // 2, total // 2, 50.0 * total), "i2": (total - total // 2, 0, 0.0)}
+            forecast.observe(5.0 * tick, counters, [0.01 * rate, 0.01 * rate])
+            if tick == 0:
+                self.assertIsNone(forecast.required_instances(30))
+        self.assertAlmostEqual(forecast.capacity, 50)
+        self.assertAlmostEqual(forecast.forecast_rate(0), 110, delta=2)
+        self.assertAlmostEqual(forecast.forecast_response_time(30), 100)
+        # 170 requests per second 30 seconds ahead, by instances serving 35 requests per second each
+        self.assertEqual(forecast.required_instances(30, target_utilization=0.7), 5)
+
+    def _steady(self, i2_total: "function of the tick giving i2's total requests, None while it is not monitored"):
+        '''Forecast of i1 and i2 serving 4 requests per second each at 0.4 CPU'''
+        forecast = ServiceLoadForecast()
+        for tick in range(20):
+            counters = {"i1": (1000 + 20 * tick, 1000 + 20 * tick, 10.0 * (1000 + 20 * tick))}
+            if i2_total(tick) is not None:
+                counters["i2"] = (i2_total(tick), i2_total(tick), 10.0 * i2_total(tick))
+            forecast.observe(5.0 * tick, counters, [0.4] * len(counters))
+            self.assertLess(forecast.forecast_rate(0) or 0, 9)
+            self.assertLessEqual(forecast.required_instances(30) or 0, 2)
+        self.assertAlmostEqual(forecast.forecast_rate(0), 8, delta=0.1)
+        self.assertEqual(forecast.required_instances(30), 2)
+
+    def test_missing_instance(self):
+        # The requests i2 served over its lifetime are not counted as served in the interval after it reappears
+        self._steady(lambda tick: None if tick == 5 else 1000 + 20 * tick)
+
+    def test_restarted_instance(self):
+        # i2 restarted after tick 5, its counters since (500 requests, over several intervals) are a new baseline
+        self._steady(lambda tick: 1000 + 20 * tick if tick <= 5 else 500 + 20 * (tick - 6))
+
+
+class TestPredictiveScaling(unittest.TestCase):
+    """
+    RamsesNovelStrategy with predictive scaling adds instances ahead of a load ramp.
+    """
+
+    def _ramp(self, predictive_scaling):
+        '''Number of ticks the service is saturated during a load ramp, and number of adaptations'''
+        clock = SimulatedClock()
+        simulation = RamsesSimulation(services=1, instances_per_service=2, failure_rate=0, degradation_rate=0,
+                                      clock=clock, seed=1)
+        saturated_ticks = 0
+        adaptations = 0
+        with SimulatorServer(simulation) as server:
+            strategy = RamsesNovelStrategy(server, clock)
+            strategy.predictive_scaling = predictive_scaling
+            with contextlib.redirect_stdout(io.StringIO()):
+                for tick in clock.ticks(5, duration=600):
+                    simulation.requests_per_second = min(150, 20 + max(0, tick - 50) * 0.4)
+                    strategy.monitor(with_validation=False, verbose=False)
+                    if strategy.analyze() and strategy.plan():
+                        strategy.execute(with_validation=False)
+                        adaptations += 1
+                    cpu_usages = [instance.cpu for instances in simulation.instances.values()
+                                  for instance in instances if instance.serves_traffic]
+                    saturated_ticks += sum(cpu_usages) / len(cpu_usages) >= 0.9
+        return saturated_ticks, adaptations
+
+    def test_scales_ahead_of_ramp(self):
+        reactive_saturated_ticks, reactive_adaptations = self._ramp(False)
+        saturated_ticks, adaptations = self._ramp(True)
+        self.assertGreater(reactive_saturated_ticks, 0)
+        self.assertEqual(saturated_ticks, 0)
+        self.assertLess(adaptations, reactive_adaptations)
+
+    def test_plan(self):
+        analysis_data = {"failed_instances": [{"service_id": "PAYMENT-SERVICE", "instance_id": "p1"}],
+                         "unhealthy_instances": [], "qos_history": {},
+                         "scale_out": {"PAYMENT-SERVICE": 3, "ORDERING-SERVICE": 2}}
+        strategy = RamsesNovelStrategy(None)
+        strategy.knowledge.analysis_data = analysis_data
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(strategy.plan())
+        self.assertEqual(strategy.knowledge.plan_data, [
+            {"operation": "addInstances", "serviceImplementationName": "payment-service", "numberOfInstances": 3},
+            {"operation": "addInstances", "serviceImplementationName": "ordering-service", "numberOfInstances": 2},
+            {"operation": "changeLBWeights", "serviceID": "payment-service", "newWeights": {},
+             "instancesToRemoveWeightOf": ["p1"]}])
+
+
+if __name__ == '__main__':
+    unittest.main()
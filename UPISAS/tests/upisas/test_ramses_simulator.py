@@ -0,0 +1,139 @@
+import unittest
+
+import requests
+
+from UPISAS import content_encoding, get_response_for_get_request
+from UPISAS.clock import SimulatedClock
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
+from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
+
+
+class TestRamsesSimulation(unittest.TestCase):
+    """
+    Test cases for the RAMSES simulation, without HTTP.
+    """
+
+    def setUp(self):
+        self.simulation = RamsesSimulation(services=3, instances_per_service=2, seed=1)
+
+    def test_metrics_are_cumulative(self):
+        first = self.simulation.monitor()["RESTAURANT-SERVICE"]["snapshot"][0]
+        second = self.simulation.monitor()["RESTAURANT-SERVICE"]["snapshot"][0]
+        endpoint = next(iter(first["httpMetrics"]))
+        count = lambda snapshot: snapshot["httpMetrics"][endpoint]["outcomeMetrics"]["SUCCESS"]["count"]
+        self.assertGreater(count(second), count(first))
+
+    def test_added_instances_boot_before_serving(self):
+        self.simulation.execute({"operation": "addInstances", "serviceImplementationName": "ordering-service",
+                                 "numberOfInstances": 2})
+        statuses = [i["status"] for i in self.simulation.monitor()["ORDERING-SERVICE"]["snapshot"]]
+        self.assertEqual(statuses.count("BOOTING"), 2)
+        for _ in range(self.simulation.boot_steps):
+            snapshot = self.simulation.monitor()["ORDERING-SERVICE"]["snapshot"]
+        self.assertEqual(len(snapshot), 4)
+        self.assertNotIn("BOOTING", [i["status"] for i in snapshot])
+
+    def test_load_balancer_weights(self):
+        instances = self.simulation.instances["restaurant-service"]
+        self.simulation.execute({"operation": "changeLBWeights", "serviceID": "restaurant-service",
+                                 "newWeights": {instances[0].instance_id: 0.0}})
+        snapshot = self.simulation.monitor()["RESTAURANT-SERVICE"]["snapshot"]
+        served = [sum(m["outcomeMetrics"]["SUCCESS"]["count"] for m in i["httpMetrics"].values()) for i in snapshot]
+        self.assertEqual(served[0], 0)
+        self.assertGreater(served[1], 0)
+
+    def test_failures(self):
+        simulation = RamsesSimulation(services=1, instances_per_service=3, failure_rate=1.0, seed=1)
+        snapshot = simulation.monitor()["API-GATEWAY-SERVICE"]["snapshot"]
+        self.assertTrue(all(i["failed"] or i["unreachable"] for i in snapshot))
+
+    def test_invalid_action(self):
+        with self.assertRaises(ValueError):
+            self.simulation.execute({"operation": "addInstances", "serviceImplementationName": "unknown-service"})
+        with self.assertRaises(ValueError):
+            self.simulation.execute({"operation": "reboot"})
+
+
+class TestRamsesSimulatorServer(unittest.TestCase):
+    """
+    Test cases running the RAMSES strategy against the simulator served over HTTP.
+    """
+
+    def setUp(self):
+        self.simulation = RamsesSimulation(services=3, instances_per_service=2, degradation_rate=1.0, seed=1)
+        self.server = SimulatorServer(self.simulation)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_strategy_adapts_simulated_system(self):
+        strategy = RamsesNovelStrategy(self.server)
+        for _ in range(15):
+            strategy.monitor(with_validation=True, verbose=False)
+        self.assertTrue(strategy.analyze())
+        self.assertTrue(strategy.plan())
+        self.assertTrue(strategy.execute(with_validation=False))
+        self.assertEqual(self.simulation.executed, strategy.knowledge.plan_data)
+
+    def test_stop_adaptation_and_unknown_endpoint(self):
+        response = requests.post(f"{self.server.base_endpoint}/configuration/stopAdaptation")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.simulation.adaptation_stopped)
+        self.assertEqual(requests.get(f"{self.server.base_endpoint}/unknown").status_code, 404)
+        self.assertEqual(requests.post(f"{self.server.base_endpoint}/execute", json={}).status_code, 400)
+
+    def test_compressed_monitor(self):
+        url = f"{self.server.base_endpoint}/monitor"
+        response = get_response_for_get_request(url)
+        self.assertIn(response.headers["Content-Encoding"], content_encoding.ENCODERS)
+        self.assertLess(int(response.headers["Content-Length"]), len(response.content))
+        identity = get_response_for_get_request(url, accept_encoding="identity")
+        self.assertNotIn("Content-Encoding", identity.headers)
+        self.assertEqual(response.json().keys(), identity.json().keys())
+        alive = requests.get(self.server.base_endpoint, headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", alive.headers)  # too small to be worth it
+
+    def test_unchanged_monitor_is_skipped(self):
+        clock = SimulatedClock()
+        simulation = RamsesSimulation(services=3, instances_per_service=2, clock=clock, seed=1)
+        with SimulatorServer(simulation) as server:
+            strategy = RamsesNovelStrategy(server, clock)
+            self.assertTrue(strategy.monitor(with_validation=False, verbose=False))
+            self.assertFalse(strategy.monitor(with_validation=False, verbose=False))
+            self.assertEqual(len(strategy.knowledge.monitored_data["RESTAURANT-SERVICE"]), 1)
+            strategy.analyze()
+            self.assertFalse(strategy.monitor(with_validation=False, verbose=False))
+            self.assertFalse(strategy.analyze())
+            clock.advance(5)
+            self.assertTrue(strategy.monitor(with_validation=False, verbose=False))
+            response = requests.get(f"{server.base_endpoint}/monitor")
+            self.assertEqual(requests.get(f"{server.base_endpoint}/monitor",
+                                          headers={"If-None-Match": response.headers["ETag"]}).status_code, 304)
+
+    def test_unclocked_monitor_always_changes(self):
+        # Without a clock every poll steps the simulation, so a conditional poll gets the next payload
+        url = f"{self.server.base_endpoint}/monitor"
+        response = requests.get(url)
+        conditional = requests.get(url, headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(conditional.status_code, 200)
+        self.assertNotEqual(conditional.headers["ETag"], response.headers["ETag"])
+        # Schemas do not change: their ETag is matched
+        schema = requests.get(f"{self.server.base_endpoint}/monitor_schema")
+        self.assertEqual(requests.get(f"{self.server.base_endpoint}/monitor_schema",
+                                      headers={"If-None-Match": schema.headers["ETag"]}).status_code, 304)
+
+    def test_negotiate(self):
+        self.assertEqual(content_encoding.negotiate("deflate, gzip;q=0.5"), "gzip")
+        self.assertEqual(content_encoding.negotiate("gzip;q=0, deflate"), "deflate")
+        self.assertEqual(content_encoding.negotiate("gzip", encodings=()), None)
+        self.assertEqual(content_encoding.negotiate(None), None)
+        self.assertEqual(content_encoding.negotiate("gzip;q=high, deflate"), "deflate")
+        monitor = requests.get(f"{self.server.base_endpoint}/monitor", headers={"Accept-Encoding": "gzip;q=x"})
+        self.assertEqual(monitor.status_code, 200)
+        self.assertNotIn("Content-Encoding", monitor.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
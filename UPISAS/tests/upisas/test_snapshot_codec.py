@@ -0,0 +1,110 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from UPISAS.monitor_log import MonitorRecorder
+from UPISAS.simulators.ramses import RamsesSimulation
+from UPISAS.snapshot_codec import SnapshotReader, SnapshotWriter, convert_monitor_log
+
+
+class TestSnapshotCodec(unittest.TestCase):
+    """
+    Test cases for the binary snapshot codec.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "snapshots.upsc")
+        simulation = RamsesSimulation(degradation_rate=0.02, seed=5)
+        self.snapshots = []
+        for t in range(0, 500, 5):
+            simulation.step(5)
+            if t == 250:
+                simulation.execute({"operation": "addInstances", "serviceImplementationName": "restaurant-service",
+                                    "numberOfInstances": 1})
+            self.snapshots.append((float(t), json.loads(json.dumps(simulation.monitor()))))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, keyframe_interval=16):
+        with SnapshotWriter(self.path, keyframe_interval) as writer:
+            for t, snapshot in self.snapshots:
+                writer.write(t, snapshot)
+        return SnapshotReader(self.path)
+
+    def test_round_trip(self):
+        reader = self._write()
+        self.assertEqual(len(reader), len(self.snapshots))
+        self.assertEqual(list(reader), self.snapshots)
+
+    def test_random_access_by_time(self):
+        reader = self._write()
+        self.assertEqual(reader.at(123.0), self.snapshots[24][1])
+        self.assertEqual(reader.at(125.0), self.snapshots[25][1])
+        self.assertEqual(reader[-1], self.snapshots[-1])
+        with self.assertRaises(KeyError):
+            reader.at(-1)
+
+    def test_column(self):
+        reader = self._write()
+        service = next(iter(self.snapshots[0][1]))
+        path = (service, "snapshot", 0, "cpuUsage")
+        expected = [snapshot[service]["snapshot"][0]["cpuUsage"] for _, snapshot in self.snapshots]
+        self.assertEqual(reader.column(path), expected)
+        self.assertEqual(reader.column(("no-such-service",)), [None] * len(self.snapshots))
+
+    def test_much_smaller_than_json(self):
+        self._write()
+        json_size = sum(len(json.dumps(snapshot)) for _, snapshot in self.snapshots)
+        self.assertLess(os.path.getsize(self.path), json_size / 10)
+
+    def test_values_of_every_type(self):
+        snapshots = [(0.0, {"a": [1, 2.5, "x", True, None, 2**70], "b": {}}),
+                     (1.0, {"a": [-3, float("inf"), "y", False, None, -2**70], "b": {}}),
+                     (2.0, [2**63 - 1, -2**63]),
+                     (3.0, [-2**63, 2**63 - 1])]
+        with SnapshotWriter(self.path) as writer:
+            for t, snapshot in snapshots:
+                writer.write(t, snapshot)
+            with self.assertRaises(ValueError):
+                writer.write(0.0, {})
+        self.assertEqual(list(SnapshotReader(self.path)), snapshots)
+
+    def test_shapes_sharing_records(self):
+        # Records in lists are built by functions shared between shapes, with values taken at their own offsets
+        snapshots = [(0.0, [{"id": "a", "n": 1, "sub": [{"x": 1.5}, 2]}, {"id": "b", "n": 2, "sub": []}]),
+                     (1.0, [{"id": "b", "n": 3, "sub": []}, {"id": "a", "n": 4, "sub": [{"x": 2.5}, 5]}, "c"]),
+                     (2.0, {"s": [{"id": "d", "n": None, "sub": []}, {"id": "e", "n": 6, "sub": []}]})]
+        with SnapshotWriter(self.path) as writer:
+            for t, snapshot in snapshots:
+                writer.write(t, snapshot)
+        self.assertEqual(list(SnapshotReader(self.path)), snapshots)
+
+    def test_convert_monitor_log(self):
+        log_path = os.path.join(self.tmpdir, "monitor_log.jsonl.gz")
+        with MonitorRecorder(log_path) as recorder:
+            recorder.record("monitor_schema", {"type": "object"}, 0.0)
+            for t, snapshot in self.snapshots:
+                recorder.record("monitor", snapshot, t)
+        self.assertEqual(convert_monitor_log(log_path, self.path), len(self.snapshots))
+        self.assertEqual(list(SnapshotReader(self.path)), self.snapshots)
+
+    def test_incomplete_file(self):
+        writer = SnapshotWriter(self.path)
+        writer.write(0.0, {"a": 1})
+        writer._file.flush()
+        with self.assertRaises(ValueError):
+            SnapshotReader(self.path)
+        writer.close()
+        with gzip.open(self.path, "wb") as file:
+            file.write(b"{}")
+        with self.assertRaises(ValueError):
+            SnapshotReader(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import itertools
+import time
+import unittest
+
+import requests
+
+from UPISAS.clock import SimulatedClock
+from UPISAS.server_sent_events import SNAPSHOT, iter_chunks, iter_events, iter_lines
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
+from UPISAS.strategies.ramses_strategy import RamsesNovelStrategy
+
+
+class TestSubscription(unittest.TestCase):
+    """
+    Test cases for monitoring subscriptions through server-sent events.
+    """
+
+    def test_iter_events(self):
+        lines = [b": keepalive", b"", b"event: snapshot", b"data: {\"a\":", b"data: 1}", b"", b"data:2", b""]
+        self.assertEqual(list(iter_events(lines)), [("snapshot", b"{\"a\":\n1}"), ("message", b"2")])
+
+    def test_events_arrive_without_read1(self):
+        class Urllib3v1Response:
+            '''urllib3 1.26 responses have stream() but no read1()'''
+            def __init__(self, raw):
+                self.stream = raw.stream
+
+        simulation = RamsesSimulation(services=3, instances_per_service=2, clock=SimulatedClock(), seed=1)
+        with SimulatorServer(simulation) as server:
+            with requests.get(f"{server.base_endpoint}/monitor/stream", params={"interval": 0.01}, stream=True,
+                              timeout=5) as response:
+                self.assertEqual(response.headers["Transfer-Encoding"], "chunked")
+                # The first event is received although the stream stays open and the next block is not full
+                event, _ = next(iter_events(iter_lines(iter_chunks(Urllib3v1Response(response.raw)))))
+                self.assertEqual(event, SNAPSHOT)
+
+    def test_pushes_only_changes(self):
+        clock = SimulatedClock()
+        simulation = RamsesSimulation(services=3, instances_per_service=2, clock=clock, seed=1)
+        with SimulatorServer(simulation) as server:
+            strategy = RamsesNovelStrategy(server, clock)
+            strategy.monitor_fields = None
+            strategy.field_selector = None
+            stream = strategy.subscribe(interval=0.01, timeout=5)
+            first = next(stream)
+            clock.advance(5)  # events are pushed only once the simulated system changed
+            second = next(stream)
+            self.assertNotEqual(first, second)
+            self.assertEqual(second, simulation.monitor())
+            stream.close()
+
+    def test_idle_stream_does_not_step_simulation(self):
+        simulation = RamsesSimulation(services=3, instances_per_service=2, seed=1)
+        with SimulatorServer(simulation) as server:
+            strategy = RamsesNovelStrategy(server)
+            strategy.monitor_fields = None
+            strategy.field_selector = None
+            stream = strategy.subscribe(interval=0.01, timeout=5)
+            first = next(stream)
+            time.sleep(0.2)
+            self.assertEqual(simulation.snapshot(), first)
+            # Polling /monitor steps the simulation, and the stream pushes the change
+            polled = requests.get(f"{server.base_endpoint}/monitor").json()
+            self.assertNotEqual(polled, first)
+            self.assertEqual(next(stream), polled)
+            stream.close()
+
+    def test_strategy_adapts_from_stream(self):
+        clock = SimulatedClock()
+        simulation = RamsesSimulation(services=3, instances_per_service=2, degradation_rate=1.0, clock=clock, seed=1)
+        with SimulatorServer(simulation) as server:
+            strategy = RamsesNovelStrategy(server, clock)
+            with contextlib.redirect_stdout(io.StringIO()):
+                for payload in itertools.islice(strategy.subscribe(interval=0.01, timeout=5), 15):
+                    strategy.monitor(fresh_data=payload, with_validation=True, verbose=False)
+                    clock.advance(5)
+                self.assertTrue(strategy.analyze())
+                self.assertTrue(strategy.plan())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.swim import SwimSimulation, load_trace
+from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager
+
+
+class TestSwimSimulation(unittest.TestCase):
+    """
+    Test cases for the SWIM simulation, without HTTP.
+    """
+
+    def test_load_trace(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".delta", delete=False) as trace:
+            trace.write("0.5\n" * 240 + "1.0\n" * 30)
+        try:
+            rates = load_trace(trace.name, period=60.0)
+            self.assertEqual(len(rates), 3)
+            self.assertAlmostEqual(rates[1], 2.0, places=1)
+            self.assertAlmostEqual(sum(rates) * 60.0, 270)
+        finally:
+            os.remove(trace.name)
+
+    def test_dimmer_lowers_response_time(self):
+        full, dimmed = (SwimSimulation(trace=[30.0], initial_dimmer=dimmer, seed=1) for dimmer in (1.0, 0.0))
+        self.assertGreater(full.monitor()["basic_rt"], dimmed.monitor()["basic_rt"])
+
+    def test_overload_builds_backlog(self):
+        simulation = SwimSimulation(trace=[40.0], seed=1)
+        first = simulation.monitor()["basic_rt"]
+        self.assertGreater(simulation.monitor()["basic_rt"], first)
+
+    def test_added_server_boots(self):
+        simulation = SwimSimulation(trace=[10.0], boot_delay=120.0, period=60.0)
+        simulation.execute({"server_number": 2, "dimmer_factor": 1.0})
+        self.assertEqual((simulation.monitor()["servers"], simulation.snapshot()["active_servers"]), (2, 1))
+        self.assertEqual(simulation.monitor()["active_servers"], 2)
+
+    def test_invalid_adaptation(self):
+        with self.assertRaises(ValueError):
+            SwimSimulation().execute({"servers": 2})
+
+
+class TestSwimSimulatorServer(unittest.TestCase):
+    """
+    Test cases running the reactive SWIM strategy against the simulator served over HTTP.
+    """
+
+    def setUp(self):
+        self.simulation = SwimSimulation(seed=1)
+        self.server = SimulatorServer(self.simulation)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_reactive_strategy_scales_with_load(self):
+        strategy = ReactiveAdaptationManager(self.server)
+        strategy.get_monitor_schema()
+        strategy.get_execute_schema()
+        for _ in range(len(self.simulation.trace)):
+            strategy.monitor(verbose=False)
+            if strategy.analyze() and strategy.plan():
+                strategy.execute()
+        monitored = strategy.knowledge.monitored_data
+        self.assertGreater(max(monitored["servers"]), 1)
+        self.assertLess(min(monitored["dimmer_factor"]), 0.5)  # the peak of the trace needs the dimmer
+        self.assertEqual(monitored["dimmer_factor"][-1], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
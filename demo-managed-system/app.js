@@ -1,4 +1,5 @@
 var express = require('express');
+var compression = require('compression');
 
 // Constants
 const PORT = 3000;
@@ -18,6 +19,13 @@ const HOST = '0.0.0.0';
 
 var app = express();
 
+// Compress responses (gzip or deflate, as negotiated through Accept-Encoding) larger than 1kb
+app.use(compression({ threshold: 1024 }));
+
+// Responses carry an ETag of their body; requests whose If-None-Match matches it get an empty 304 response,
+// which UPISAS uses to skip unchanged monitor payloads (set enableRandom to false to see it)
+app.set('etag', 'strong');
+
 var x = 0.0
 var y = 0.0
 
@@ -27,14 +35,47 @@ app.get('/', function (req, res) {
     res.send("alive")
 });
 
-app.get('/monitor', function (req, res) {
+function monitoredValues() {
     var rnd = 1
     if (enableRandom) {
         rnd = Math.random()
     }
-    res.send(JSON.stringify({
+    return {
         f: rnd * ( 0.4 + -1 * (0.3 * (1 - x) * x + y * (2 - y) * 0.3 + x * y / 100))
-    }));
+    }
+}
+
+app.get('/monitor', function (req, res) {
+    res.send(JSON.stringify(monitoredValues()));
+});
+
+// Monitoring subscription: pushes the monitored values as server-sent events whenever they change, checking
+// every `interval` seconds (query parameter, 1 by default) and right after each execution
+var subscribers = new Set();
+
+app.get('/monitor/stream', function (req, res) {
+    var interval = parseFloat(req.query.interval) || 1
+    res.writeHead(200, {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'Connection': 'keep-alive'
+    });
+    var last = null
+    var push = function () {
+        var data = JSON.stringify(monitoredValues())
+        if (data !== last) {
+            res.write("event: snapshot\ndata: " + data + "\n\n")
+            res.flush() // added by the compression middleware, which would otherwise buffer events
+            last = data
+        }
+    }
+    push()
+    var timer = setInterval(push, interval * 1000)
+    subscribers.add(push)
+    req.on('close', function () {
+        clearInterval(timer)
+        subscribers.delete(push)
+    });
 });
 
 app.put('/execute', function (req, res) {
@@ -43,6 +84,7 @@ app.put('/execute', function (req, res) {
         x = req.body.x || x
         y = req.body.y || y
     }
+    subscribers.forEach(function (push) { push() })
     res.send("ok")
 });
 
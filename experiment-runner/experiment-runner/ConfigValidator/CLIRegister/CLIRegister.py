@@ -3,7 +3,6 @@ import uuid
 import inspect
 from typing import List
 from shutil import copyfile
-from tabulate import tabulate
 
 from ConfigValidator.Config.RunnerConfig import RunnerConfig
 from ExperimentOrchestrator.Misc.BashHeaders import BashHeaders
@@ -92,6 +91,8 @@ class Help:
         print("\n%-*s  %s" % (10, "Usage:", "python experiment-runner/ <path_to_config.py>"))
         print("%-*s  %s" % (10, "Utility:", "python experiment-runner/ <command>"))
 
+        from tabulate import tabulate  # only needed for help output
+
         print("\nAvailable commands:\n")
         print(tabulate([(k, v.description_params()) for k, v in CLIRegister.register.items()], ["Command", "Parameters"]))
 
@@ -1,5 +1,4 @@
 from pathlib import Path
-from tabulate import tabulate
 
 from ExperimentOrchestrator.Misc.DictConversion import class_to_dict
 from ExperimentOrchestrator.Misc.PathValidation import is_path_exists_or_creatable_portable
@@ -53,6 +52,7 @@ class ConfigValidator:
                         )
 
         # Display config in user-friendly manner, including potential errors found
+        from tabulate import tabulate
         print(
             tabulate(
                 ConfigValidator.config_values_or_exception_dict.items(),
@@ -1,5 +1,6 @@
 import time
 import multiprocessing
+from typing import Callable
 
 from ConfigValidator.Config.Models.Metadata import Metadata
 from ConfigValidator.CustomErrors.BaseError import BaseError
@@ -30,7 +31,7 @@ from ConfigValidator.CustomErrors.ProgressErrors import AllRunsCompletedOnRestar
 ###     =========================================================
 class ExperimentController:
 
-    def __init__(self, config: RunnerConfig, metadata: Metadata):
+    def __init__(self, config: RunnerConfig, metadata: Metadata, legacy_md5sum: Callable[[], bytes] = None):
         self.config = config
         self.metadata = metadata
 
@@ -63,7 +64,13 @@ class ExperimentController:
                                 )
             # check md5sum
             existing_metadata = self.json_data_manager.read_metadata()
-            if existing_metadata.md5sum != self.metadata.md5sum:  # check md5sum
+            if existing_metadata.md5sum != self.metadata.md5sum and legacy_md5sum is not None \
+                    and existing_metadata.md5sum == legacy_md5sum():
+                # Experiment started before the md5sum was computed from the AST dump instead of its dill pickle
+                output.console_log_WARNING(f"Updating md5sum from the legacy {existing_metadata.md5sum.hex()} "
+                                           f"to {self.metadata.md5sum.hex()}")
+                self.json_data_manager.write_metadata(self.metadata)
+            elif existing_metadata.md5sum != self.metadata.md5sum:  # check md5sum
                 cont = output.query_yes_no("md5sum mismatch! This can occur if the configuration code "
                                            "has changed since the last run. Continue anyway?", default=None)
                 if not cont:
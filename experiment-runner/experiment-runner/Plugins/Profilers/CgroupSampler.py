@@ -0,0 +1,298 @@
+from enum import Enum, auto
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import csv
+import re
+import threading
+import time
+
+from ConfigValidator.Config.Models.RunnerContext import RunnerContext
+from ConfigValidator.Config.RunnerConfig import RunnerConfig
+
+class DataColumns(Enum):
+    """Run-level aggregates of the per-container samples. Values are summed over all sampled containers.
+      CPU_USAGE_AVG / CPU_USAGE_MAX : CPU utilization in percent of one core (100.0 == one fully used core)
+      MEMORY_AVG / MEMORY_MAX       : resident memory of the cgroup in bytes
+      NET_RX_BYTES / NET_TX_BYTES   : bytes received / sent by the container's network namespace during measurement
+      BLKIO_READ_BYTES / _WRITE_BYTES : bytes read from / written to block devices during measurement
+    """
+    CPU_USAGE_AVG       = auto()
+    CPU_USAGE_MAX       = auto()
+    MEMORY_AVG          = auto()
+    MEMORY_MAX          = auto()
+    NET_RX_BYTES        = auto()
+    NET_TX_BYTES        = auto()
+    BLKIO_READ_BYTES    = auto()
+    BLKIO_WRITE_BYTES   = auto()
+
+    _PATTERN = re.compile(r'(cgroup__)(.+)') # group1: prefix, group2: name
+
+    @property
+    def name(self) -> str:
+        return f'cgroup__{super().name.lower()}'
+
+class CgroupSampler(object):
+    """Samples CPU, memory, network and block I/O of docker containers directly from the cgroup filesystem.
+
+    Both cgroup v2 (unified hierarchy, systemd or cgroupfs driver) and cgroup v1 layouts are supported.
+    `cgroup_root` and `proc_root` can point to a mock tree, which is how the plugin is tested.
+    `container_ids` can be a callable, which is called at every sample, for containers created or removed
+    during the measurement.
+    """
+    SAMPLE_FIELDS = ['timestamp', 'container_id', 'cpu_usage', 'memory',
+                     'net_rx_bytes', 'net_tx_bytes', 'blkio_read_bytes', 'blkio_write_bytes']
+
+    def __init__(self, container_ids: Union[Iterable[str], Callable[[], Iterable[str]]], interval: float = 1.0,
+                 cgroup_root: str = '/sys/fs/cgroup', proc_root: str = '/proc'):
+        self.container_ids = container_ids if callable(container_ids) else list(container_ids)
+        self.interval = interval
+        self.cgroup_root = Path(cgroup_root)
+        self.proc_root = Path(proc_root)
+        self.samples: List[Dict] = []
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._last_cpu = {}
+        self._baseline = {}
+
+    # ---- cgroup path resolution ----
+
+    def _v2_dir(self, container_id: str) -> Optional[Path]:
+        for candidate in (self.cgroup_root / 'system.slice' / f'docker-{container_id}.scope',
+                          self.cgroup_root / 'docker' / container_id):
+            if (candidate / 'cgroup.controllers').exists() or (candidate / 'cpu.stat').exists():
+                return candidate
+        return None
+
+    def _v1_dir(self, controller: str, container_id: str) -> Optional[Path]:
+        for candidate in (self.cgroup_root / controller / 'docker' / container_id,
+                          self.cgroup_root / controller / 'system.slice' / f'docker-{container_id}.scope'):
+            if candidate.exists():
+                return candidate
+        return None
+
+    # ---- raw readers (cumulative counters) ----
+
+    @staticmethod
+    def _read_int(path: Path) -> int:
+        return int(path.read_text().strip())
+
+    def _read_cpu_seconds(self, container_id: str) -> float:
+        v2 = self._v2_dir(container_id)
+        if v2:
+            for line in (v2 / 'cpu.stat').read_text().splitlines():
+                key, value = line.split()
+                if key == 'usage_usec':
+                    return int(value) / 1e6
+            return 0.0
+        v1 = self._v1_dir('cpuacct', container_id) or self._v1_dir('cpu,cpuacct', container_id)
+        return self._read_int(v1 / 'cpuacct.usage') / 1e9
+
+    def _read_memory(self, container_id: str) -> int:
+        v2 = self._v2_dir(container_id)
+        if v2:
+            return self._read_int(v2 / 'memory.current')
+        return self._read_int(self._v1_dir('memory', container_id) / 'memory.usage_in_bytes')
+
+    def _read_blkio(self, container_id: str):
+        read_bytes, write_bytes = 0, 0
+        v2 = self._v2_dir(container_id)
+        if v2:
+            io_stat = v2 / 'io.stat'
+            if io_stat.exists():
+                for line in io_stat.read_text().splitlines():
+                    fields = dict(f.split('=') for f in line.split()[1:] if '=' in f)
+                    read_bytes += int(fields.get('rbytes', 0))
+                    write_bytes += int(fields.get('wbytes', 0))
+            return read_bytes, write_bytes
+        v1 = self._v1_dir('blkio', container_id)
+        io_stat = v1 / 'blkio.throttle.io_service_bytes' if v1 else None
+        if io_stat and io_stat.exists():
+            for line in io_stat.read_text().splitlines():
+                fields = line.split()
+                if len(fields) != 3:
+                    continue
+                if fields[1] == 'Read':
+                    read_bytes += int(fields[2])
+                elif fields[1] == 'Write':
+                    write_bytes += int(fields[2])
+        return read_bytes, write_bytes
+
+    def _read_network(self, container_id: str):
+        """Network counters are not part of the cgroup; read them from the net namespace of any process in it."""
+        cgroup_dir = self._v2_dir(container_id) or self._v1_dir('memory', container_id)
+        procs = (cgroup_dir / 'cgroup.procs') if cgroup_dir else None
+        if not procs or not procs.exists():
+            return 0, 0
+        pids = procs.read_text().split()
+        if not pids:
+            return 0, 0
+        net_dev = self.proc_root / pids[0] / 'net' / 'dev'
+        if not net_dev.exists():
+            return 0, 0
+        rx_bytes, tx_bytes = 0, 0
+        for line in net_dev.read_text().splitlines()[2:]:  # first two lines are headers
+            iface, counters = line.split(':', 1)
+            if iface.strip() == 'lo':
+                continue
+            counters = counters.split()
+            rx_bytes += int(counters[0])
+            tx_bytes += int(counters[8])
+        return rx_bytes, tx_bytes
+
+    # ---- sampling ----
+
+    def sample(self) -> List[Dict]:
+        """Take one sample of every container. Cumulative counters are reported relative to `start()`."""
+        now = time.time()
+        taken = []
+        container_ids = self.container_ids() if callable(self.container_ids) else self.container_ids
+        for container_id in container_ids:
+            try:
+                cpu_seconds = self._read_cpu_seconds(container_id)
+                memory = self._read_memory(container_id)
+                blk_read, blk_write = self._read_blkio(container_id)
+                net_rx, net_tx = self._read_network(container_id)
+            except (FileNotFoundError, TypeError, ValueError):
+                # The container is gone (or not yet there); skip it for this tick
+                continue
+
+            base = self._baseline.setdefault(container_id, (net_rx, net_tx, blk_read, blk_write))
+            last = self._last_cpu.get(container_id)
+            self._last_cpu[container_id] = (now, cpu_seconds)
+            if last is None or now <= last[0]:
+                cpu_usage = 0.0
+            else:
+                cpu_usage = (cpu_seconds - last[1]) / (now - last[0]) * 100
+
+            taken.append({
+                'timestamp': now,
+                'container_id': container_id,
+                'cpu_usage': round(cpu_usage, 3),
+                'memory': memory,
+                'net_rx_bytes': net_rx - base[0],
+                'net_tx_bytes': net_tx - base[1],
+                'blkio_read_bytes': blk_read - base[2],
+                'blkio_write_bytes': blk_write - base[3],
+            })
+        self.samples.extend(taken)
+        return taken
+
+    def _loop(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            self.sample()
+            next_tick += self.interval
+            self._stop_event.wait(max(0.0, next_tick - time.monotonic()))
+
+    def start(self):
+        self.samples = []
+        self._last_cpu = {}
+        self._baseline = {}
+        self._stop_event.clear()
+        self.sample()  # establishes the baselines for cumulative counters
+        self._thread = threading.Thread(target=self._loop, name='CgroupSampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.sample()
+
+    # ---- output ----
+
+    def write_csv(self, path: Path):
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.SAMPLE_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.samples)
+
+    def aggregate(self) -> Dict[str, float]:
+        """Aggregate the samples into the values of `DataColumns`, summed over containers."""
+        per_container: Dict[str, List[Dict]] = {}
+        for s in self.samples:
+            per_container.setdefault(s['container_id'], []).append(s)
+
+        result = {dc.name: 0 for dc in DataColumns if dc is not DataColumns._PATTERN}
+        for samples in per_container.values():
+            # the first sample only establishes the cpu baseline
+            cpu = [s['cpu_usage'] for s in samples[1:]] or [0.0]
+            memory = [s['memory'] for s in samples]
+            last = samples[-1]
+            result[DataColumns.CPU_USAGE_AVG.name]      += sum(cpu) / len(cpu)
+            result[DataColumns.CPU_USAGE_MAX.name]      += max(cpu)
+            result[DataColumns.MEMORY_AVG.name]         += sum(memory) / len(memory)
+            result[DataColumns.MEMORY_MAX.name]         += max(memory)
+            result[DataColumns.NET_RX_BYTES.name]       += last['net_rx_bytes']
+            result[DataColumns.NET_TX_BYTES.name]       += last['net_tx_bytes']
+            result[DataColumns.BLKIO_READ_BYTES.name]   += last['blkio_read_bytes']
+            result[DataColumns.BLKIO_WRITE_BYTES.name]  += last['blkio_write_bytes']
+        return {k: round(v, 3) for k, v in result.items()}
+
+def resource_sampler(container_ids: Callable[[RunnerConfig], Iterable[str]], *decargs, **deckwargs):
+    """`container_ids` is called with the config at START_MEASUREMENT, e.g.
+    `lambda config: [config.exemplar.exemplar_container.id]`, or at every sample with `refresh=True`."""
+    def resource_sampler_decorator(cls: RunnerConfig.__class__):
+        data_columns = deckwargs.pop('data_columns', [DataColumns.CPU_USAGE_AVG, DataColumns.MEMORY_MAX])
+
+        cls.create_run_table_model  = add_data_columns(data_columns)(cls.create_run_table_model)
+        cls.start_measurement       = start_sampler(container_ids, *decargs, **deckwargs)(cls.start_measurement)
+        cls.stop_measurement        = stop_sampler(cls.stop_measurement)
+        cls.populate_run_data       = populate_data_columns(cls.populate_run_data)
+
+        return cls
+    return resource_sampler_decorator
+
+def start_sampler(container_ids: Callable[[RunnerConfig], Iterable[str]], *decargs, **deckwargs):
+    refresh = deckwargs.pop('refresh', False)
+    def start_sampler_decorator(func):
+        def wrapper(*args, **kwargs):
+            self: RunnerConfig = args[0]
+
+            ret_val = func(*args, **kwargs)  # the measured containers may be started by the wrapped hook
+            ids = (lambda: container_ids(self)) if refresh else container_ids(self)
+            self.__cgroup_sampler__ = CgroupSampler(ids, *decargs, **deckwargs)
+            self.__cgroup_sampler__.start()
+            return ret_val
+        return wrapper
+    return start_sampler_decorator
+
+def stop_sampler(func):
+    def wrapper(*args, **kwargs):
+        self: RunnerConfig = args[0]
+        context: RunnerContext = args[1]
+
+        self.__cgroup_sampler__.stop()
+        if context is not None:
+            self.__cgroup_sampler__.write_csv(context.run_dir / 'cgroup_samples.csv')
+        return func(*args, **kwargs)
+    return wrapper
+
+def add_data_columns(data_cols: Iterable[DataColumns]):
+    def add_data_columns_decorator(func):
+        def wrapper(*args, **kwargs):
+            self: RunnerConfig = args[0]
+
+            func(*args, **kwargs)  # will set self.run_table_model
+            for dc in data_cols:
+                self.run_table_model.get_data_columns().append(dc.name)
+            return self.run_table_model
+        return wrapper
+    return add_data_columns_decorator
+
+def populate_data_columns(func):
+    def wrapper(*args, **kwargs):
+        self: RunnerConfig = args[0]
+
+        ret_val = func(*args, **kwargs)
+        if ret_val is None:
+            ret_val = {}
+        aggregated = self.__cgroup_sampler__.aggregate()
+        for dc in self.run_table_model.get_data_columns():
+            if DataColumns._PATTERN.value.match(dc):
+                ret_val[dc] = aggregated[dc]
+        return ret_val
+    return wrapper
@@ -1,10 +1,11 @@
 
 from enum import Enum, auto
 from pathlib import Path
-from typing import Iterable
+from typing import Dict, Iterable
 
 import codecarbon
 import csv
+import dataclasses
 import re
 
 from ConfigValidator.Config.Models.RunnerContext import RunnerContext
@@ -53,6 +54,7 @@ def start_emission_tracker(online=False, *decargs, **deckwargs):
             codecarbon_cls = codecarbon.EmissionsTracker if online else codecarbon.OfflineEmissionsTracker
 
             self.__emission_tracker__ = codecarbon_cls(*decargs, **deckwargs)
+            self.__emission_data__ = None
             self.__emission_tracker__.start()
             return func(*args, **kwargs)
         return wrapper
@@ -64,6 +66,9 @@ def stop_emission_tracker(func):
 
         ret_val = func(*args, **kwargs)
         self.__emission_tracker__.stop()
+        # Keep the final measurement in memory, so populate_data_columns does not have to parse the output file
+        final_data = getattr(self.__emission_tracker__, 'final_emissions_data', None)
+        self.__emission_data__ = dataclasses.asdict(final_data) if final_data is not None else None
         return ret_val
     return wrapper
 
@@ -75,10 +80,31 @@ def add_data_columns(data_cols: Iterable[DataColumns]):
             func(*args, **kwargs)  # will set self.run_table_model
             for dc in data_cols:
                 self.run_table_model.get_data_columns().append(dc.name)
+            # Computed once per experiment; runs are forked from this process and inherit it
+            self.__codecarbon_columns__ = column_mapping(self.run_table_model.get_data_columns())
             return self.run_table_model
         return wrapper
     return add_data_columns_decorator
 
+def column_mapping(data_columns: Iterable[str]) -> Dict[str, str]:
+    """Map the codecarbon data columns of a run table to the name of the field in the codecarbon output."""
+    mapping = {}
+    for dc in data_columns:
+        m = DataColumns._PATTERN.value.match(dc)
+        if m:
+            mapping[dc] = m.group(2)
+    return mapping
+
+def read_last_emissions_row(path: Path) -> Dict[str, str]:
+    """Return the last row of a codecarbon output file. Each tracker run appends one row to the file."""
+    with open(path) as csvfile:
+        rows = csv.DictReader(csvfile)
+        data = None
+        for data in rows:
+            pass
+        assert(data is not None)
+        return data
+
 def populate_data_columns(func):
     def wrapper(*args, **kwargs):
         self: RunnerConfig = args[0]
@@ -86,14 +112,13 @@ def populate_data_columns(func):
         ret_val = func(*args, **kwargs)
         if ret_val is None:
             ret_val = {}
-        with open(Path(self.__emission_tracker__._output_dir) / Path(self.__emission_tracker__._output_file)) as csvfile:
-            reader = csv.DictReader(csvfile)
-            rows = [row for row in reader]
-            assert(len(rows) == 1)
-            data = rows[0]
-            for dc in self.run_table_model.get_data_columns():
-                m = DataColumns._PATTERN.value.match(dc)
-                if m:
-                    ret_val[dc] = float(data[m.group(2)])
+        mapping = getattr(self, '__codecarbon_columns__', None)
+        if mapping is None:
+            mapping = self.__codecarbon_columns__ = column_mapping(self.run_table_model.get_data_columns())
+        data = getattr(self, '__emission_data__', None)
+        if data is None:
+            data = read_last_emissions_row(Path(self.__emission_tracker__._output_dir) / Path(self.__emission_tracker__._output_file))
+        for dc, field in mapping.items():
+            ret_val[dc] = float(data[field])
         return ret_val
     return wrapper
@@ -0,0 +1,156 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import csv
+import json
+import numpy as np
+
+class TimeSeries(object):
+    """The common output contract of the profilers: one float64 timestamp column (seconds since the epoch)
+    and any number of typed, equally long data columns, produced by a single `source`.
+
+    Series are stored as one uncompressed `.npz` file per profiler (one binary array per column plus a small
+    JSON header), so loading is a plain memory copy instead of text parsing.
+    """
+    TIMESTAMP = '__timestamp__'
+    META = '__meta__'
+
+    def __init__(self, source: str, timestamps: Iterable[float], columns: Dict[str, Iterable],
+                 units: Optional[Dict[str, str]] = None):
+        self.source = source
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        self.units = dict(units or {})
+
+        for name, values in self.columns.items():
+            if values.shape != self.timestamps.shape:
+                raise ValueError(f"Column '{name}' of '{source}' has {values.shape[0]} values "
+                                 f"for {self.timestamps.shape[0]} timestamps")
+        if np.any(np.diff(self.timestamps) < 0):
+            order = np.argsort(self.timestamps, kind='stable')
+            self.timestamps = self.timestamps[order]
+            self.columns = {name: values[order] for name, values in self.columns.items()}
+
+    def __len__(self):
+        return self.timestamps.shape[0]
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    # ---- storage ----
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        if path.suffix != '.npz':
+            path = path.with_suffix('.npz')
+        meta = json.dumps({'source': self.source, 'units': self.units, 'columns': list(self.columns)})
+        np.savez(path, **{self.TIMESTAMP: self.timestamps, self.META: np.array(meta)}, **self.columns)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'TimeSeries':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data[cls.META]))
+            return cls(meta['source'], data[cls.TIMESTAMP],
+                       {name: data[name] for name in meta['columns']}, meta['units'])
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path], source: str, timestamp_column: str,
+                 columns: Optional[Dict[str, str]] = None, timestamp_scale: float = 1.0) -> 'TimeSeries':
+        """Convert the CSV output of an external profiler (e.g. energibridge, powerjoular).
+        `columns` maps CSV headers to column names; all numeric columns are kept when omitted.
+        `timestamp_scale` converts the timestamp column to seconds (e.g. 1e-3 for milliseconds)."""
+        with open(path, newline='') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        if columns is None:
+            columns = {}
+            for header in (rows[0].keys() if rows else []):
+                if header == timestamp_column:
+                    continue
+                try:
+                    float(rows[0][header])
+                    columns[header] = header
+                except (TypeError, ValueError):
+                    pass
+        timestamps = [float(row[timestamp_column]) * timestamp_scale for row in rows]
+        return cls(source, timestamps,
+                   {name: np.array([float(row[header]) for row in rows]) for header, name in columns.items()})
+
+    # ---- aggregation ----
+
+    def mean(self, column: str) -> float:
+        return float(np.mean(self.columns[column])) if len(self) else 0.0
+
+    def max(self, column: str) -> float:
+        return float(np.max(self.columns[column])) if len(self) else 0.0
+
+    def integral(self, column: str) -> float:
+        """Time integral of a column (e.g. power in W -> energy in J)."""
+        if len(self) < 2:
+            return 0.0
+        values = self.columns[column].astype(np.float64)
+        return float(np.sum((values[1:] + values[:-1]) / 2 * np.diff(self.timestamps)))
+
+def resample(series: TimeSeries, time_base: np.ndarray, method: str = 'linear') -> Dict[str, np.ndarray]:
+    """Sample every column of `series` at `time_base`.
+      linear   : linear interpolation between neighbouring samples (for gauges such as power or cpu usage)
+      previous : last known value, i.e. a step function (for counters and states)
+    Outside the range of the series the values are NaN."""
+    result = {}
+    if len(series) == 0:
+        return {name: np.full(time_base.shape, np.nan) for name in series.columns}
+    outside = (time_base < series.timestamps[0]) | (time_base > series.timestamps[-1])
+    if method == 'previous':
+        index = np.clip(np.searchsorted(series.timestamps, time_base, side='right') - 1, 0, len(series) - 1)
+    for name, values in series.columns.items():
+        if method == 'linear':
+            resampled = np.interp(time_base, series.timestamps, values.astype(np.float64))
+        elif method == 'previous':
+            resampled = values[index].astype(np.float64)
+        else:
+            raise ValueError(f"Unknown resampling method '{method}'")
+        resampled[outside] = np.nan
+        result[name] = resampled
+    return result
+
+def align(series: List[TimeSeries], interval: float, start: Optional[float] = None, end: Optional[float] = None,
+          method: Union[str, Dict[str, str]] = 'linear') -> TimeSeries:
+    """Merge the streams of several profilers onto one time base with a fixed `interval` (seconds).
+    The time base covers the overlap of all series unless `start`/`end` are given.
+    Columns of the result are named `<source>__<column>`. `method` can be given per source."""
+    non_empty = [s for s in series if len(s)]
+    if start is None:
+        start = max(s.timestamps[0] for s in non_empty) if non_empty else 0.0
+    if end is None:
+        end = min(s.timestamps[-1] for s in non_empty) if non_empty else 0.0
+    time_base = np.arange(start, end + interval / 2, interval) if end >= start else np.empty(0)
+
+    columns, units = {}, {}
+    for s in series:
+        s_method = method.get(s.source, 'linear') if isinstance(method, dict) else method
+        for name, values in resample(s, time_base, s_method).items():
+            columns[f'{s.source}__{name}'] = values
+            if name in s.units:
+                units[f'{s.source}__{name}'] = s.units[name]
+    return TimeSeries('aligned', time_base, columns, units)
+
+# ---- adapters for the profilers of this package ----
+
+def from_wattsuppro(meter) -> TimeSeries:
+    data = meter.snapshot()
+    start = meter._start_time or 0.0
+    return TimeSeries('wattsuppro', np.frombuffer(data['t'], dtype=np.float64) + start,
+                      {'power': data['power'], 'potential': data['potential'], 'current': data['current']},
+                      {'power': 'W', 'potential': 'V', 'current': 'A'})
+
+def from_cgroup_sampler(sampler) -> List[TimeSeries]:
+    """One series per sampled container, with the container id as source."""
+    per_container: Dict[str, List[Dict]] = {}
+    for s in sampler.samples:
+        per_container.setdefault(s['container_id'], []).append(s)
+    fields = [f for f in sampler.SAMPLE_FIELDS if f not in ('timestamp', 'container_id')]
+    units = {'cpu_usage': '%', 'memory': 'B', 'net_rx_bytes': 'B', 'net_tx_bytes': 'B',
+             'blkio_read_bytes': 'B', 'blkio_write_bytes': 'B'}
+    return [TimeSeries(container_id, [s['timestamp'] for s in samples],
+                       {f: np.array([s[f] for s in samples]) for f in fields}, units)
+            for container_id, samples in per_container.items()]
@@ -1,5 +1,7 @@
 import os, serial
 import datetime, time
+import threading
+from array import array
 from platform import uname
 
 class WattsUpPro(object):
@@ -9,7 +11,7 @@ class WattsUpPro(object):
     TCPIP_MODE = 'T'
     FULLHANDLING = 2
 
-    def __init__(self, port: str = None, interval=1.0):
+    def __init__(self, port: str = None, interval=1.0, capacity=4096):
 
         # Set up & check serial ports
         if port is None:
@@ -27,47 +29,108 @@ class WattsUpPro(object):
                 print( 'Default port is /dev/ttyUSB0 for Linux')
                 raise RuntimeError("Invalid port")
 
-        self.s = serial.Serial(port, 115200 )
+        # The read timeout lets the reader thread notice a stop request while the meter is silent
+        self.s = serial.Serial(port, 115200, timeout=max(interval, 0.1))
         self.logfile = None
         self.interval = interval
-        # initialize lists for keeping data
-        self.t = []
-        self.power = []
-        self.potential = []
-        self.current = []
+        # preallocated arrays for keeping data; grown (doubled) when full
+        self.n = 0
+        self.t = array('d', bytes(8 * capacity))
+        self.power = array('d', bytes(8 * capacity))
+        self.potential = array('d', bytes(8 * capacity))
+        self.current = array('d', bytes(8 * capacity))
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_time = None
 
     def mode(self, runmode):
         temp = '#L,W,3,%s,,%d;' % (runmode, self.interval)
         self.s.write( str.encode(temp))
         if runmode == self.INTERNAL_MODE:
-            self.s.write('#O,W,1,%d' % self.FULLHANDLING)
+            self.s.write( str.encode('#O,W,1,%d' % self.FULLHANDLING))
 
-    def log(self,timeout, logfile = None):
-        print('Logging...')
+    @staticmethod
+    def parse(line: bytes):
+        """Parse a '#d' data line into (W, V, A), or return None for any other line."""
+        if not line.startswith(b'#d'):
+            return None
+        fields = line.split(b',')
+        if len(fields) <= 5:
+            return None
+        try:
+            return float(fields[3]) / 10, float(fields[4]) / 10, float(fields[5]) / 1000
+        except ValueError:
+            return None
+
+    def _append(self, t, W, V, A):
+        with self._lock:
+            if self.n == len(self.t):
+                for buf in (self.t, self.power, self.potential, self.current):
+                    buf.extend(array('d', bytes(8 * len(buf))))
+            self.t[self.n] = t
+            self.power[self.n] = W
+            self.potential[self.n] = V
+            self.current[self.n] = A
+            self.n += 1
+
+    def _read_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                line = self.s.readline()
+            except serial.SerialException:
+                break
+            values = self.parse(line)
+            if values:
+                self._append(time.time() - self._start_time, *values)
+
+    def start(self):
+        """Put the meter in external logging mode and start reading samples on a background thread."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            self.n = 0
+        self._stop_event.clear()
+        self._start_time = time.time()
         self.mode(self.EXTERNAL_MODE)
-        if logfile:
-            self.logfile = logfile
-            o = open(self.logfile,'w')
+        self._thread = threading.Thread(target=self._read_loop, name='WattsUpPro', daemon=True)
+        self._thread.start()
 
-        line = self.s.readline()
-        n = 0
-        timeout_start = time.time()
-        
+    def stop(self):
+        """Stop the reader thread. The samples read so far remain available via `snapshot()`."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
 
-        while time.time() < timeout_start + timeout:
-            if line.startswith( str.encode('#d') ):
-                fields = line.split(str.encode(','))
-                if len(fields)>5:
-                    W = float(fields[3]) / 10
-                    V = float(fields[4]) / 10
-                    A = float(fields[5]) / 1000
-                   
-                    if self.logfile:
-                        o.write('%s %d %3.1f %3.1f %5.3f\n' % (datetime.datetime.now(), n, W, V, A))  # SAVE TO LOG
-                    n += self.interval
-            line = self.s.readline()
+    def snapshot(self):
+        """Return a copy of the samples read so far as a dict of equally long arrays."""
+        with self._lock:
+            n = self.n
+            return {
+                't':         self.t[:n],
+                'power':     self.power[:n],
+                'potential': self.potential[:n],
+                'current':   self.current[:n],
+            }
 
-        try:
-            o.close()
-        except:
-            pass
+    def write_log(self, logfile):
+        """Write the samples read so far in the same text format `log` has always produced."""
+        data = self.snapshot()
+        with open(logfile, 'w') as o:
+            for i in range(len(data['t'])):
+                o.write('%s %d %3.1f %3.1f %5.3f\n' % (
+                    datetime.datetime.fromtimestamp(self._start_time + data['t'][i]),
+                    i * self.interval, data['power'][i], data['potential'][i], data['current'][i]))  # SAVE TO LOG
+
+    def log(self,timeout, logfile = None):
+        """Blocking variant: log for `timeout` seconds and optionally write the samples to `logfile`."""
+        print('Logging...')
+        self.start()
+        time.sleep(timeout)
+        self.stop()
+        if logfile:
+            self.logfile = logfile
+            self.write_log(self.logfile)
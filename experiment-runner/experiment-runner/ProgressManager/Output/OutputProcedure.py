@@ -1,6 +1,5 @@
 import time
 import sys
-from tabulate import tabulate
 from ExperimentOrchestrator.Misc.DictConversion import class_to_dict
 from ExperimentOrchestrator.Misc.BashHeaders import BashHeaders
 
@@ -46,12 +45,14 @@ class OutputProcedure:
 
     @staticmethod
     def console_log_tabulate_dict(d: dict):     # Used to output dictionary as readable, pretty table
+        from tabulate import tabulate
         headers = ['Key', 'Value']
         data = [(k, v) for k, v in d.items()]
         print(f"\n\n{tabulate(data, headers=headers)}\n\n")
 
     @staticmethod
     def console_log_tabulate_class(class_to_dict):
+        from tabulate import tabulate
         d = class_to_dict(class_to_dict)
         headers = ['Key', 'Value']
         data = [(k, v) for k, v in d.items()]
@@ -1,8 +1,10 @@
+import os
 import sys
+import json
 import traceback
-import dill as pickle
 import hashlib
 import ast
+from pathlib import Path
 from typing import List
 from importlib import util
 import multiprocessing
@@ -28,26 +30,49 @@ def calc_ast_md5sum(src, name):
     tree = compile(src, name, 'exec', flags=ast.PyCF_ONLY_AST, optimize=0)
 
     for node in ast.walk(tree):
-        # Ignores empty lines and comment only lines
-        if hasattr(node, 'lineno'):
-            setattr(node, 'lineno', 0)
-        if hasattr(node, 'col_offset'):
-            setattr(node, 'col_offset', 0)
-        if hasattr(node, 'end_lineno'):
-            setattr(node, 'end_lineno', 0)
-        if hasattr(node, 'end_col_offset'):
-            setattr(node, 'end_col_offset', 0)
-
         # Ignore docstring
         if isinstance(node, (ast.AsyncFunctionDef, ast.FunctionDef, ast.ClassDef, ast.Module)) and ast.get_docstring(node) is not None:
             docstring_node = node.body[0].value
-            if isinstance(docstring_node, ast.Str):
-                docstring_node.s = ''
-            elif isinstance(docstring_node, ast.Constant) and isinstance(docstring_node.value, str):
-                docstring_node.value = ''
+            docstring_node.value = ''
+
+    # Without attributes, the dump ignores line/column numbers, and thus empty lines and comment only lines
+    return hashlib.md5(ast.dump(tree, annotate_fields=False, include_attributes=False).encode()).digest()
 
+def calc_legacy_ast_md5sum(src, name):
+    """The md5sum of experiments started before the AST dump replaced the dill pickle, accepted on resume."""
+    import dill as pickle
+    tree = compile(src, name, 'exec', flags=ast.PyCF_ONLY_AST, optimize=0)
+    for node in ast.walk(tree):
+        for attribute in ('lineno', 'col_offset', 'end_lineno', 'end_col_offset'):
+            if hasattr(node, attribute):
+                setattr(node, attribute, 0)
+        if isinstance(node, (ast.AsyncFunctionDef, ast.FunctionDef, ast.ClassDef, ast.Module)) and ast.get_docstring(node) is not None:
+            node.body[0].value.value = ''
     return hashlib.md5(pickle.dumps(tree)).digest()
 
+def cached_ast_md5sum(path: str):
+    """calc_ast_md5sum of a file, cached in the __pycache__ folder next to it and keyed by the file's mtime and size."""
+    stat = os.stat(path)
+    key = [stat.st_mtime_ns, stat.st_size]
+    cache_file = Path(path).parent / '__pycache__' / (Path(path).stem + '.ast_md5.json')
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if cached['key'] == key:
+            return bytes.fromhex(cached['md5sum'])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with open(path) as f:
+        md5sum = calc_ast_md5sum(f.read(), path)
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        with open(cache_file, 'w') as f:
+            json.dump({'key': key, 'md5sum': md5sum.hex()}, f)
+    except OSError:
+        pass  # a read-only config location only costs us the cache
+    return md5sum
+
 
 if __name__ == "__main__":
     try: 
@@ -62,11 +87,14 @@ if __name__ == "__main__":
             if hasattr(config_file, 'RunnerConfig'):
                 config = config_file.RunnerConfig()                         # Instantiate config from injected file
                 metadata = Metadata(
-                    calc_ast_md5sum(pickle.source.getsource(config_file), sys.argv[1])  # hash of the whole file, not just RunnerConfig
+                    cached_ast_md5sum(sys.argv[1])                          # hash of the whole file, not just RunnerConfig
                 )
 
                 ConfigValidator.validate_config(config)                     # Validate config as a valid RunnerConfig
-                ExperimentController(config, metadata).do_experiment()      # Instantiate controller with config and start experiment
+                def legacy_md5sum(path=sys.argv[1]):
+                    with open(path) as f:
+                        return calc_legacy_ast_md5sum(f.read(), path)
+                ExperimentController(config, metadata, legacy_md5sum).do_experiment()  # Instantiate controller with config and start experiment
             else:
                 raise ConfigInvalidClassNameError
         else:                                                               # Else, a utility command is entered
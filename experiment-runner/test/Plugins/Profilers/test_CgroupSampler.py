@@ -0,0 +1,133 @@
+import unittest
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from ConfigValidator.Config.Models.RunnerContext import RunnerContext
+from ConfigValidator.Config.RunnerConfig import RunnerConfig
+
+from Plugins.Profilers import CgroupSampler
+from Plugins.Profilers.CgroupSampler import DataColumns as CGDataCols
+
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:     500       5    0    0    0     0          0         0      500       5    0    0    0     0       0          0
+  eth0: {rx}      10    0    0    0     0          0         0 {tx}      10    0    0    0     0       0          0
+"""
+
+
+class MockCgroupTree:
+    """A fake cgroup v2 (systemd driver) hierarchy and /proc for one container."""
+
+    def __init__(self, container_id: str, pid: int = 4242):
+        self.root = Path(tempfile.mkdtemp())
+        self.cgroup_root = self.root / 'cgroup'
+        self.proc_root = self.root / 'proc'
+        self.dir = self.cgroup_root / 'system.slice' / f'docker-{container_id}.scope'
+        self.dir.mkdir(parents=True)
+        (self.proc_root / str(pid) / 'net').mkdir(parents=True)
+        self.pid = pid
+        (self.dir / 'cgroup.controllers').write_text('cpu io memory\n')
+        (self.dir / 'cgroup.procs').write_text(f'{pid}\n')
+        self.update(cpu_usec=0, memory=1000, rbytes=0, wbytes=0, rx=0, tx=0)
+
+    def update(self, cpu_usec, memory, rbytes, wbytes, rx, tx):
+        (self.dir / 'cpu.stat').write_text(f'usage_usec {cpu_usec}\nuser_usec {cpu_usec}\nsystem_usec 0\n')
+        (self.dir / 'memory.current').write_text(f'{memory}\n')
+        (self.dir / 'io.stat').write_text(f'8:0 rbytes={rbytes} wbytes={wbytes} rios=1 wios=1 dbytes=0 dios=0\n')
+        (self.proc_root / str(self.pid) / 'net' / 'dev').write_text(NET_DEV.format(rx=rx, tx=tx))
+
+    def clear(self):
+        shutil.rmtree(self.root)
+
+
+class TestCgroupSampler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tree = MockCgroupTree('abc123')
+        self.sampler = CgroupSampler.CgroupSampler(['abc123'], interval=0.05,
+                                                   cgroup_root=self.tree.cgroup_root,
+                                                   proc_root=self.tree.proc_root)
+
+    def tearDown(self) -> None:
+        self.tree.clear()
+
+    def test_counters_are_relative_to_start(self):
+        self.tree.update(cpu_usec=1_000_000, memory=2000, rbytes=100, wbytes=200, rx=1000, tx=2000)
+        self.sampler.sample()
+        self.tree.update(cpu_usec=2_000_000, memory=4000, rbytes=150, wbytes=260, rx=1800, tx=2500)
+        sample = self.sampler.sample()[0]
+
+        self.assertEqual(sample['memory'], 4000)
+        self.assertEqual(sample['blkio_read_bytes'], 50)
+        self.assertEqual(sample['blkio_write_bytes'], 60)
+        self.assertEqual(sample['net_rx_bytes'], 800)
+        self.assertEqual(sample['net_tx_bytes'], 500)
+        self.assertGreater(sample['cpu_usage'], 0)
+
+    def test_missing_container_is_skipped(self):
+        sampler = CgroupSampler.CgroupSampler(['does-not-exist'], cgroup_root=self.tree.cgroup_root,
+                                              proc_root=self.tree.proc_root)
+        self.assertEqual(sampler.sample(), [])
+
+    def test_containers_resolved_at_every_sample(self):
+        container_ids = []
+        sampler = CgroupSampler.CgroupSampler(lambda: container_ids, cgroup_root=self.tree.cgroup_root,
+                                              proc_root=self.tree.proc_root)
+        self.assertEqual(sampler.sample(), [])
+        container_ids.append('abc123')
+        self.assertEqual([s['container_id'] for s in sampler.sample()], ['abc123'])
+
+    def test_aggregate(self):
+        self.sampler.start()
+        self.tree.update(cpu_usec=50_000, memory=3000, rbytes=10, wbytes=20, rx=30, tx=40)
+        self.sampler.stop()
+
+        self.assertGreaterEqual(len(self.sampler.samples), 2)
+        aggregated = self.sampler.aggregate()
+        self.assertEqual(aggregated[CGDataCols.MEMORY_MAX.name], 3000)
+        self.assertEqual(aggregated[CGDataCols.NET_RX_BYTES.name], 30)
+        self.assertEqual(aggregated[CGDataCols.BLKIO_WRITE_BYTES.name], 20)
+
+
+class TestResourceSamplerDecorator(unittest.TestCase):
+    tree = MockCgroupTree('def456')
+
+    @CgroupSampler.resource_sampler(
+        lambda config: ['def456'],
+        data_columns=[CGDataCols.CPU_USAGE_AVG, CGDataCols.MEMORY_MAX, CGDataCols.NET_TX_BYTES],
+        interval=0.05,
+        cgroup_root=tree.cgroup_root,
+        proc_root=tree.proc_root
+    )
+    class ResourceSamplerConfig(RunnerConfig):
+        def populate_run_data(self, context: RunnerContext):
+            return {'utility': 1.0}
+
+    def setUp(self) -> None:
+        self.runner_config = self.__class__.ResourceSamplerConfig()
+        self.run_table = self.runner_config.create_run_table_model().generate_experiment_run_table()
+        self.run_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.run_dir)
+        self.__class__.tree.clear()
+
+    def test_config(self):
+        context = RunnerContext(self.run_table[0], 0, self.run_dir)
+        self.runner_config.start_measurement(context)
+        self.__class__.tree.update(cpu_usec=10_000, memory=5000, rbytes=0, wbytes=0, rx=0, tx=700)
+        self.runner_config.stop_measurement(context)
+        run_data = self.runner_config.populate_run_data(context)
+
+        self.assertIn(CGDataCols.CPU_USAGE_AVG.name, self.run_table[0])
+        self.assertEqual(run_data[CGDataCols.MEMORY_MAX.name], 5000)
+        self.assertEqual(run_data[CGDataCols.NET_TX_BYTES.name], 700)
+        self.assertEqual(run_data['utility'], 1.0)
+        self.assertTrue((self.run_dir / 'cgroup_samples.csv').is_file())
+
+
+if __name__ == '__main__':
+    unittest.main()
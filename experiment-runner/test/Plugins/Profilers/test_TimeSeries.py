@@ -0,0 +1,60 @@
+import unittest
+
+import math
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from Plugins.Profilers.TimeSeries import TimeSeries, align, resample
+
+
+class TestTimeSeries(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = Path(tempfile.mkdtemp())
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir)
+
+    def test_save_and_load(self):
+        series = TimeSeries('meter', [0.0, 1.0, 2.0], {'power': [1.5, 2.5, 3.5], 'samples': np.array([1, 2, 3])},
+                            {'power': 'W'})
+        loaded = TimeSeries.load(series.save(self.tmpdir / 'meter'))
+        self.assertEqual(loaded.source, 'meter')
+        self.assertEqual(loaded.units, {'power': 'W'})
+        np.testing.assert_array_equal(loaded['power'], [1.5, 2.5, 3.5])
+        self.assertEqual(loaded['samples'].dtype, np.dtype(int))
+
+    def test_from_csv(self):
+        path = self.tmpdir / 'energibridge.csv'
+        path.write_text('Time,PACKAGE_ENERGY (J),CPU_NAME\n1000,1.0,x\n2000,3.0,x\n')
+        series = TimeSeries.from_csv(path, 'energibridge', 'Time', timestamp_scale=1e-3)
+        self.assertEqual(list(series.columns), ['PACKAGE_ENERGY (J)'])
+        np.testing.assert_array_equal(series.timestamps, [1.0, 2.0])
+
+    def test_unequal_columns_rejected(self):
+        with self.assertRaises(ValueError):
+            TimeSeries('broken', [0.0, 1.0], {'power': [1.0]})
+
+    def test_integral(self):
+        series = TimeSeries('meter', [0.0, 1.0, 3.0], {'power': [10.0, 10.0, 20.0]})
+        self.assertAlmostEqual(series.integral('power'), 10.0 + 30.0)
+
+    def test_resample_previous(self):
+        series = TimeSeries('counter', [0.0, 1.0, 2.0], {'requests': [0, 5, 7]})
+        resampled = resample(series, np.array([0.5, 1.5, 2.5]), 'previous')
+        self.assertEqual(list(resampled['requests'][:2]), [0.0, 5.0])
+        self.assertTrue(math.isnan(resampled['requests'][2]))
+
+    def test_align(self):
+        meter = TimeSeries('meter', [0.0, 2.0, 4.0], {'power': [0.0, 2.0, 4.0]})
+        cgroup = TimeSeries('abc', [1.0, 3.0, 5.0], {'cpu_usage': [10.0, 30.0, 50.0]})
+        aligned = align([meter, cgroup], interval=1.0)
+        np.testing.assert_array_equal(aligned.timestamps, [1.0, 2.0, 3.0, 4.0])
+        np.testing.assert_array_equal(aligned['meter__power'], [1.0, 2.0, 3.0, 4.0])
+        np.testing.assert_array_equal(aligned['abc__cpu_usage'], [10.0, 20.0, 30.0, 40.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,10 +2,36 @@ import os
 import unittest
 import shutil
 import tempfile
+import threading
+import time
 
 from Plugins.Profilers.WattsUpPro import WattsUpPro
 
 
+class FakeWattsUpPro:
+    """A pty-based stand-in for the meter. It emits one '#d' line per `interval` seconds once started."""
+
+    def __init__(self, interval=0.01, watts=12.5, volts=230.1, amps=0.054):
+        self.master, self.slave = os.openpty()
+        self.port = os.ttyname(self.slave)
+        self.interval = interval
+        self.line = b'#d,-,18,%d,%d,%d,0,0,0,0,0,0,0,0,0,0,0,0,0,0;\r\n' % (watts * 10, volts * 10, amps * 1000)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._emit, daemon=True)
+        self._thread.start()
+
+    def _emit(self):
+        os.write(self.master, b'#s,-,3,_,_,_;\r\n')  # a status line, which has to be ignored
+        while not self._stop_event.wait(self.interval):
+            os.write(self.master, self.line)
+
+    def close(self):
+        self._stop_event.set()
+        self._thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+
 class TestWattsUpPro(unittest.TestCase):
     def test_all(self):
         # ', 1.0, 5, str(context.run_dir.resolve() / 'sample.log'
@@ -22,5 +48,43 @@ class TestWattsUpPro(unittest.TestCase):
         shutil.rmtree(tmpdir)
 
 
+class TestWattsUpProFakeDevice(unittest.TestCase):
+    def setUp(self) -> None:
+        self.device = FakeWattsUpPro()
+        self.meter = WattsUpPro(self.device.port, 0.1, capacity=4)
+
+    def tearDown(self) -> None:
+        self.meter.stop()
+        self.meter.s.close()
+        self.device.close()
+
+    def test_start_does_not_block(self):
+        start = time.time()
+        self.meter.start()
+        self.assertLess(time.time() - start, 0.5)
+        time.sleep(0.3)
+        self.meter.stop()
+
+        data = self.meter.snapshot()
+        self.assertGreater(len(data['t']), 4)  # more samples than the initial capacity
+        self.assertEqual(len(data['t']), len(data['power']))
+        self.assertAlmostEqual(data['power'][0], 12.5)
+        self.assertAlmostEqual(data['potential'][0], 230.1)
+        self.assertAlmostEqual(data['current'][0], 0.054)
+
+    def test_log(self):
+        tmpdir = tempfile.mkdtemp()
+        self.meter.log(0.2, tmpdir + '/sample.log')
+        with open(tmpdir + '/sample.log') as f:
+            lines = f.readlines()
+        self.assertGreater(len(lines), 0)
+        self.assertEqual(lines[0].split()[3:], ['12.5', '230.1', '0.054'])
+        shutil.rmtree(tmpdir)
+
+    def test_parse(self):
+        self.assertIsNone(WattsUpPro.parse(b'#s,-,3,_,_,_;'))
+        self.assertEqual(WattsUpPro.parse(b'#d,-,18,125,2301,54,0;'), (12.5, 230.1, 0.054))
+
+
 if __name__ == '__main__':
     unittest.main()
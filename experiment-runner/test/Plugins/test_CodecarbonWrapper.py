@@ -115,5 +115,19 @@ class TestEmissionTrackerCombined(unittest.TestCase):
         print(run_data)
 
 
+class TestEmissionsOutputParsing(unittest.TestCase):
+    def test_column_mapping(self):
+        mapping = CodecarbonWrapper.column_mapping(['avg_cpu', CCDataCols.EMISSIONS.name, CCDataCols.CPU_ENERGY.name])
+        self.assertEqual(mapping, {CCDataCols.EMISSIONS.name: 'emissions', CCDataCols.CPU_ENERGY.name: 'cpu_energy'})
+
+    def test_read_last_row_of_appended_file(self):
+        tmpdir = tempfile.mkdtemp()
+        path = Path(tmpdir) / 'emissions.csv'
+        path.write_text('emissions,energy_consumed\n0.1,1.0\n0.2,2.0\n0.3,3.0\n')
+        data = CodecarbonWrapper.read_last_emissions_row(path)
+        self.assertEqual(data, {'emissions': '0.3', 'energy_consumed': '3.0'})
+        shutil.rmtree(tmpdir)
+
+
 if __name__ == '__main__':
     unittest.main()
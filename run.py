@@ -3,14 +3,13 @@ from UPISAS.exemplar import Exemplar
 from UPISAS.exemplars.swim import SWIM
 import signal
 import sys
-import time
 
 if __name__ == '__main__':
     
     exemplar = SWIM(auto_start=True)
-    time.sleep(3)
+    exemplar.wait_until_ready(endpoints=()) # the HTTP server is only started by start_run
     exemplar.start_run()
-    time.sleep(3)
+    exemplar.wait_until_ready()
 
     try:
         strategy = ReactiveAdaptationManager(exemplar)
@@ -2,26 +2,34 @@ from UPISAS.strategies.ramses_baseline_strategy import RamsesBaselineStrategy
 from UPISAS.exemplar import Exemplar
 from UPISAS.exemplars.swim import SWIM
 from UPISAS.exemplars.ramses import RAMSES
+from UPISAS.clock import SimulatedClock, WallClock
+from UPISAS.simulators import SimulatorServer
+from UPISAS.simulators.ramses import RamsesSimulation
 import signal
 import sys
-import time
 
 if __name__ == '__main__':
-    
-    exemplar = RAMSES(auto_start=True)
-    time.sleep(5)
-    exemplar.stop_existing_adaptation() # First stop existing adaptation mechanism in RAMSES itself.
-    time.sleep(10)
-    exemplar.stop_existing_adaptation() # First stop existing adaptation mechanism in RAMSES itself.
+
+    # With --simulated, a 7-minute scenario is replayed against the RAMSES simulator in simulated time.
+    simulated = "--simulated" in sys.argv
+    if simulated:
+        clock = SimulatedClock()
+        exemplar = SimulatorServer(RamsesSimulation(clock=clock, seed=1))
+        exemplar.start()
+    else:
+        clock = WallClock()
+        exemplar = RAMSES(auto_start=True)
+        exemplar.wait_until_ready()
+        exemplar.stop_existing_adaptation() # First stop existing adaptation mechanism in RAMSES itself.
 
     try:
-        strategy = RamsesBaselineStrategy(exemplar)
+        strategy = RamsesBaselineStrategy(exemplar, clock)
 
         strategy.get_monitor_schema()
         strategy.get_adaptation_options_schema()
         strategy.get_execute_schema()
 
-        while True:
+        for _ in clock.ticks(5, duration=420 if simulated else None):
             #input("Try to adapt?")
             strategy.monitor(with_validation=False, verbose=False)
             if strategy.analyze():
@@ -29,8 +37,9 @@ if __name__ == '__main__':
                     if strategy.execute(with_validation=False):
                         print("[Runner] Adaptation successfully made!")
                         #break
-            time.sleep(5)
-            
+        if simulated:
+            exemplar.stop()
+
     except (Exception, KeyboardInterrupt) as e:
         print(str(e))
         input("something went wrong")